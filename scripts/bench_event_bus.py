@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Event Bus Micro-Benchmark
+
+This script measures the per-message publish overhead of LONGINEventBus for the
+different delivery paths (queued, inline, batched, no subscribers) and compares
+them with the previous single global queue design, which always built an
+envelope and went through a second hop in the processing task.
+
+Every scenario is timed end to end: publishing plus delivering every message,
+until the bus has drained its queues on stop(). The queued paths therefore
+include the per-shard worker bookkeeping (latency histogram, concurrency limit)
+that the legacy replica does not have, and are slower than it per message;
+publish_many only removes part of the publish-side cost.
+
+Run from the repository root:
+    python scripts/bench_event_bus.py --messages 100000
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from typing import Callable, Awaitable
+
+from src.longin_core.event_bus import LONGINEventBus
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger("bench_event_bus")
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Micro-benchmark of the LONGINEventBus publish paths")
+    parser.add_argument("--messages", type=int, default=100000, help="Messages published per scenario")
+    parser.add_argument("--batch_size", type=int, default=500, help="Batch size for publish_many")
+    return parser.parse_args()
+
+
+async def _noop(message: dict) -> None:
+    return None
+
+
+def _quiet_logger() -> logging.Logger:
+    bus_logger = logging.getLogger("bench_event_bus.bus")
+    bus_logger.setLevel(logging.WARNING)
+    return bus_logger
+
+
+async def bench_legacy(messages: int) -> float:
+    """Replica of the previous design: one global queue, always enqueued, one consumer task."""
+    queue: asyncio.Queue = asyncio.Queue()
+    subscribers = {"topic": [_noop]}
+
+    async def consume():
+        while True:
+            data = await queue.get()
+            for callback in list(subscribers.get(data["topic"], [])):
+                await callback(data["message"])
+            queue.task_done()
+
+    consumer = asyncio.create_task(consume())
+    start = time.perf_counter()
+    for i in range(messages):
+        await queue.put({"topic": "topic", "message": {"i": i}, "source_id": "bench"})
+    await queue.join()
+    elapsed = time.perf_counter() - start
+    consumer.cancel()
+    return elapsed
+
+
+async def _bench_bus(config: dict, subscribe: bool, run: Callable[[LONGINEventBus], Awaitable[None]]) -> float:
+    event_bus = LONGINEventBus(_quiet_logger(), config)
+    if subscribe:
+        await event_bus.subscribe("topic", _noop, "bench")
+    await event_bus.start()
+    start = time.perf_counter()
+    await run(event_bus)
+    await event_bus.stop()
+    return time.perf_counter() - start
+
+
+async def main():
+    """Run all scenarios and print the per-message cost."""
+    args = parse_args()
+    n = args.messages
+    # Unbounded queues, so the comparison with the legacy design is fair
+    queued_cfg = {"queue_capacity": 0}
+
+    async def publish_loop(event_bus: LONGINEventBus):
+        for i in range(n):
+            await event_bus.publish("topic", {"i": i}, "bench")
+
+    async def publish_batches(event_bus: LONGINEventBus):
+        for offset in range(0, n, args.batch_size):
+            await event_bus.publish_many(
+                [("topic", {"i": i}) for i in range(offset, min(n, offset + args.batch_size))], "bench"
+            )
+
+    results = {
+        "legacy global queue": await bench_legacy(n),
+        "publish, queued": await _bench_bus(queued_cfg, True, publish_loop),
+        "publish_many, queued": await _bench_bus(queued_cfg, True, publish_batches),
+        "publish, inline topic": await _bench_bus({"topics": {"topic": {"inline": True}}}, True, publish_loop),
+        "publish, no subscribers": await _bench_bus(queued_cfg, False, publish_loop),
+    }
+
+    baseline = results["legacy global queue"]
+    print(f"\n{'scenario':<28}{'us/msg':>10}{'speedup':>10}")
+    for name, elapsed in results.items():
+        print(f"{name:<28}{elapsed / n * 1e6:>10.2f}{baseline / elapsed:>9.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
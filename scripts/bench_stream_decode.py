@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming Decode Micro-Benchmark
+
+This script measures how many streamed chat completion chunks per second
+AsyncLMStudioClient.stream_chat_completion() can decode in each stream mode,
+and compares them with the previous per-line decoder (str lines, json.loads
+and a pydantic model for every chunk). The stream is served from memory by an
+httpx mock transport, so only the client side is measured.
+
+Run from the repository root:
+    python scripts/bench_stream_decode.py --chunks 100000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from typing import AsyncIterator
+
+import httpx
+
+from src.longin_core.lmstudio import client as lmstudio_client
+from src.longin_core.lmstudio.client import (
+    AsyncLMStudioClient,
+    ChatMessage,
+    ChatRole,
+    StreamedChatCompletionResponse,
+    StreamMode,
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger("bench_stream_decode")
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Micro-benchmark of the chat completion stream decoder")
+    parser.add_argument("--chunks", type=int, default=100000, help="Streamed chunks per scenario")
+    parser.add_argument("--read_size", type=int, default=4096, help="Bytes per network read")
+    return parser.parse_args()
+
+
+def build_body(chunks: int) -> bytes:
+    """Build an SSE body shaped like LM Studio's token stream."""
+    lines = []
+    for i in range(chunks):
+        chunk = {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion.chunk",
+            "created": 1700000000,
+            "model": "bench-model",
+            "choices": [{"index": 0, "delta": {"content": f" tok{i % 100}"}, "finish_reason": None}],
+        }
+        lines.append(f"data: {json.dumps(chunk)}\n\n")
+    lines.append("data: [DONE]\n\n")
+    return "".join(lines).encode()
+
+
+def make_client(body: bytes, read_size: int) -> AsyncLMStudioClient:
+    async def stream_body() -> AsyncIterator[bytes]:
+        for i in range(0, len(body), read_size):
+            yield body[i:i + read_size]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=stream_body(), headers={"content-type": "text/event-stream"})
+
+    return AsyncLMStudioClient(max_concurrency=0, transport=httpx.MockTransport(handler))
+
+
+async def bench_legacy(client: AsyncLMStudioClient) -> int:
+    """Replica of the previous decoder: str lines, json.loads and parse_obj per chunk."""
+    count = 0
+    async with client._stream("POST", "v1/chat/completions", json_data={"stream": True}) as response:
+        async for line in response.aiter_lines():
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("data: "):
+                line = line[6:]
+            if line == "[DONE]":
+                break
+            StreamedChatCompletionResponse.parse_obj(json.loads(line))
+            count += 1
+    return count
+
+
+async def bench_mode(client: AsyncLMStudioClient, mode: StreamMode) -> int:
+    messages = [ChatMessage(role=ChatRole.USER, content="bench")]
+    count = 0
+    async for _ in client.stream_chat_completion("bench-model", messages, mode=mode):
+        count += 1
+    return count
+
+
+async def main():
+    """Run all scenarios and print chunks per second."""
+    args = parse_args()
+    logging.getLogger("lmstudio_client").setLevel(logging.WARNING)
+    body = build_body(args.chunks)
+    client = make_client(body, args.read_size)
+
+    scenarios = {
+        "legacy lines + parse_obj": lambda: bench_legacy(client),
+        "mode=model": lambda: bench_mode(client, StreamMode.MODEL),
+        "mode=dict": lambda: bench_mode(client, StreamMode.DICT),
+        "mode=content": lambda: bench_mode(client, StreamMode.CONTENT),
+    }
+    results = {}
+    for name, run in scenarios.items():
+        start = time.perf_counter()
+        count = await run()
+        results[name] = count / (time.perf_counter() - start)
+    await client.close()
+
+    parser = "orjson" if lmstudio_client.orjson is not None else "json (install orjson for the fast path)"
+    print(f"\nJSON parser: {parser}")
+    baseline = results["legacy lines + parse_obj"]
+    print(f"{'scenario':<28}{'chunks/s':>12}{'speedup':>10}")
+    for name, rate in results.items():
+        print(f"{name:<28}{rate:>12.0f}{rate / baseline:>9.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
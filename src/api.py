@@ -1,7 +1,11 @@
+import asyncio
+import json
 import logging
+import math
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException
-from typing import Dict, Any
+from fastapi import FastAPI, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, AsyncIterator
 from typing import List
 
 # Longin Core Imports
@@ -14,6 +18,8 @@ from longin_core.mcp import MCPServer
 # New imports for Mini-agents functionality
 from longin_core.agents.mini_agent import MiniAgent
 from longin_core.learning_flow.runner import FlowDuration
+from longin_core.learning_flow.scheduler import TrainingScheduler
+from longin_core.lmstudio.client import LMStudioCircuitOpenError, RequestPriority, StreamMode
 
 # --- Global State & Configuration ---
 # In a real application, this would come from a config file (e.g., .env, config.yaml)
@@ -35,15 +41,140 @@ config: Dict[str, Any] = {
             "host": "localhost",
         },
     },
+    "lmstudio": {
+        "host": "http://localhost:1234",
+        # Requests (and open streams) in flight against the backend; the rest queue FIFO
+        "max_concurrency": 4,
+        "max_connections": 10,
+        "max_keepalive_connections": 10,
+        "keepalive_expiry": 60.0,
+        "read_timeout": 300.0,
+        # Concurrent identical chat completions share one upstream request
+        "coalesce": True,
+        # Micro-batching scheduler: collect chat completions for this many seconds, then
+        # dispatch interactive before background work, round-robin across agents
+        "batch_window": 0.01,
+        # Merge sampled requests into one `n` call; only if the backend honors `n`
+        "batch_n": False,
+        # Idempotent calls are retried with exponential backoff (plus jitter)
+        "max_retries": 2,
+        "backoff_base": 0.25,
+        # Send a second copy of a call slower than the recent p95 (doubles load on the backend)
+        "hedge": False,
+        # Fail fast after this many consecutive backend failures, probe again after the timeout
+        "breaker_failure_threshold": 5,
+        "breaker_reset_timeout": 30.0,
+        # Models are loaded on demand; least recently used ones are unloaded to
+        # keep the estimated footprint (file size x size_overhead) within budget
+        "residency": {
+            "enabled": True,
+            "memory_budget_gb": 8,
+            "size_overhead": 1.2,
+            # A failed load (e.g. no load endpoint) is retried after this many
+            # seconds; requests meanwhile go to LM Studio as they are
+            "load_retry_interval": 60.0,
+            # Models of the most used agents loaded at startup
+            "preload": 2,
+        },
+        # Deterministic completions (temperature 0 or seeded) are served from cache
+        "cache": {
+            "enabled": True,
+            "max_entries": 1024,
+            "ttl": 3600.0,
+            "redis_tier": True,
+        },
+    },
     "mcp_server": {
         "host": "0.0.0.0",
         "port": 50051,
         "plugin_dir": "src/longin_core/mcp/plugins",
     },
-    "event_bus": {},
+    "event_bus": {
+        # "topic" keeps one ordered dispatch lane per topic, "subscriber" one per callback
+        "dispatch_mode": "topic",
+        "max_concurrency": 32,
+        "worker_idle_timeout": 30.0,
+        # Bounded per-topic queues: block | drop_oldest | drop_newest | coalesce
+        "queue_capacity": 10000,
+        "overflow_policy": "block",
+        # Handlers running longer than this (seconds) are logged as slow, see /metrics
+        "slow_handler_threshold": 1.0,
+        "topics": {
+            # Latency-critical topics may set "inline": True to skip the queue hop;
+            # their handlers then run in the publisher's task.
+            # Only the latest metrics of every training run are worth delivering
+            "training_metrics_update.#": {
+                "capacity": 1000,
+                "overflow_policy": "coalesce",
+                "coalesce_key": "run_id",
+            },
+        },
+        # Durable, replayable log of the training events (group-committed fsync)
+        "event_log": {
+            "enabled": True,
+            "path": "./data/event_log",
+            "topics": ["training_state_update.#", "training_metrics_update.#"],
+            "commit_interval": 0.005,
+            "segment_bytes": 64 * 1024 * 1024,
+            "retention_segments": 16,
+        },
+        # Cross-process delivery over Redis Streams (uses the redis_store URL).
+        # Set "type" to "redis_streams" to enable; nodes sharing a "group"
+        # split the messages instead of each receiving all of them.
+        "transport": {
+            "type": None,
+            "stream": "longin:event_bus",
+            "topics": ["training_state_update.#", "training_metrics_update.#"],
+        },
+    },
+    # -----------------------------------------------------------------
+    # Inference backends                                               #
+    # -----------------------------------------------------------------
+    # Mini-agents use "default_backend" unless their entry sets "backend".
+    # "llama_cpp" runs the GGUF files in-process (needs llama-cpp-python)
+    # and skips the HTTP hop to LM Studio on co-located deployments.
+    "inference": {
+        "default_backend": "lm_studio",
+        "llama_cpp": {
+            "n_threads": 4,
+            "n_ctx": 2048,
+            "max_workers": 2,
+            "max_loaded_models": 1,
+        },
+        # Chat history is trimmed to fit the model's context window (tokens
+        # counted with tiktoken, an estimate for Llama-family vocabularies).
+        # Mini-agent entries override these limits with their own "prompt".
+        "prompt": {
+            "context_window": 2048,
+            "max_completion_tokens": 256,
+            "safety_margin": 0.1,
+            # After a cut keep 75 % of the budget, so the following turns extend
+            # the same prefix and the backend can reuse its cached KV state
+            "trim_target": 0.75,
+        },
+    },
+    # -----------------------------------------------------------------
+    # Training job scheduler                                           #
+    # -----------------------------------------------------------------
+    # POST /agents/{id}/train queues a job. Jobs start by priority when a
+    # slot is free and the machine has CPU/RAM headroom; a higher-priority
+    # job preempts a running one (SIGINT, state saved, job re-queued).
+    "training": {
+        "queue_path": "data/training_jobs.json",
+        "max_concurrent_jobs": 1,
+        "max_cpu_percent": 85.0,
+        "min_available_memory_gb": 4.0,
+        "poll_interval": 5.0,
+    },
     # -----------------------------------------------------------------
     # Mini-agent configuration                                         #
     # -----------------------------------------------------------------
+    # Agent state (statistics, memory) is written behind: changes are
+    # batched and agent_state.json is replaced atomically at most once per
+    # flush_interval seconds, and on shutdown.
+    "mini_agent_state": {
+        "flush_interval": 5.0,
+    },
     # Each entry defines one autonomous fine-tuning agent that will be
     # loaded by CoreOrchestrator on startup.  Paths assume the download
     # scripts place models/datasets in the shown locations – adjust as
@@ -54,30 +185,35 @@ config: Dict[str, Any] = {
             "name": "chat_cz",
             "model_path": "data/models/agent_0/tinyllama-1.1b-chat-v1.0.Q2_K.gguf",
             "dataset_path": "data/datasets/0.jsonl",
+            "prompt": {"context_window": 2048},
         },
         {
             "id": 1,
             "name": "math_master",
             "model_path": "data/models/agent_1/phi-2.Q2_K.gguf",
             "dataset_path": "data/datasets/1.jsonl",
+            "prompt": {"context_window": 2048},
         },
         {
             "id": 2,
             "name": "code_guru",
             "model_path": "data/models/agent_2/codellama-7b-instruct.Q2_K.gguf",
             "dataset_path": "data/datasets/2.jsonl",
+            "prompt": {"context_window": 4096},
         },
         {
             "id": 3,
             "name": "context_orchestrator",
             "model_path": "data/models/agent_3/mistral-7b-instruct-v0.2.Q2_K.gguf",
             "dataset_path": "data/datasets/3.jsonl",
+            "prompt": {"context_window": 8192},
         },
         {
             "id": 4,
             "name": "health_qa",
             "model_path": "data/models/agent_4/gemma-2b-it.Q2_K.gguf",
             "dataset_path": "data/datasets/4.jsonl",
+            "prompt": {"context_window": 8192},
         },
     ],
     "agents": {
@@ -165,6 +301,34 @@ async def get_system_status() -> Dict[str, Any]:
     }
 
 
+@app.get("/metrics", tags=["System"])
+async def get_metrics() -> Dict[str, Any]:
+    """
+    Returns event bus instrumentation: per-topic queue depth and enqueue-to-dispatch
+    latency, and per-subscriber handler time (p50/p95/p99), error and slow-call counts.
+    Also includes LM Studio client counters (concurrency limiter, response cache),
+    model residency (resident models, loads, evictions), per-agent prompt
+    budgets (trimmed history, token cache) and the training job scheduler.
+    """
+    orchestrator: CoreOrchestrator = app_state.get("orchestrator")
+    if not orchestrator:
+        return {"status": "error", "message": "Orchestrator not initialized."}
+    metrics = {"event_bus": orchestrator.event_bus.get_metrics()}
+    if orchestrator.lmstudio_client is not None:
+        metrics["lmstudio"] = orchestrator.lmstudio_client.get_stats()
+    if orchestrator.model_manager is not None:
+        metrics["lmstudio"]["residency"] = orchestrator.model_manager.get_stats()
+    metrics["inference_backends"] = {
+        name: await backend.get_status() for name, backend in orchestrator.inference_backends.items()
+    }
+    if orchestrator.training_scheduler is not None:
+        metrics["training"] = orchestrator.training_scheduler.get_stats()
+    metrics["prompts"] = {
+        agent_id: agent.prompt_builder.get_stats() for agent_id, agent in orchestrator.mini_agents.items()
+    }
+    return metrics
+
+
 # --------------------------------------------------------------------------- #
 #   FRTDSD Cycle Endpoints                                                    #
 # --------------------------------------------------------------------------- #
@@ -202,10 +366,11 @@ async def start_frtdsd_cycle(request: FRTDSDRequest) -> Dict[str, Any]:
         return {"status": "error", "message": "CodingFlowBossAgent not available."}
 
     # Fire-and-forget launch of the cycle; it runs asynchronously
-    await boss.start_frtdsd_cycle(request.task_description)
+    cycle_id = await boss.start_frtdsd_cycle(request.task_description)
 
     return {
         "status": "started",
+        "cycle_id": cycle_id,
         "task_description": request.task_description,
         "message": "FRTDSD cycle has been initiated.",
     }
@@ -233,6 +398,7 @@ class TrainingRequest(BaseModel):
         description="Training duration. One of: 1h, 2h, 6h, 12h, 24h",
         examples=["1h"],
     )
+    priority: int = Field(0, description="Higher runs first and may preempt lower-priority running jobs")
 
 
 class ChatMessageModel(BaseModel):
@@ -245,7 +411,10 @@ class ChatRequest(BaseModel):
     messages: List[ChatMessageModel]
     temperature: float | None = Field(0.7, ge=0.0, le=2.0)
     top_p: float | None = Field(1.0, ge=0.0, le=1.0)
-    max_tokens: int | None = None
+    max_tokens: int | None = Field(None, ge=1)
+    priority: RequestPriority = RequestPriority.INTERACTIVE
+    # Keeps the trimmed history of a long conversation stable across turns
+    conversation_id: str | None = None
 
 
 # --------------------------- Helper functions ------------------------------ #
@@ -275,6 +444,59 @@ def _get_agent(agent_id: int) -> MiniAgent | None:
     return agents_registry.get(str_id)  # type: ignore[attr-defined]
 
 
+def _get_training_scheduler() -> TrainingScheduler:
+    """Helper to fetch the training job scheduler, 503 while it is not running."""
+    orch = _get_orchestrator()
+    scheduler = getattr(orch, "training_scheduler", None)
+    if scheduler is None:
+        raise HTTPException(status_code=503, detail="Training scheduler not running")
+    return scheduler
+
+
+def _chat_kwargs(request: ChatRequest) -> Dict[str, Any]:
+    return {
+        "temperature": request.temperature,
+        "top_p": request.top_p,
+        "max_tokens": request.max_tokens,
+        "conversation_id": request.conversation_id,
+    }
+
+
+class _SSEResponse(StreamingResponse):
+    """
+    Streaming response that always closes its body iterator, so a client
+    disconnect closes the upstream LM Studio stream instead of leaving it
+    generating until garbage collection.
+    """
+
+    media_type = "text/event-stream"
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.body_iterator.aclose()
+
+
+async def _sse_chat_events(agent: MiniAgent, request: ChatRequest) -> AsyncIterator[str]:
+    """
+    Yield Server-Sent Events for a streamed chat. The next delta is only pulled
+    from upstream once the previous one was handed to the client (backpressure).
+    """
+    upstream = agent.stream_chat(
+        [msg.dict() for msg in request.messages], mode=StreamMode.DICT, **_chat_kwargs(request)
+    )
+    try:
+        async for chunk in upstream:
+            yield f"data: {json.dumps(chunk)}\n\n"
+        yield "data: [DONE]\n\n"
+    except Exception as exc:
+        logger.exception("Chat stream failed")
+        yield f"event: error\ndata: {json.dumps({'message': str(exc)})}\n\n"
+    finally:
+        await upstream.aclose()
+
+
 # --------------------------- API Endpoints --------------------------------- #
 
 
@@ -307,19 +529,95 @@ async def get_agent(agent_id: int):
     )
 
 
-@app.post("/agents/{agent_id}/train", tags=["Agents"])
+@app.get("/agents/{agent_id}/training-runs", tags=["Agents"])
+async def list_training_runs(
+    agent_id: int,
+    limit: int = Query(20, ge=1, le=200),
+    before: int | None = Query(None, description="next_before cursor of the previous page"),
+):
+    """Page through an agent's training runs, newest first."""
+    agent = _get_agent(agent_id)
+    if not agent:
+        raise HTTPException(status_code=404, detail="Agent not found")
+
+    page = await agent.get_training_runs(limit=limit, before=before)
+    return {**page, "total": agent.statistics.get("training_run_count", 0)}
+
+
+@app.post("/agents/{agent_id}/train", status_code=202, tags=["Agents"])
 async def train_agent(agent_id: int, request: TrainingRequest):
-    """Start a training flow for the specified agent."""
+    """
+    Queue a training run for the specified agent. Returns the job id at once;
+    poll ``/training-jobs/{job_id}`` or stream ``/training-jobs/{job_id}/events``.
+    """
     agent = _get_agent(agent_id)
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
 
-    try:
-        results = await agent.train(request.duration)
-        return {"status": "ok", "results": results}
-    except Exception as exc:
-        logger.exception("Training failed")
-        return {"status": "error", "message": str(exc)}
+    job = await _get_training_scheduler().submit(agent.id, request.duration, priority=request.priority)
+    return {"status": "queued", "job_id": job.job_id, "job": job.to_dict()}
+
+
+@app.get("/training-jobs", tags=["Training"])
+async def list_training_jobs(agent_id: int | None = None):
+    """List training jobs, queued ones first in the order they will start."""
+    return [job.to_dict() for job in _get_training_scheduler().list_jobs(agent_id)]
+
+
+@app.get("/training-jobs/{job_id}", tags=["Training"])
+async def get_training_job(job_id: str):
+    """Get the state and latest progress of a training job."""
+    job = _get_training_scheduler().get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    return job.to_dict()
+
+
+@app.get("/training-jobs/{job_id}/metrics", tags=["Training"])
+async def get_training_job_metrics(
+    job_id: str,
+    resolution: int = Query(500, ge=0, le=100_000, description="Points of the training curve, 0 for full resolution"),
+):
+    """Get the loss curve and evaluations of a training job, downsampled to a resolution."""
+    scheduler = _get_training_scheduler()
+    if not scheduler.get_job(job_id):
+        raise HTTPException(status_code=404, detail="Training job not found")
+    if 0 < resolution < 3:
+        raise HTTPException(status_code=422, detail="Resolution must be 0 or at least 3")
+
+    history = await scheduler.get_job_metrics(job_id, resolution or None)
+    if history is None:
+        raise HTTPException(status_code=404, detail="No metrics recorded for this training job")
+    return {"job_id": job_id, **history}
+
+
+@app.delete("/training-jobs/{job_id}", tags=["Training"])
+async def cancel_training_job(job_id: str):
+    """Cancel a queued or running training job (a running one saves its state first)."""
+    scheduler = _get_training_scheduler()
+    if not scheduler.get_job(job_id):
+        raise HTTPException(status_code=404, detail="Training job not found")
+    if not await scheduler.cancel(job_id):
+        raise HTTPException(status_code=409, detail="Training job already finished")
+    return {"status": "canceling", "job_id": job_id}
+
+
+@app.get("/training-jobs/{job_id}/events", tags=["Training"])
+async def stream_training_job(job_id: str):
+    """Stream a training job's state and progress as Server-Sent Events until it finishes."""
+    scheduler = _get_training_scheduler()
+    if not scheduler.get_job(job_id):
+        raise HTTPException(status_code=404, detail="Training job not found")
+
+    async def events() -> AsyncIterator[str]:
+        updates = scheduler.watch(job_id)
+        try:
+            async for snapshot in updates:
+                yield f"data: {json.dumps(snapshot, default=str)}\n\n"
+        finally:
+            await updates.aclose()
+
+    return _SSEResponse(events())
 
 
 @app.post("/agents/{agent_id}/chat", tags=["Agents"])
@@ -335,13 +633,108 @@ async def chat_with_agent(agent_id: int, request: ChatRequest):
             temperature=request.temperature,
             top_p=request.top_p,
             max_tokens=request.max_tokens,
+            priority=request.priority,
+            conversation_id=request.conversation_id,
         )
         return response
+    except LMStudioCircuitOpenError as exc:
+        raise HTTPException(
+            status_code=503, detail=str(exc), headers={"Retry-After": str(math.ceil(exc.retry_after))}
+        )
     except Exception as exc:
         logger.exception("Chat failed")
         return {"status": "error", "message": str(exc)}
 
 
+@app.post("/agents/{agent_id}/chat/stream", tags=["Agents"])
+async def stream_chat_with_agent(agent_id: int, request: ChatRequest):
+    """
+    Stream the agent's response as Server-Sent Events, one
+    ``StreamedChatCompletionResponse`` per ``data:`` line, ending with ``[DONE]``.
+    Disconnecting cancels the upstream request.
+    """
+    agent = _get_agent(agent_id)
+    if not agent:
+        raise HTTPException(status_code=404, detail="Agent not found")
+
+    return _SSEResponse(
+        _sse_chat_events(agent, request),
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.websocket("/agents/{agent_id}/chat/ws")
+async def chat_with_agent_ws(websocket: WebSocket, agent_id: int):
+    """
+    Stream chats over a WebSocket. Each ``ChatRequest`` JSON message is answered
+    with ``{"type": "delta", "data": ...}`` messages followed by ``{"type": "done"}``.
+    Any message sent while a response is streaming cancels it (answered with
+    ``{"type": "cancelled"}``); closing the socket cancels the upstream request.
+    """
+    agent = _get_agent(agent_id)
+    if not agent:
+        await websocket.close(code=4404, reason="Agent not found")
+        return
+    await websocket.accept()
+
+    # A single reader, so client messages (and the disconnect) are seen while streaming
+    incoming: asyncio.Queue = asyncio.Queue()
+
+    async def read() -> None:
+        try:
+            while True:
+                await incoming.put(await websocket.receive_text())
+        except WebSocketDisconnect:
+            await incoming.put(None)
+
+    async def forward(request: ChatRequest) -> None:
+        upstream = agent.stream_chat(
+            [msg.dict() for msg in request.messages], mode=StreamMode.DICT, **_chat_kwargs(request)
+        )
+        try:
+            async for chunk in upstream:
+                # send_json() waits for the socket, which throttles the upstream reads
+                await websocket.send_json({"type": "delta", "data": chunk})
+            await websocket.send_json({"type": "done"})
+        finally:
+            await upstream.aclose()
+
+    reader = asyncio.create_task(read())
+    raw = await incoming.get()
+    try:
+        while raw is not None:
+            try:
+                request = ChatRequest(**json.loads(raw))
+            except Exception as exc:
+                await websocket.send_json({"type": "error", "message": f"Invalid chat request: {exc}"})
+                raw = await incoming.get()
+                continue
+
+            stream = asyncio.create_task(forward(request))
+            next_message = asyncio.create_task(incoming.get())
+            await asyncio.wait({stream, next_message}, return_when=asyncio.FIRST_COMPLETED)
+            if not stream.done():
+                stream.cancel()
+                await asyncio.gather(stream, return_exceptions=True)
+                raw = next_message.result()
+                if raw is not None:
+                    await websocket.send_json({"type": "cancelled"})
+                    raw = await incoming.get()
+                continue
+            error = stream.exception()
+            if isinstance(error, WebSocketDisconnect):
+                break
+            if error is not None:
+                logger.error(f"Chat stream failed: {error}")
+                await websocket.send_json({"type": "error", "message": str(error)})
+            raw = await next_message
+    except WebSocketDisconnect:
+        pass
+    finally:
+        reader.cancel()
+        await asyncio.gather(reader, return_exceptions=True)
+
+
 @app.get("/agents/{agent_id}/status", tags=["Agents"])
 async def get_agent_status(agent_id: int):
     """Return current statistics/state for the agent."""
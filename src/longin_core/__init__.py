@@ -6,9 +6,13 @@ Longin Core - Hlavní balíček pro aplikaci Longin AI Systems.
 __version__ = "0.1.0"
 
 # Public exports
-from .event_bus import LONGINEventBus
+from .event_bus import LONGINEventBus, OverflowPolicy, EventBusRequestError, EventBusNoResponderError, EventBusOverflowError
+from .event_transport import EventBusTransport, RedisStreamsTransport
+from .event_log import EventLog
 # Storage layer exports
 from .storage import StorageManager, StorageType
+# Inference backend exports
+from .adapters import LMStudioAdapter, LlamaCppAdapter
 # Orchestrator export
 from .orchestrator import CoreOrchestrator
 # Agents exports
@@ -27,9 +31,19 @@ __all__ = [
     "__version__",
     # Event bus
     "LONGINEventBus",
+    "OverflowPolicy",
+    "EventBusRequestError",
+    "EventBusNoResponderError",
+    "EventBusOverflowError",
+    "EventBusTransport",
+    "RedisStreamsTransport",
+    "EventLog",
     # Storage
     "StorageManager",
     "StorageType",
+    # Inference backends
+    "LMStudioAdapter",
+    "LlamaCppAdapter",
     # Orchestrator
     "CoreOrchestrator",
     # Agents
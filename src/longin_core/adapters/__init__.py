@@ -0,0 +1,4 @@
+from .lmstudio_adapter import LMStudioAdapter
+from .llama_cpp_adapter import LlamaCppAdapter
+
+__all__ = ["LMStudioAdapter", "LlamaCppAdapter"]
@@ -0,0 +1,232 @@
+import logging
+import asyncio
+import glob
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from ..base import LonginAdapter
+from ..lmstudio.client import StreamMode, convert_stream_chunks
+
+try:
+    from llama_cpp import Llama  # type: ignore
+except ImportError:  # Graceful degradation – will be logged in connect()
+    Llama = None  # pytype: disable=annotation-type-mismatch
+
+# Generation parameters passed on to llama-cpp-python; scheduling hints of the
+# HTTP client (agent_id, priority, ...) are dropped
+_GENERATION_PARAMS = frozenset({
+    "temperature", "top_p", "top_k", "min_p", "max_tokens", "stop", "seed",
+    "presence_penalty", "frequency_penalty", "repeat_penalty",
+})
+_END = object()
+
+
+class LlamaCppAdapter(LonginAdapter):
+    """
+    In-process inference backend running GGUF models with llama-cpp-python.
+    Removes the HTTP hop to LM Studio for agents co-located with their model.
+
+    Generation is CPU bound and blocking, so it runs in a dedicated thread pool
+    (``max_workers`` threads, each model using ``n_threads`` CPU threads). A model
+    instance is not thread safe: calls to the same model are serialized, while
+    different models can generate in parallel. At most ``max_loaded_models`` stay
+    in memory, the least recently used is released first.
+
+    Inferenční backend běžící v procesu, který spouští modely GGUF pomocí
+    llama-cpp-python. Odstraňuje HTTP skok do LM Studia pro agenty umístěné
+    u svého modelu.
+
+    Generování je vázané na CPU a blokující, proto běží ve vyhrazeném fondu
+    vláken (``max_workers`` vláken, každý model používá ``n_threads`` vláken CPU).
+    Instance modelu není bezpečná pro vlákna: volání téhož modelu jsou
+    serializována, různé modely mohou generovat souběžně. V paměti zůstává
+    nejvýše ``max_loaded_models`` modelů, nejdéle nepoužitý se uvolní jako první.
+    """
+
+    def __init__(
+        self,
+        adapter_id: str,
+        config: dict,
+        logger: logging.Logger,
+        model_factory: Optional[Callable[..., Any]] = None,
+    ):
+        """
+        Initializes the llama.cpp adapter. Models are loaded on first use.
+
+        Args:
+            adapter_id (str): Unique identifier for the adapter.
+            config (dict): Adapter configuration. Recognised keys: ``n_threads``,
+                ``n_ctx``, ``n_gpu_layers``, ``max_workers``, ``max_loaded_models``
+                and ``model_glob`` (files reported by list_models()).
+            logger (logging.Logger): Logger instance for the adapter.
+            model_factory (Optional[Callable[..., Any]]): Builds a model from
+                ``(model_path=..., **options)``; defaults to ``llama_cpp.Llama``.
+
+        Inicializuje adaptér llama.cpp. Modely se načítají při prvním použití.
+
+        Argumenty:
+            adapter_id (str): Unikátní identifikátor adaptéru.
+            config (dict): Konfigurace adaptéru. Podporované klíče: ``n_threads``,
+                ``n_ctx``, ``n_gpu_layers``, ``max_workers``, ``max_loaded_models``
+                a ``model_glob`` (soubory vrácené z list_models()).
+            logger (logging.Logger): Instance loggeru pro adaptér.
+            model_factory (Optional[Callable[..., Any]]): Vytvoří model z
+                ``(model_path=..., **options)``; výchozí je ``llama_cpp.Llama``.
+        """
+        super().__init__(adapter_id, "llama_cpp", config, logger)
+        self.model_factory = model_factory or Llama
+        self.n_threads: int = int(config.get("n_threads") or os.cpu_count() or 1)
+        self.model_options: Dict[str, Any] = {
+            "n_threads": self.n_threads,
+            "n_ctx": int(config.get("n_ctx", 2048)),
+            "n_gpu_layers": int(config.get("n_gpu_layers", 0)),
+            "verbose": False,
+        }
+        self.max_loaded_models: int = int(config.get("max_loaded_models", 1))
+        self.model_glob: str = config.get("model_glob", "data/models/agent_*/*.gguf")
+        self._executor = ThreadPoolExecutor(
+            max_workers=int(config.get("max_workers", 2)), thread_name_prefix=f"llama-{adapter_id}"
+        )
+        # model path -> (model, lock serializing its calls), least recently used first
+        self._models: "OrderedDict[str, Tuple[Any, threading.Lock]]" = OrderedDict()
+        self._loading: Dict[str, asyncio.Future] = {}
+        self.generations = 0
+
+    async def connect(self) -> bool:
+        if self.model_factory is None:
+            self.logger.error("llama-cpp-python not available. Install via `pip install llama-cpp-python`.")
+            return False
+        return True
+
+    async def list_models(self) -> List[Dict[str, Any]]:
+        paths = set(glob.glob(self.model_glob)) | set(self._models)
+        return [
+            {"id": path, "object": "model", "owned_by": "llama_cpp", "loaded": path in self._models}
+            for path in sorted(paths)
+        ]
+
+    async def generate_completion(self, model_id: str, prompt: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        completion = await self._run(model_id, "create_completion", prompt=prompt, **self._params(params))
+        return {**completion, "text": completion["choices"][0]["text"]}
+
+    async def chat_completion(
+        self, model_id: str, messages: List[Dict[str, Any]], params: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        return await self._run(model_id, "create_chat_completion", messages=messages, **self._params(params))
+
+    async def stream_chat_completion(
+        self, model_id: str, messages: List[Dict[str, Any]], params: Dict[str, Any]
+    ) -> AsyncIterator[Any]:
+        """
+        Streams a chat completion. Tokens are generated in a pool thread and
+        handed over through a bounded queue; closing the iterator stops the
+        generation after the current token.
+
+        Streamuje chatovou odpověď. Tokeny se generují ve vlákně fondu a předávají
+        přes omezenou frontu; uzavření iterátoru zastaví generování po aktuálním tokenu.
+        """
+        mode = StreamMode(params.get("mode", StreamMode.MODEL))
+        model, lock = await self._get_model(model_id)
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=64)
+        stop = threading.Event()
+        options = self._params(params)
+
+        def put(item: Any) -> None:
+            # Blocks the generating thread while the consumer lags behind (backpressure)
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        def produce() -> None:
+            try:
+                with lock:
+                    for chunk in model.create_chat_completion(messages=messages, stream=True, **options):
+                        if stop.is_set():
+                            break
+                        put(chunk)
+            except Exception as e:
+                put(e)
+            finally:
+                if not stop.is_set():
+                    put(_END)
+
+        producer = loop.run_in_executor(self._executor, produce)
+        try:
+            while True:
+                item = await queue.get()
+                if item is _END:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                for converted in convert_stream_chunks([item], mode):
+                    yield converted
+            self.generations += 1
+        finally:
+            stop.set()
+            # Unblock a producer waiting on the full queue so the thread can finish
+            while not queue.empty():
+                queue.get_nowait()
+            await asyncio.gather(producer, return_exceptions=True)
+
+    async def get_status(self) -> Dict[str, Any]:
+        return {
+            "adapter_id": self.adapter_id,
+            "provider_type": self.provider_type,
+            "available": self.model_factory is not None,
+            "loaded_models": list(self._models),
+            "n_threads": self.n_threads,
+            "generations": self.generations,
+        }
+
+    async def close(self) -> None:
+        self._models.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _params(params: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in params.items() if key in _GENERATION_PARAMS and value is not None}
+
+    async def _run(self, model_id: str, method: str, **kwargs: Any) -> Dict[str, Any]:
+        model, lock = await self._get_model(model_id)
+
+        def call() -> Dict[str, Any]:
+            with lock:
+                return getattr(model, method)(**kwargs)
+
+        result = await asyncio.get_running_loop().run_in_executor(self._executor, call)
+        self.generations += 1
+        return result
+
+    async def _get_model(self, model_path: str) -> Tuple[Any, threading.Lock]:
+        """
+        Returns a loaded model, loading it in the thread pool on first use.
+        Concurrent callers share one load.
+
+        Vrátí načtený model, při prvním použití ho načte ve fondu vláken.
+        Souběžní volající sdílejí jedno načtení.
+        """
+        entry = self._models.get(model_path)
+        if entry is not None:
+            self._models.move_to_end(model_path)
+            return entry
+        if self.model_factory is None:
+            raise RuntimeError("llama-cpp-python not available. Install via `pip install llama-cpp-python`.")
+
+        load = self._loading.get(model_path)
+        if load is None:
+            load = self._loading[model_path] = asyncio.ensure_future(self._load(model_path))
+            load.add_done_callback(lambda _: self._loading.pop(model_path, None))
+        return await asyncio.shield(load)
+
+    async def _load(self, model_path: str) -> Tuple[Any, threading.Lock]:
+        self.logger.info(f"Loading GGUF model '{model_path}' with {self.n_threads} threads...")
+        model = await asyncio.get_running_loop().run_in_executor(
+            self._executor, lambda: self.model_factory(model_path=model_path, **self.model_options)
+        )
+        while len(self._models) >= max(1, self.max_loaded_models):
+            evicted, _ = self._models.popitem(last=False)
+            self.logger.info(f"Released least recently used model '{evicted}'.")
+        entry = self._models[model_path] = (model, threading.Lock())
+        return entry
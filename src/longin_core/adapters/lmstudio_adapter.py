@@ -0,0 +1,111 @@
+import logging
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from ..base import LonginAdapter
+from ..lmstudio.client import AsyncLMStudioClient, ChatMessage, ChatRole
+
+
+class LMStudioAdapter(LonginAdapter):
+    """
+    Inference backend that sends requests over HTTP to an LM Studio server
+    through a (usually shared) AsyncLMStudioClient, so pooling, caching,
+    scheduling and retries of the client apply.
+
+    Inferenční backend, který posílá požadavky přes HTTP na server LM Studio
+    pomocí (obvykle sdíleného) AsyncLMStudioClient, takže se uplatní sdílení
+    spojení, cache, plánování i opakování pokusů klienta.
+    """
+
+    def __init__(
+        self,
+        adapter_id: str,
+        config: dict,
+        logger: logging.Logger,
+        client: Optional[AsyncLMStudioClient] = None,
+    ):
+        """
+        Initializes the LM Studio adapter.
+
+        Args:
+            adapter_id (str): Unique identifier for the adapter.
+            config (dict): Adapter configuration; ``host`` and ``api_key`` are used
+                when no client is given.
+            logger (logging.Logger): Logger instance for the adapter.
+            client (Optional[AsyncLMStudioClient]): Client to wrap, e.g. the orchestrator's shared one.
+
+        Inicializuje adaptér LM Studio.
+
+        Argumenty:
+            adapter_id (str): Unikátní identifikátor adaptéru.
+            config (dict): Konfigurace adaptéru; ``host`` a ``api_key`` se použijí,
+                pokud není předán klient.
+            logger (logging.Logger): Instance loggeru pro adaptér.
+            client (Optional[AsyncLMStudioClient]): Obalovaný klient, např. sdílený klient orchestrátoru.
+        """
+        super().__init__(adapter_id, "lm_studio", config, logger)
+        self._owns_client = client is None
+        self.client = client or AsyncLMStudioClient(
+            base_url=config.get("host", "http://localhost:1234"), api_key=config.get("api_key")
+        )
+
+    @staticmethod
+    def _model_id(model_id: str) -> str:
+        # Agents configure model paths, LM Studio knows the models by file name
+        return os.path.basename(model_id)
+
+    async def connect(self) -> bool:
+        try:
+            await self.client.get_models()
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to connect to LM Studio at {self.client.base_url}: {e}")
+            return False
+
+    async def list_models(self) -> List[Dict[str, Any]]:
+        models = await self.client.get_models()
+        return [model.dict() for model in models.data]
+
+    async def generate_completion(self, model_id: str, prompt: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        response = await self.chat_completion(model_id, [{"role": "user", "content": prompt}], params)
+        return {**response, "text": response["choices"][0]["message"]["content"]}
+
+    async def chat_completion(
+        self, model_id: str, messages: List[Dict[str, Any]], params: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        response = await self.client.create_chat_completion(
+            model=self._model_id(model_id), messages=self._chat_messages(messages), **params
+        )
+        return response.dict()
+
+    async def stream_chat_completion(
+        self, model_id: str, messages: List[Dict[str, Any]], params: Dict[str, Any]
+    ) -> AsyncIterator[Any]:
+        stream = self.client.stream_chat_completion(
+            model=self._model_id(model_id), messages=self._chat_messages(messages), **params
+        )
+        try:
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+
+    async def get_status(self) -> Dict[str, Any]:
+        return {
+            "adapter_id": self.adapter_id,
+            "provider_type": self.provider_type,
+            "base_url": self.client.base_url,
+            **self.client.get_stats(),
+        }
+
+    async def close(self) -> None:
+        if self._owns_client:
+            await self.client.close()
+
+    @staticmethod
+    def _chat_messages(messages: List[Dict[str, Any]]) -> List[ChatMessage]:
+        return [
+            ChatMessage(role=ChatRole(message["role"]), content=message["content"], name=message.get("name"))
+            for message in messages
+        ]
+
@@ -1,7 +1,9 @@
 import logging
 import asyncio
+import uuid
+from collections import OrderedDict
 from typing import Dict, Any, List, Optional
-from ..event_bus import LONGINEventBus
+from ..event_bus import LONGINEventBus, EventBusNoResponderError
 
 
 class CodingFlowBossAgent:
@@ -37,173 +39,173 @@ class CodingFlowBossAgent:
         self.logger = logger
         self.event_bus = event_bus
         self.mcp_client = mcp_client
-        # State
-        self.current_task: Optional[str] = None
-        self.current_state = "idle"
+        # Seconds each phase may take before the cycle is failed
+        self.phase_timeout: float = float(config.get("phase_timeout", 300.0))
+        # Finished cycles kept for get_cycle(), the oldest ones are evicted
+        self.max_finished_cycles: int = int(config.get("max_finished_cycles", 100))
+        # State of every cycle, keyed by cycle id in start order – cycles run independently of each other
+        self.cycles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._cycle_tasks: Dict[str, asyncio.Task] = {}
         self.logger.info("CodingFlowBossAgent initialized.")
 
         # Topic names – single source of truth
         self.TOPICS = {
             "context_request": "context_request",
-            "context_result": "context_result",
             "test_request": "test_request",
-            "test_result": "test_result",
             "code_request": "code_request",
-            "code_result": "code_result",
             "visual_validation_request": "visual_validation_request",
-            "visual_validation_result": "visual_validation_result",
             "success_monitoring_request": "success_monitoring_request",
-            "success_monitoring_result": "success_monitoring_result",
         }
 
-        # Register to listen for downstream results
-        asyncio.create_task(self._register_subscriptions())
-
-    async def _register_subscriptions(self) -> None:
-        """Subscribe to result topics so we receive callbacks during the cycle."""
-        await self.event_bus.subscribe(
-            self.TOPICS["context_result"], self.handle_context_result, "coding_flow_boss"
-        )
-        await self.event_bus.subscribe(
-            self.TOPICS["test_result"], self.handle_test_result, "coding_flow_boss"
-        )
-        await self.event_bus.subscribe(
-            self.TOPICS["code_result"], self.handle_code_result, "coding_flow_boss"
-        )
-        await self.event_bus.subscribe(
-            self.TOPICS["visual_validation_result"],
-            self.handle_visual_validation_result,
-            "coding_flow_boss",
-        )
-        await self.event_bus.subscribe(
-            self.TOPICS["success_monitoring_result"],
-            self.handle_success_monitoring_result,
-            "coding_flow_boss",
-        )
-
-    async def start_frtdsd_cycle(self, task_description: str):
+    @property
+    def current_state(self) -> str:
+        """
+        Summary state for status reporting: "idle", or the number of running cycles.
+
+        Souhrnný stav pro hlášení stavu: "idle", nebo počet běžících cyklů.
+        """
+        running = len(self._cycle_tasks)
+        return f"running ({running} cycles)" if running else "idle"
+
+    async def start_frtdsd_cycle(self, task_description: str) -> str:
         """
         Starts a new Frontend Ruled Test-Driven Self-Development cycle with the given task description.
         The cycle includes phases like context gathering, test creation, code implementation,
-        visual validation, and success monitoring.
+        visual validation, and success monitoring. Each phase is a request/reply exchange over
+        the event bus, so any number of cycles may run at the same time.
 
         Args:
             task_description (str): Description of the development task to be performed.
 
+        Returns:
+            str: ID of the started cycle, see get_cycle() and cancel_frtdsd_cycle().
+
         Zahájí nový cyklus Frontend Ruled Test-Driven Self-Development se zadaným popisem úkolu.
         Cyklus zahrnuje fáze jako shromažďování kontextu, vytváření testů, implementace kódu,
-        vizuální validace a monitorování úspěchu.
+        vizuální validace a monitorování úspěchu. Každá fáze je výměna požadavek/odpověď přes
+        sběrnici událostí, takže současně může běžet libovolný počet cyklů.
 
         Argumenty:
             task_description (str): Popis vývojového úkolu, který má být proveden.
-        """
-        self.logger.info(f"Starting FRTDSD cycle for task: {task_description}")
-        self.current_task = task_description
-        self.current_state = "context_gathering"
-        
-        # Placeholder for actual implementation
-        self.logger.info("Context gathering phase initiated (placeholder).")
-        # TODO: Implement actual context gathering logic
-        # await self.event_bus.publish("context_request", {"task": task_description}, "coding_flow_boss")
 
-    async def handle_context_result(self, context: Dict[str, Any]):
+        Vrací:
+            str: ID zahájeného cyklu, viz get_cycle() a cancel_frtdsd_cycle().
         """
-        Handles the result of context gathering and proceeds to the test creation phase.
-
-        Args:
-            context (Dict[str, Any]): The gathered context information.
-
-        Zpracuje výsledek shromažďování kontextu a pokračuje do fáze vytváření testů.
-
-        Argumenty:
-            context (Dict[str, Any]): Shromážděné kontextové informace.
+        cycle_id = uuid.uuid4().hex
+        self.logger.info(f"Starting FRTDSD cycle {cycle_id} for task: {task_description}")
+        self.cycles[cycle_id] = {"task": task_description, "state": "context_gathering", "results": {}}
+        task = asyncio.create_task(self._run_cycle(cycle_id))
+        self._cycle_tasks[cycle_id] = task
+        task.add_done_callback(lambda _: self._finish_cycle(cycle_id))
+        return cycle_id
+
+    def _finish_cycle(self, cycle_id: str) -> None:
         """
-        self.logger.info("Context gathering completed (placeholder).")
-        self.current_state = "test_creation"
-        
-        # Placeholder for actual implementation
-        self.logger.info("Test creation phase initiated (placeholder).")
-        # TODO: Implement actual test creation logic
-        # await self.event_bus.publish("test_request", {"task": self.current_task, "context": context}, "coding_flow_boss")
+        Forgets the task of a finished cycle and evicts the oldest finished cycles
+        beyond ``max_finished_cycles``; running cycles are never evicted.
 
-    async def handle_test_result(self, tests: List[Dict[str, Any]]):
+        Zapomene úlohu dokončeného cyklu a odstraní nejstarší dokončené cykly nad
+        ``max_finished_cycles``; běžící cykly nejsou nikdy odstraněny.
         """
-        Handles the created tests and proceeds to the code implementation phase.
+        self._cycle_tasks.pop(cycle_id, None)
+        finished = [cid for cid in self.cycles if cid not in self._cycle_tasks]
+        for cid in finished[:max(0, len(finished) - self.max_finished_cycles)]:
+            del self.cycles[cid]
 
-        Args:
-            tests (List[Dict[str, Any]]): The created test specifications.
-
-        Zpracuje vytvořené testy a pokračuje do fáze implementace kódu.
+    def get_cycle(self, cycle_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the state of a cycle, or None if the cycle is unknown.
 
-        Argumenty:
-            tests (List[Dict[str, Any]]): Specifikace vytvořených testů.
+        Vrátí stav cyklu, nebo None, pokud cyklus není znám.
         """
-        self.logger.info("Test creation completed (placeholder).")
-        self.current_state = "code_implementation"
-        
-        # Placeholder for actual implementation
-        self.logger.info("Code implementation phase initiated (placeholder).")
-        # TODO: Implement actual code implementation logic
-        # await self.event_bus.publish("code_request", {"task": self.current_task, "tests": tests}, "coding_flow_boss")
+        return self.cycles.get(cycle_id)
 
-    async def handle_code_result(self, code: Dict[str, Any]):
+    async def cancel_frtdsd_cycle(self, cycle_id: str) -> bool:
         """
-        Handles the implemented code and proceeds to the visual validation phase.
+        Cancels a running cycle; its outstanding request is abandoned.
 
         Args:
-            code (Dict[str, Any]): The implemented code.
+            cycle_id (str): ID of the cycle to cancel.
+
+        Returns:
+            bool: True if the cycle was running and got cancelled, False otherwise.
 
-        Zpracuje implementovaný kód a pokračuje do fáze vizuální validace.
+        Zruší běžící cyklus; jeho nevyřízený požadavek je opuštěn.
 
         Argumenty:
-            code (Dict[str, Any]): Implementovaný kód.
-        """
-        self.logger.info("Code implementation completed (placeholder).")
-        self.current_state = "visual_validation"
-        
-        # Placeholder for actual implementation
-        self.logger.info("Visual validation phase initiated (placeholder).")
-        # TODO: Implement actual visual validation logic
-        # await self.event_bus.publish("visual_validation_request", {"task": self.current_task, "code": code}, "coding_flow_boss")
+            cycle_id (str): ID cyklu, který má být zrušen.
 
-    async def handle_visual_validation_result(self, validation_result: Dict[str, Any]):
+        Vrací:
+            bool: True, pokud cyklus běžel a byl zrušen, jinak False.
         """
-        Handles the result of visual validation and proceeds to the success monitoring phase.
-
-        Args:
-            validation_result (Dict[str, Any]): The result of visual validation.
-
-        Zpracuje výsledek vizuální validace a pokračuje do fáze monitorování úspěchu.
-
-        Argumenty:
-            validation_result (Dict[str, Any]): Výsledek vizuální validace.
+        task = self._cycle_tasks.get(cycle_id)
+        if task is None:
+            return False
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return True
+
+    async def _run_cycle(self, cycle_id: str) -> None:
         """
-        self.logger.info("Visual validation completed (placeholder).")
-        self.current_state = "success_monitoring"
-        
-        # Placeholder for actual implementation
-        self.logger.info("Success monitoring phase initiated (placeholder).")
-        # TODO: Implement actual success monitoring logic
-        # await self.event_bus.publish("success_monitoring_request", {"task": self.current_task, "validation_result": validation_result}, "coding_flow_boss")
+        Runs the phases of one cycle, each phase feeding its result into the next one.
 
-    async def handle_success_monitoring_result(self, success_result: Dict[str, Any]):
+        Provede fáze jednoho cyklu, výsledek každé fáze je vstupem další fáze.
         """
-        Handles the result of success monitoring and completes the FRTDSD cycle.
-
-        Args:
-            success_result (Dict[str, Any]): The result of success monitoring.
-
-        Zpracuje výsledek monitorování úspěchu a dokončí cyklus FRTDSD.
+        cycle = self.cycles[cycle_id]
+        task = cycle["task"]
+        results = cycle["results"]
+        try:
+            results["context"] = await self._request_phase(
+                cycle, "context_gathering", "context_request", {"task": task}
+            )
+            results["tests"] = await self._request_phase(
+                cycle, "test_creation", "test_request", {"task": task, "context": results["context"]}
+            )
+            results["code"] = await self._request_phase(
+                cycle, "code_implementation", "code_request", {"task": task, "tests": results["tests"]}
+            )
+            results["validation_result"] = await self._request_phase(
+                cycle, "visual_validation", "visual_validation_request", {"task": task, "code": results["code"]}
+            )
+            results["success_result"] = await self._request_phase(
+                cycle,
+                "success_monitoring",
+                "success_monitoring_request",
+                {"task": task, "validation_result": results["validation_result"]},
+            )
+            cycle["state"] = "completed"
+            self.logger.info(f"FRTDSD cycle {cycle_id} completed for task: {task}")
+        except asyncio.CancelledError:
+            cycle["state"] = "cancelled"
+            self.logger.info(f"FRTDSD cycle {cycle_id} cancelled in phase '{cycle.get('phase')}'.")
+            raise
+        except asyncio.TimeoutError:
+            cycle["state"] = "failed"
+            cycle["error"] = f"Phase '{cycle.get('phase')}' timed out after {self.phase_timeout}s."
+            self.logger.error(f"FRTDSD cycle {cycle_id}: {cycle['error']}")
+        except Exception as e:
+            cycle["state"] = "failed"
+            cycle["error"] = str(e)
+            self.logger.error(f"FRTDSD cycle {cycle_id} failed in phase '{cycle.get('phase')}': {e}")
+
+    async def _request_phase(self, cycle: Dict[str, Any], phase: str, topic_key: str, payload: Dict[str, Any]) -> Any:
+        """
+        Moves the cycle to a phase and requests its result from the responsible agent.
+        A phase whose agent is not running yet is skipped with a None result.
 
-        Argumenty:
-            success_result (Dict[str, Any]): Výsledek monitorování úspěchu.
+        Přesune cyklus do fáze a vyžádá si její výsledek od odpovědného agenta.
+        Fáze, jejíž agent zatím neběží, je přeskočena s výsledkem None.
         """
-        self.logger.info("Success monitoring completed (placeholder).")
-        self.current_state = "completed"
-        
-        # Placeholder for actual implementation
-        self.logger.info(f"FRTDSD cycle completed for task: {self.current_task}")
-        self.current_task = None
+        cycle["state"] = cycle["phase"] = phase
+        self.logger.info(f"{phase} phase initiated for task: {cycle['task']}")
+        try:
+            return await self.event_bus.request(
+                self.TOPICS[topic_key], payload, "coding_flow_boss", timeout=self.phase_timeout
+            )
+        except EventBusNoResponderError:
+            self.logger.warning(f"No agent serves '{self.TOPICS[topic_key]}', {phase} phase skipped (placeholder).")
+            cycle.setdefault("skipped_phases", []).append(phase)
+            return None
 
     async def handle_negotiation_result(self, result: dict):
         """
@@ -9,6 +9,7 @@ Each agent has its own model, dataset, memory, and statistics.
 """
 
 import asyncio
+import contextlib
 import json
 import logging
 import os
@@ -21,7 +22,13 @@ from typing import Dict, List, Optional, Any, Union, ClassVar
 
 # Import Longin Core components
 from longin_core.event_bus import LONGINEventBus
-from longin_core.lmstudio.client import AsyncLMStudioClient, ChatMessage, ChatRole
+from longin_core.base import LonginAdapter
+from longin_core.adapters import LMStudioAdapter
+from longin_core.lmstudio.client import AsyncLMStudioClient
+from longin_core.lmstudio.residency import ModelResidencyManager
+from longin_core.agents.prompt_builder import PromptBuilder
+from longin_core.agents.state_persister import StatePersister
+from longin_core.agents.training_history import TrainingHistory, run_loss
 from longin_core.learning_flow.runner import LearningFlowRunner, FlowDuration, TrainingState
 
 
@@ -52,7 +59,14 @@ class MiniAgent:
     # Non-serialized properties
     _lmstudio_client: Optional[AsyncLMStudioClient] = field(default=None, repr=False)
     _event_bus: Optional[LONGINEventBus] = field(default=None, repr=False)
+    _model_manager: Optional[ModelResidencyManager] = field(default=None, repr=False)
+    _backend: Optional[LonginAdapter] = field(default=None, repr=False)
+    _prompt_builder: Optional[PromptBuilder] = field(default=None, repr=False)
+    _state_persister: Optional[StatePersister] = field(default=None, repr=False)
+    _training_history: Optional[TrainingHistory] = field(default=None, repr=False)
     _base_dir: ClassVar[str] = "data/agents"
+    # Seconds between write-behind flushes of changed state
+    state_flush_interval: ClassVar[float] = 5.0
     
     def __post_init__(self):
         """Initialize dependencies and ensure directories exist."""
@@ -64,12 +78,14 @@ class MiniAgent:
             self.statistics = {
                 "created_at": datetime.now().isoformat(),
                 "last_modified": datetime.now().isoformat(),
-                "training_runs": [],
+                "training_run_count": 0,
                 "chat_completions": 0,
                 "total_training_time": 0,
                 "last_training_run": None,
                 "best_loss": None,
             }
+        elif isinstance(self.statistics.get("training_runs"), list):
+            self._migrate_training_runs()
     
     @property
     def agent_dir(self) -> Path:
@@ -81,6 +97,46 @@ class MiniAgent:
         """Get the path to the agent's state file."""
         return self.agent_dir / "agent_state.json"
     
+    @property
+    def training_history(self) -> TrainingHistory:
+        """Get the append-only store of the agent's training runs."""
+        if self._training_history is None:
+            self._training_history = TrainingHistory(self.agent_dir / "training_runs.sqlite3")
+        return self._training_history
+
+    def _migrate_training_runs(self) -> None:
+        """Move a ``training_runs`` list of an older state file into the training history."""
+        runs = self.statistics.pop("training_runs")
+        # Runs are keyed by run_id, so repeating an interrupted migration adds no duplicates
+        self.training_history.extend(runs)
+        self.statistics.update(self.training_history.aggregates())
+        self.save_state()
+        logger.info(f"Moved {len(runs)} training runs of agent {self.id} to {self.training_history.path}")
+
+    def _record_training_run(self, training_run: Dict[str, Any]) -> None:
+        """Update the aggregate training statistics with a new run (O(1))."""
+        self.statistics["training_run_count"] = self.statistics.get("training_run_count", 0) + 1
+        self.statistics["last_training_run"] = training_run
+        self.statistics["total_training_time"] += training_run.get("elapsed_seconds") or 0
+        loss = run_loss(training_run)
+        if loss is not None and (self.statistics.get("best_loss") is None or loss < self.statistics["best_loss"]):
+            self.statistics["best_loss"] = loss
+
+    async def get_training_runs(self, limit: int = 20, before: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get a page of the agent's training runs, newest first.
+
+        Args:
+            limit: Maximum number of runs returned
+            before: Cursor (``next_before`` of the previous page), None for the newest runs
+
+        Returns:
+            Dict[str, Any]: ``runs`` and the ``next_before`` cursor (None on the last page)
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.training_history.page, limit, before
+        )
+
     @property
     def lmstudio_client(self) -> AsyncLMStudioClient:
         """Get the LMStudioClient, creating it if it doesn't exist."""
@@ -92,8 +148,75 @@ class MiniAgent:
     @lmstudio_client.setter
     def lmstudio_client(self, client: AsyncLMStudioClient):
         """Set the LMStudioClient."""
+        if isinstance(self._backend, LMStudioAdapter) and self._backend.client is self._lmstudio_client:
+            # The default backend wrapped the previous client
+            self._backend = None
         self._lmstudio_client = client
     
+    @property
+    def backend(self) -> LonginAdapter:
+        """
+        Get the inference backend, defaulting to LM Studio over the agent's client.
+        Co-located deployments can set an in-process backend (e.g. LlamaCppAdapter).
+        """
+        if self._backend is None:
+            self._backend = LMStudioAdapter(
+                f"mini_agent_{self.id}", {}, logger, client=self.lmstudio_client
+            )
+        return self._backend
+
+    @backend.setter
+    def backend(self, backend: LonginAdapter):
+        """Set the inference backend."""
+        self._backend = backend
+
+    @property
+    def model_manager(self) -> Optional[ModelResidencyManager]:
+        """Get the model residency manager, if models are loaded on demand."""
+        return self._model_manager
+
+    @model_manager.setter
+    def model_manager(self, manager: Optional[ModelResidencyManager]):
+        """Set the model residency manager."""
+        self._model_manager = manager
+
+    @property
+    def prompt_builder(self) -> PromptBuilder:
+        """Get the prompt builder fitting chats into the model's context window."""
+        if self._prompt_builder is None:
+            self._prompt_builder = PromptBuilder()
+        return self._prompt_builder
+
+    @prompt_builder.setter
+    def prompt_builder(self, builder: PromptBuilder):
+        """Set the prompt builder (per-agent limits from config)."""
+        self._prompt_builder = builder
+
+    def _build_prompt(self, messages: List[Dict[str, str]], kwargs: Dict[str, Any]) -> List[Dict[str, str]]:
+        """
+        Trim the chat history to the token budget of the agent's model.
+
+        The completion tokens the budget reserves are sent as ``max_tokens`` (the
+        request's value, clamped if it leaves no room for the prompt), so prompt and
+        reply fit the context together. A ``conversation_id`` keyword keeps the
+        conversation's cut stable across turns and is not passed to the backend.
+        """
+        prompt = self.prompt_builder.build(
+            messages, kwargs.get("max_tokens"), conversation=kwargs.pop("conversation_id", None)
+        )
+        kwargs["max_tokens"] = self.prompt_builder.last_completion_tokens
+        return prompt
+
+    def _model_in_use(self):
+        """
+        Context that pins the agent's model: it is loaded first (waiting for a load
+        already in progress) and is not evicted while the context is open.
+        """
+        # Residency is managed for LM Studio only, in-process backends load models themselves
+        if self._model_manager is None or self.backend.provider_type != "lm_studio":
+            return contextlib.nullcontext()
+        return self._model_manager.use(self.model_path)
+
     @property
     def event_bus(self) -> LONGINEventBus:
         """Get the event bus, creating it if it doesn't exist."""
@@ -107,13 +230,18 @@ class MiniAgent:
         """Set the event bus."""
         self._event_bus = bus
     
-    def save_state(self) -> None:
-        """Save the agent's state to a file."""
-        # Update last modified timestamp
-        self.statistics["last_modified"] = datetime.now().isoformat()
-        
-        # Create a serializable representation of the agent
-        state = {
+    @property
+    def state_persister(self) -> StatePersister:
+        """Get the write-behind persister of the agent's state file."""
+        if self._state_persister is None:
+            self._state_persister = StatePersister(
+                self.state_path, self._state_snapshot, flush_interval=self.state_flush_interval
+            )
+        return self._state_persister
+
+    def _state_snapshot(self) -> Dict[str, Any]:
+        """Create a serializable representation of the agent."""
+        return {
             "id": self.id,
             "name": self.name,
             "model_path": self.model_path,
@@ -121,11 +249,30 @@ class MiniAgent:
             "memory": self.memory,
             "statistics": self.statistics,
         }
-        
-        # Save to file
-        with open(self.state_path, "w") as f:
-            json.dump(state, f, indent=2)
-            
+
+    def mark_state_dirty(self) -> None:
+        """
+        Record a state change. The state file is rewritten in the background, at
+        most once per ``state_flush_interval``, however many changes happen.
+        """
+        self.statistics["last_modified"] = datetime.now().isoformat()
+        self.state_persister.mark_dirty()
+
+    async def flush_state(self) -> None:
+        """Write pending state changes now, off the event loop thread."""
+        await self.state_persister.flush()
+
+    async def close_state(self) -> None:
+        """Stop the background flushing, write pending state changes and close the training history."""
+        await self.state_persister.close()
+        if self._training_history is not None:
+            self._training_history.close()
+
+    def save_state(self) -> None:
+        """Save the agent's state to a file (synchronously, atomic replace)."""
+        # Update last modified timestamp
+        self.statistics["last_modified"] = datetime.now().isoformat()
+        self.state_persister.write_now()
         logger.info(f"Saved agent state to {self.state_path}")
     
     @classmethod
@@ -170,18 +317,16 @@ class MiniAgent:
         logger.info(f"Loaded agent state from {state_path}")
         return agent
     
-    async def train(self, duration: Union[str, FlowDuration]) -> Dict[str, Any]:
+    def create_training_runner(self, duration: Union[str, FlowDuration]) -> LearningFlowRunner:
         """
-        Start a training run for this agent.
+        Create the LearningFlowRunner of a training run for this agent.
         
         Args:
             duration: The duration of the training run (e.g., "1h", "6h", "24h")
             
         Returns:
-            Dict[str, Any]: The results of the training run
+            LearningFlowRunner: The runner, not started yet
         """
-        logger.info(f"Starting training run for agent {self.id} ({self.name}) with duration {duration}")
-        
         # Create the agent config for the LearningFlowRunner
         agent_config = {
             "id": self.id,
@@ -190,44 +335,68 @@ class MiniAgent:
             "dataset_path": self.dataset_path,
         }
         
-        # Create and run the LearningFlowRunner
-        runner = LearningFlowRunner(
+        return LearningFlowRunner(
             agent_config=agent_config,
             duration=duration,
             event_bus=self.event_bus,
         )
+    
+    async def train(self, duration: Union[str, FlowDuration]) -> Dict[str, Any]:
+        """
+        Run a training run for this agent until it finishes.
+        
+        Args:
+            duration: The duration of the training run (e.g., "1h", "6h", "24h")
+            
+        Returns:
+            Dict[str, Any]: The results of the training run
+        """
+        logger.info(f"Starting training run for agent {self.id} ({self.name}) with duration {duration}")
         
         # Run the training process
+        runner = self.create_training_runner(duration)
         results = await runner.run()
+        await self.record_training_results(results, duration)
+        return results
+    
+    async def record_training_results(self, results: Dict[str, Any], duration: Union[str, FlowDuration]) -> None:
+        """
+        Add the results of a finished training run to the agent's history and statistics.
         
+        Args:
+            results: Results returned by LearningFlowRunner.run()
+            duration: The duration the run was started with
+        """
         # Update statistics with the results
         training_run = {
             "run_id": results.get("run_id"),
-            "duration": str(duration),
+            "duration": FlowDuration(duration).value,
             "start_time": results.get("start_time"),
             "end_time": results.get("end_time"),
             "elapsed_seconds": results.get("elapsed_seconds"),
             "state": results.get("state"),
             "adapter_path": results.get("adapter_path"),
+            "resumed_from": results.get("resumed_from"),
+            "start_step": results.get("start_step"),
+            "max_steps": results.get("max_steps"),
+            "metrics_path": results.get("metrics_path"),
         }
         
         # Add metrics if available
         if results.get("final_metrics"):
             training_run["final_metrics"] = results.get("final_metrics")
-            
-            # Update best loss if this is better
-            current_loss = results.get("final_metrics", {}).get("loss")
-            if current_loss is not None:
-                if self.statistics.get("best_loss") is None or current_loss < self.statistics.get("best_loss"):
-                    self.statistics["best_loss"] = current_loss
-        
-        # Update agent statistics
-        self.statistics["training_runs"].append(training_run)
-        self.statistics["last_training_run"] = training_run
-        self.statistics["total_training_time"] += training_run.get("elapsed_seconds", 0)
+        
+        # Append the run to the training history, keep only aggregates in the state
+        seq = await asyncio.get_running_loop().run_in_executor(None, self.training_history.append, training_run)
+        if seq is None:
+            # Already recorded (e.g. results delivered twice), the aggregates include it
+            logger.warning(f"Training run {training_run['run_id']} of agent {self.id} is already recorded")
+            return
+        self._record_training_run(training_run)
         
         # Save the updated state
-        self.save_state()
+        self.mark_state_dirty()
+        await self.flush_state()
         
         # If training was successful and an adapter was saved, try to load it into LM Studio
         if results.get("adapter_saved") and results.get("adapter_path"):
@@ -240,8 +409,6 @@ class MiniAgent:
                 # await self.lmstudio_client.load_model(results.get("adapter_path"))
             except Exception as e:
                 logger.error(f"Failed to load adapter into LM Studio: {e}")
-        
-        return results
     
     async def chat(self, messages: List[Dict[str, str]], **kwargs) -> Dict[str, Any]:
         """
@@ -249,41 +416,25 @@ class MiniAgent:
         
         Args:
             messages: List of messages in the chat history
-            **kwargs: Additional parameters to pass to the LMStudioClient
+            **kwargs: Additional parameters to pass to the inference backend
             
         Returns:
             Dict[str, Any]: The response from the language model
         """
         logger.info(f"Sending chat request to agent {self.id} ({self.name})")
         
-        # Convert dict messages to ChatMessage objects
-        chat_messages = [
-            ChatMessage(
-                role=ChatRole(msg["role"]),
-                content=msg["content"],
-                name=msg.get("name")
-            )
-            for msg in messages
-        ]
-        
         try:
-            # Get the model ID to use (this would be the runtime ID in LM Studio)
-            # In a real implementation, we would track the runtime ID of the model
-            # For now, we'll use the base model path as the ID
-            model_id = os.path.basename(self.model_path)
+            # The agent id keeps scheduling fair across agents sharing LM Studio
+            kwargs.setdefault("agent_id", self.id)
+            prompt = self._build_prompt(messages, kwargs)
+            async with self._model_in_use():
+                response = await self.backend.chat_completion(self.model_path, prompt, kwargs)
             
-            # Send the chat request to LM Studio
-            response = await self.lmstudio_client.create_chat_completion(
-                model=model_id,
-                messages=chat_messages,
-                **kwargs
-            )
-            
-            # Update statistics
+            # Update statistics (written behind, batched with other changes)
             self.statistics["chat_completions"] += 1
-            self.save_state()
+            self.mark_state_dirty()
             
-            return response.dict()
+            return response
         except Exception as e:
             logger.error(f"Error during chat completion: {e}")
             raise
@@ -294,54 +445,76 @@ class MiniAgent:
         
         Args:
             messages: List of messages in the chat history
-            **kwargs: Additional parameters to pass to the LMStudioClient
+            **kwargs: Additional parameters to pass to the inference backend
             
         Yields:
             Chunks of the response from the language model
         """
         logger.info(f"Streaming chat request to agent {self.id} ({self.name})")
         
-        # Convert dict messages to ChatMessage objects
-        chat_messages = [
-            ChatMessage(
-                role=ChatRole(msg["role"]),
-                content=msg["content"],
-                name=msg.get("name")
-            )
-            for msg in messages
-        ]
-        
         try:
-            # Get the model ID to use
-            model_id = os.path.basename(self.model_path)
-            
-            # Stream the chat response from LM Studio
-            async for chunk in self.lmstudio_client.stream_chat_completion(
-                model=model_id,
-                messages=chat_messages,
-                **kwargs
-            ):
-                yield chunk
+            # Stream the chat response from the agent's backend
+            prompt = self._build_prompt(messages, kwargs)
+            async with self._model_in_use():
+                stream = self.backend.stream_chat_completion(self.model_path, prompt, kwargs)
+                try:
+                    async for chunk in stream:
+                        yield chunk
+                finally:
+                    await stream.aclose()
             
             # Update statistics after streaming completes
             self.statistics["chat_completions"] += 1
-            self.save_state()
+            self.mark_state_dirty()
         except Exception as e:
             logger.error(f"Error during chat streaming: {e}")
             raise
     
     async def subscribe_to_events(self):
-        """Subscribe to relevant events on the event bus."""
+        """
+        Subscribe to relevant events on the event bus.
+
+        If the bus keeps a durable event log, training events logged since the
+        offset stored in ``memory["event_log_offset"]`` are replayed, so updates
+        still queued when the process went down are not lost.
+        """
+        event_log = getattr(self.event_bus, "event_log", None)
+        replay_to = event_log.next_offset if event_log is not None else None
+
         # Subscribe to training events to update the agent's state
         await self.event_bus.subscribe(
             f"training_state_update.agent_{self.id}",
-            self._handle_training_state_update
+            self._handle_training_state_update,
+            f"mini_agent_{self.id}",
         )
         
         await self.event_bus.subscribe(
             f"training_metrics_update.agent_{self.id}",
-            self._handle_training_metrics_update
+            self._handle_training_metrics_update,
+            f"mini_agent_{self.id}",
         )
+
+        if event_log is not None:
+            # The handlers only keep the latest value, so a replay overlapping
+            # live delivery is harmless. One pass over the log serves both topics.
+            handlers = {
+                f"training_state_update.agent_{self.id}": self._handle_training_state_update,
+                f"training_metrics_update.agent_{self.id}": self._handle_training_metrics_update,
+            }
+            
+            async def route(topic: str, data: Dict[str, Any]):
+                handler = handlers.get(topic)
+                if handler is not None:
+                    await handler(data)
+            
+            self.memory["event_log_offset"] = await self.event_bus.replay(
+                f"*.agent_{self.id}",
+                route,
+                self.memory.get("event_log_offset", 0),
+                replay_to,
+                with_topic=True,
+            )
+            self.mark_state_dirty()
     
     async def _handle_training_state_update(self, data: Dict[str, Any]):
         """
@@ -356,6 +529,7 @@ class MiniAgent:
         
         # Update memory with the latest training state
         self.memory["latest_training_state"] = data
+        self.mark_state_dirty()
     
     async def _handle_training_metrics_update(self, data: Dict[str, Any]):
         """
@@ -369,6 +543,7 @@ class MiniAgent:
         
         # Update memory with the latest metrics
         self.memory["latest_metrics"] = data
+        self.mark_state_dirty()
 
 
 async def main():
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Prompt Builder Module
+
+This module fits a mini-agent's chat history into the context window of its
+model. Token counts come from a cached tokenizer, old history is trimmed to a
+token budget, and the prompt always starts with the same system prefix, so
+backends with prompt caching can reuse the KV state of earlier turns.
+"""
+
+import functools
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+# Tokens every chat message costs on top of its content (role and separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+# Tokens priming the assistant reply
+REPLY_PRIMING_TOKENS = 3
+
+
+# Bytes per token assumed when no tokenizer is available (errs on the long side)
+APPROX_BYTES_PER_TOKEN = 3
+
+# Conversations whose last cut is remembered, least recently built ones are forgotten
+MAX_ANCHORED_CONVERSATIONS = 1024
+# Largest share of the room after the system prefix a reply may reserve
+MAX_COMPLETION_SHARE = 0.75
+
+
+@functools.lru_cache(maxsize=None)
+def get_encoding(name: str = "cl100k_base") -> Optional["tiktoken.Encoding"]:
+    """
+    Get a tiktoken encoding, loaded once per process.
+
+    Args:
+        name: Name of the encoding
+
+    Returns:
+        The encoding (the gpt-3.5-turbo one if ``name`` is unknown), or None when
+        no encoding can be loaded, e.g. offline without a tiktoken cache
+    """
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception:
+        logger.warning(f"Encoding '{name}' not found, falling back to gpt-3.5-turbo tokenizer.")
+    try:
+        return tiktoken.encoding_for_model("gpt-3.5-turbo")
+    except Exception as e:
+        logger.warning(f"No tiktoken encoding available ({e}), token counts are estimated from text length.")
+        return None
+
+
+class TokenCounter:
+    """
+    Counts tokens of texts, remembering the counts of recently seen texts.
+
+    Chat history is re-sent every turn, so nearly all messages of a prompt were
+    already counted on earlier turns; only new messages are tokenized.
+    """
+
+    def __init__(self, encoding: str = "cl100k_base", cache_size: int = 4096):
+        """
+        Initialize the counter.
+
+        Args:
+            encoding: tiktoken encoding name. For models with another vocabulary
+                (Llama, Mistral, ...) the counts are an estimate, see ``safety_margin``
+                of PromptBuilder
+            cache_size: Number of texts whose counts are remembered
+        """
+        self.encoding = get_encoding(encoding)
+        self.cache_size = cache_size
+        self._counts: "OrderedDict[str, int]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(text: str) -> str:
+        # Long texts are keyed by digest to keep the cache small
+        if len(text) <= 64:
+            return text
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+    def count(self, text: str) -> int:
+        """
+        Count the tokens of a text.
+
+        Args:
+            text: Text to count
+
+        Returns:
+            Number of tokens
+        """
+        key = self._key(text)
+        count = self._counts.get(key)
+        if count is not None:
+            self._counts.move_to_end(key)
+            self.hits += 1
+            return count
+
+        self.misses += 1
+        if self.encoding is None:
+            count = -(-len(text.encode("utf-8")) // APPROX_BYTES_PER_TOKEN)
+        else:
+            count = len(self.encoding.encode(text, disallowed_special=()))
+        self._counts[key] = count
+        if len(self._counts) > self.cache_size:
+            self._counts.popitem(last=False)
+        return count
+
+    def count_message(self, message: Dict[str, Any]) -> int:
+        """
+        Count the tokens a chat message takes in the prompt.
+
+        Args:
+            message: Chat message with ``role`` and ``content`` (and optional ``name``)
+
+        Returns:
+            Number of tokens including the per-message overhead
+        """
+        tokens = MESSAGE_OVERHEAD_TOKENS + self.count(message.get("content") or "")
+        if message.get("name"):
+            tokens += self.count(message["name"])
+        return tokens
+
+    def truncate_start(self, text: str, max_tokens: int) -> str:
+        """
+        Shorten a text to at most ``max_tokens`` tokens, dropping its beginning.
+
+        Args:
+            text: Text to shorten
+            max_tokens: Number of tokens to keep
+
+        Returns:
+            The last ``max_tokens`` tokens of the text
+        """
+        if max_tokens <= 0:
+            return ""
+        if self.encoding is None:
+            # Every character is at least one byte, so this stays within the estimate
+            return text[-max_tokens * APPROX_BYTES_PER_TOKEN:]
+        tokens = self.encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return self.encoding.decode(tokens[-max_tokens:])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache counters."""
+        return {
+            "encoding": self.encoding.name if self.encoding is not None else None,
+            "cached_texts": len(self._counts),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class PromptBuilder:
+    """
+    Builds the message list sent to an agent's model within a token budget.
+
+    The prompt is the system prefix (the configured system prompt followed by the
+    leading system messages of the conversation, never trimmed or reordered) and
+    the most recent history that fits into::
+
+        context_window * (1 - safety_margin) - completion tokens - system prefix
+
+    When history has to be dropped, it is cut down to ``trim_target`` of the budget
+    rather than just below it, and later turns of the same conversation keep the
+    same first message for as long as the history fits. The prompt then grows
+    append-only between cuts, so a backend's prompt cache (LM Studio, llama.cpp)
+    can reuse the KV state of the previous turn instead of re-processing the whole
+    conversation. A conversation is identified by the caller's id or, without
+    one, by its first history message.
+
+    A ``max_tokens`` above ``MAX_COMPLETION_SHARE`` of the room after the system
+    prefix is clamped (see ``last_completion_tokens``), so the prompt keeps room.
+    """
+
+    def __init__(
+        self,
+        context_window: int = 2048,
+        max_completion_tokens: int = 256,
+        system_prompt: Optional[str] = None,
+        max_history_messages: Optional[int] = None,
+        safety_margin: float = 0.1,
+        trim_target: float = 0.75,
+        counter: Optional[TokenCounter] = None,
+        encoding: str = "cl100k_base",
+    ):
+        """
+        Initialize the builder.
+
+        Args:
+            context_window: Context length of the model in tokens
+            max_completion_tokens: Tokens reserved for the reply when a request
+                sets no ``max_tokens``
+            system_prompt: System prompt put in front of every conversation
+            max_history_messages: Upper bound on non-system messages kept, if any
+            safety_margin: Fraction of the window held back for tokenizer mismatch
+            trim_target: Fraction of the history budget left after a cut
+            counter: Token counter to use; a new one with ``encoding`` by default
+            encoding: tiktoken encoding name of the default counter
+        """
+        self.context_window = context_window
+        self.max_completion_tokens = max_completion_tokens
+        self.system_prompt = system_prompt
+        self.max_history_messages = max_history_messages
+        self.safety_margin = safety_margin
+        self.trim_target = trim_target
+        self.counter = counter or TokenCounter(encoding)
+        # First kept history message of each conversation's last cut, see build()
+        self._anchors: "OrderedDict[Any, tuple]" = OrderedDict()
+        self.builds = 0
+        self.trimmed_builds = 0
+        self.dropped_messages = 0
+        self.truncated_messages = 0
+        self.clamped_completions = 0
+        self.last_prompt_tokens = 0
+        self.last_completion_tokens = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "PromptBuilder":
+        """
+        Create a builder from a ``prompt`` config section.
+
+        Args:
+            config: Keys matching the constructor arguments; unknown keys are ignored
+
+        Returns:
+            PromptBuilder: The configured builder
+        """
+        keys = (
+            "context_window", "max_completion_tokens", "system_prompt", "max_history_messages",
+            "safety_margin", "trim_target", "encoding",
+        )
+        return cls(**{key: config[key] for key in keys if config.get(key) is not None})
+
+    def completion_tokens(self, max_tokens: Optional[int] = None) -> int:
+        """Get the tokens reserved for the reply of a request."""
+        return max_tokens if max_tokens is not None else self.max_completion_tokens
+
+    def build(
+        self,
+        messages: List[Dict[str, Any]],
+        max_tokens: Optional[int] = None,
+        conversation: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fit a conversation into the model's context window.
+
+        Args:
+            messages: Full chat history, oldest message first
+            max_tokens: Completion tokens requested (default ``max_completion_tokens``);
+                the tokens actually reserved are in ``last_completion_tokens``
+            conversation: Id of the conversation, keeps its cut stable across turns;
+                by default the conversation is keyed by its first history message
+
+        Returns:
+            List[Dict[str, Any]]: System prefix followed by the most recent history
+            that fits. The last message is always kept, if needed shortened from
+            its beginning.
+        """
+        split = 0
+        while split < len(messages) and messages[split].get("role") == "system":
+            split += 1
+        system = list(messages[:split])
+        if self.system_prompt:
+            system.insert(0, {"role": "system", "content": self.system_prompt})
+        history = messages[split:]
+
+        prefix_tokens = REPLY_PRIMING_TOKENS + sum(self.counter.count_message(message) for message in system)
+        room = int(self.context_window * (1 - self.safety_margin)) - prefix_tokens
+        costs = [self.counter.count_message(message) for message in history]
+
+        requested = self.completion_tokens(max_tokens)
+        # A reply reserving (nearly) the whole window would leave the history no room at all
+        completion = min(requested, max(1, int(room * MAX_COMPLETION_SHARE)))
+        if completion < requested:
+            self.clamped_completions += 1
+            logger.warning(f"max_tokens {requested} leaves no room for the prompt, clamped to {completion}.")
+        budget = room - completion
+
+        key = conversation if conversation is not None else (self._message_key(history[0]) if history else None)
+        if sum(costs) <= budget and not self._too_many(len(costs)):
+            start = 0
+        else:
+            start = self._anchored_start(key, history)
+            if start is None or sum(costs[start:]) > budget or self._too_many(len(history) - start):
+                start = self._cut(costs, budget)
+        kept = list(history[start:])
+        self._remember_anchor(key, self._message_key(kept[0]) if start > 0 and kept else None)
+
+        used = sum(costs[start:])
+        if kept and used > budget:
+            # Only the last message is left and it alone is over budget
+            last = kept[-1]
+            room = max(0, budget - (costs[-1] - self.counter.count(last.get("content") or "")))
+            kept[-1] = {**last, "content": self.counter.truncate_start(last.get("content") or "", room)}
+            used = self.counter.count_message(kept[-1])
+            self.truncated_messages += 1
+            logger.warning(f"Last message exceeds the prompt budget of {budget} tokens, truncated.")
+
+        self.builds += 1
+        if start > 0:
+            self.trimmed_builds += 1
+            self.dropped_messages += start
+        self.last_prompt_tokens = prefix_tokens + used
+        self.last_completion_tokens = completion
+        return system + kept
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get builder counters.
+
+        Returns:
+            Dict with the limits, build counters and token cache statistics
+        """
+        return {
+            "context_window": self.context_window,
+            "max_completion_tokens": self.max_completion_tokens,
+            "builds": self.builds,
+            "trimmed_builds": self.trimmed_builds,
+            "dropped_messages": self.dropped_messages,
+            "truncated_messages": self.truncated_messages,
+            "clamped_completions": self.clamped_completions,
+            "anchored_conversations": len(self._anchors),
+            "last_prompt_tokens": self.last_prompt_tokens,
+            "token_cache": self.counter.get_stats(),
+        }
+
+    @staticmethod
+    def _message_key(message: Dict[str, Any]) -> tuple:
+        return message.get("role"), message.get("content"), message.get("name")
+
+    def _too_many(self, count: int) -> bool:
+        return self.max_history_messages is not None and count > self.max_history_messages
+
+    def _anchored_start(self, key: Any, history: List[Dict[str, Any]]) -> Optional[int]:
+        """Index of the conversation's previous cut in ``history``, if it is still there."""
+        anchor = self._anchors.get(key)
+        if anchor is None:
+            return None
+        for index in range(len(history) - 1, -1, -1):
+            if self._message_key(history[index]) == anchor:
+                return index
+        return None
+
+    def _remember_anchor(self, key: Any, anchor: Optional[tuple]) -> None:
+        if key is None:
+            return
+        if anchor is None:
+            self._anchors.pop(key, None)
+            return
+        self._anchors[key] = anchor
+        self._anchors.move_to_end(key)
+        while len(self._anchors) > MAX_ANCHORED_CONVERSATIONS:
+            self._anchors.popitem(last=False)
+
+    def _cut(self, costs: List[int], budget: int) -> int:
+        """Index of the first history message to keep."""
+        if sum(costs) <= budget and not self._too_many(len(costs)):
+            return 0
+        target = int(budget * self.trim_target)
+        limit = len(costs)
+        if self.max_history_messages is not None:
+            limit = max(1, int(self.max_history_messages * self.trim_target))
+        start, used = len(costs), 0
+        while start > 0 and len(costs) - start < limit and used + costs[start - 1] <= target:
+            start -= 1
+            used += costs[start]
+        # The newest message is kept even when it does not fit
+        return min(start, max(0, len(costs) - 1))
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+State Persister Module
+
+This module provides write-behind persistence for agent state. Instead of
+rewriting the state file after every change, the owner marks its state dirty
+and the persister writes the latest snapshot at most once per flush interval,
+off the event loop thread, replacing the file atomically.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # Optional speed-up, the standard library encoder is used otherwise
+    orjson = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def encode_state(state: Dict[str, Any]) -> bytes:
+    """
+    Serialize a state snapshot to compact JSON.
+
+    Args:
+        state: JSON-serializable state
+
+    Returns:
+        bytes: UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(state)
+    return json.dumps(state, separators=(",", ":")).encode("utf-8")
+
+
+def atomic_write(path: Union[str, Path], data: bytes) -> None:
+    """
+    Replace a file's content atomically.
+
+    The data goes to a temporary file in the same directory, which is flushed to
+    disk and renamed over the target, so readers (and a restart after a crash)
+    see either the old or the new content, never a partial write.
+
+    Args:
+        path: File to write
+        data: New content
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class StatePersister:
+    """
+    Write-behind persister of one state file.
+
+    ``mark_dirty()`` is cheap and can be called on every change; a background task
+    started on first use writes the state at most once per ``flush_interval``, so
+    any number of changes in between (e.g. chat completion counters) cost one
+    write. The snapshot is encoded on the event loop (compact JSON, so the live
+    state cannot change while it is serialized), the file is written in a worker
+    thread. ``close()`` writes pending changes, e.g. at shutdown.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        snapshot: Callable[[], Dict[str, Any]],
+        flush_interval: float = 5.0,
+    ):
+        """
+        Initialize the persister.
+
+        Args:
+            path: State file to write
+            snapshot: Returns the current state; called on the event loop thread
+            flush_interval: Seconds between writes of a dirty state
+        """
+        self.path = Path(path)
+        self.snapshot = snapshot
+        self.flush_interval = flush_interval
+        self._dirty = False
+        self._lock: Optional[asyncio.Lock] = None
+        # Keeps writes in order even when a cancelled flush left one running
+        self._write_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.marks = 0
+        self.writes = 0
+        self.failed_writes = 0
+
+    @property
+    def dirty(self) -> bool:
+        """Whether there are changes not written yet."""
+        return self._dirty
+
+    def mark_dirty(self) -> None:
+        """
+        Record that the state changed. It is written by the next flush.
+        """
+        self._dirty = True
+        self.marks += 1
+        if self._task is None or self._task.done():
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._flush_loop())
+            except RuntimeError:
+                # No event loop: the change is written by the next flush() or write_now()
+                pass
+
+    async def flush(self) -> bool:
+        """
+        Write the state now if it is dirty.
+
+        Returns:
+            bool: True if the state is on disk, False if the write failed (the state
+            stays dirty and the write is retried by the next flush)
+
+        Raises:
+            TypeError: If the snapshot is not JSON-serializable
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self._dirty:
+                return True
+            data = encode_state(self.snapshot())
+            self._dirty = False
+            try:
+                # A started write completes even if the flushing task is cancelled
+                await asyncio.shield(asyncio.get_running_loop().run_in_executor(None, self._write, data))
+                return True
+            except Exception as e:
+                self._dirty = True
+                self.failed_writes += 1
+                logger.error(f"Failed to write state to {self.path}: {e}")
+                return False
+
+    def write_now(self) -> None:
+        """
+        Write the state synchronously, regardless of the dirty flag.
+
+        For callers without an event loop (startup, scripts); async code should
+        use ``mark_dirty()`` or ``flush()``.
+        """
+        self._dirty = False
+        self._write(encode_state(self.snapshot()))
+
+    async def close(self) -> None:
+        """
+        Stop the background flushing and write pending changes.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get persister counters.
+
+        Returns:
+            Dict with the dirty flag and the numbers of changes, writes and failed writes
+        """
+        return {
+            "dirty": self._dirty,
+            "marks": self.marks,
+            "writes": self.writes,
+            "failed_writes": self.failed_writes,
+        }
+
+    def _write(self, data: bytes) -> None:
+        with self._write_lock:
+            atomic_write(self.path, data)
+            self.writes += 1
+
+    async def _flush_loop(self) -> None:
+        # Exits once everything is written; the next mark_dirty() starts it again
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+            if not self._dirty:
+                return
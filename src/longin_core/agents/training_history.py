@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Training History Module
+
+This module stores the training runs of a mini-agent in an append-only SQLite
+table next to its state file, instead of a list inside ``agent_state.json``
+that is loaded and rewritten in full on every save. Runs are paged by their
+sequence number, so reading a page costs the same however long the history is.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS training_runs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT UNIQUE,
+    start_time TEXT,
+    end_time TEXT,
+    state TEXT,
+    elapsed_seconds REAL NOT NULL DEFAULT 0,
+    loss REAL,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS training_runs_loss ON training_runs (loss);
+CREATE INDEX IF NOT EXISTS training_runs_start_time ON training_runs (start_time);
+CREATE INDEX IF NOT EXISTS training_runs_state ON training_runs (state);
+"""
+
+
+def run_loss(run: Dict[str, Any]) -> Optional[float]:
+    """
+    Get the final loss of a training run record.
+
+    Args:
+        run: Training run record
+
+    Returns:
+        The loss from ``final_metrics``, or None if the run reported none
+    """
+    loss = (run.get("final_metrics") or {}).get("loss")
+    return float(loss) if loss is not None else None
+
+
+class TrainingHistory:
+    """
+    Append-only store of one agent's training runs, backed by SQLite.
+
+    Every run keeps its full record (JSON) plus columns for the values that are
+    queried: sequence number, run id, times, state, elapsed seconds and final
+    loss. The sequence number (paging), run id (duplicates), final loss (best
+    run), start time and state are indexed. Methods are blocking; async callers
+    run them in an executor.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Initialize the store. The database is created on first use.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = Path(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def append(self, run: Dict[str, Any]) -> Optional[int]:
+        """
+        Append a training run.
+
+        Args:
+            run: Training run record (``run_id``, ``start_time``, ``elapsed_seconds``,
+                ``final_metrics``, ...)
+
+        Returns:
+            The sequence number of the run, or None if a run with the same
+            ``run_id`` is already stored
+        """
+        return self.extend([run])[0]
+
+    def extend(self, runs: Iterable[Dict[str, Any]]) -> List[Optional[int]]:
+        """
+        Append training runs in one transaction.
+
+        Args:
+            runs: Training run records, oldest first
+
+        Returns:
+            List[Optional[int]]: Sequence number of every run, None for duplicates
+        """
+        with self._lock:
+            conn = self._connection()
+            seqs = []
+            with conn:
+                for run in runs:
+                    cursor = conn.execute(
+                        "INSERT OR IGNORE INTO training_runs "
+                        "(run_id, start_time, end_time, state, elapsed_seconds, loss, record) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            run.get("run_id"),
+                            run.get("start_time"),
+                            run.get("end_time"),
+                            run.get("state"),
+                            run.get("elapsed_seconds") or 0,
+                            run_loss(run),
+                            json.dumps(run, default=str),
+                        ),
+                    )
+                    seqs.append(cursor.lastrowid if cursor.rowcount else None)
+            return seqs
+
+    def page(self, limit: int = 20, before: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get a page of runs, newest first.
+
+        Args:
+            limit: Maximum number of runs returned
+            before: Only runs with a sequence number below this (the ``next_before``
+                of the previous page); None starts at the newest run
+
+        Returns:
+            Dict with ``runs`` (records with their ``seq``) and ``next_before``,
+            the cursor of the next page or None after the oldest run
+        """
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT seq, record FROM training_runs WHERE seq < ? ORDER BY seq DESC LIMIT ?",
+                (before if before is not None else 2 ** 63 - 1, limit + 1),
+            ).fetchall()
+        runs = [{"seq": seq, **json.loads(record)} for seq, record in rows[:limit]]
+        return {"runs": runs, "next_before": runs[-1]["seq"] if len(rows) > limit else None}
+
+    def aggregates(self) -> Dict[str, Any]:
+        """
+        Compute the aggregates over the whole history.
+
+        The best loss comes from the loss index, the count and total time need a
+        scan of the table. Agents keep these up to date incrementally; this is for
+        rebuilding them.
+
+        Returns:
+            Dict with ``training_run_count``, ``best_loss`` and ``total_training_time``
+        """
+        with self._lock:
+            count, best_loss, total = self._connection().execute(
+                "SELECT COUNT(*), MIN(loss), COALESCE(SUM(elapsed_seconds), 0) FROM training_runs"
+            ).fetchone()
+        return {"training_run_count": count, "best_loss": best_loss, "total_training_time": total}
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from enum import Enum
 import logging
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, List, Optional, Dict, Any
 
 
 class ModuleStatus(Enum):
@@ -400,3 +400,76 @@ class LonginAdapter(ABC):
             dict: Slovník obsahující informace o stavu adaptéru.
         """
         pass
+
+    async def chat_completion(
+        self, model_id: str, messages: List[Dict[str, Any]], params: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Generates a chat completion. The default implementation renders the
+        messages as a plain prompt for generate_completion(); adapters of chat
+        capable providers override it.
+
+        Args:
+            model_id (str): The ID (or path) of the model to use.
+            messages (List[dict]): Chat messages with ``role`` and ``content``.
+            params (dict): Additional parameters for the generation (e.g., temperature, max_tokens).
+
+        Returns:
+            dict: An OpenAI-style chat completion response.
+
+        Generuje chatovou odpověď. Výchozí implementace převede zprávy na prostý
+        prompt pro generate_completion(); adaptéry poskytovatelů s podporou chatu
+        ji přepisují.
+
+        Argumenty:
+            model_id (str): ID (nebo cesta) modelu, který se má použít.
+            messages (List[dict]): Zprávy chatu s ``role`` a ``content``.
+            params (dict): Další parametry pro generování (např. teplota, max_tokens).
+
+        Vrací:
+            dict: Odpověď chatového dokončení ve formátu OpenAI.
+        """
+        prompt = "\n".join(f"{message['role']}: {message['content']}" for message in messages) + "\nassistant:"
+        completion = await self.generate_completion(model_id, prompt, params)
+        text = completion.get("text") or completion.get("choices", [{}])[0].get("text", "")
+        return {
+            "object": "chat.completion",
+            "model": model_id,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        }
+
+    async def stream_chat_completion(
+        self, model_id: str, messages: List[Dict[str, Any]], params: Dict[str, Any]
+    ) -> AsyncIterator[Any]:
+        """
+        Streams a chat completion. The default implementation yields the whole
+        response of chat_completion() as a single chunk.
+
+        Args:
+            model_id (str): The ID (or path) of the model to use.
+            messages (List[dict]): Chat messages with ``role`` and ``content``.
+            params (dict): Additional parameters for the generation.
+
+        Yields:
+            Chunks of the response.
+
+        Streamuje chatovou odpověď. Výchozí implementace vrátí celou odpověď
+        chat_completion() jako jediný kus.
+
+        Argumenty:
+            model_id (str): ID (nebo cesta) modelu, který se má použít.
+            messages (List[dict]): Zprávy chatu s ``role`` a ``content``.
+            params (dict): Další parametry pro generování.
+
+        Vrací postupně:
+            Kusy odpovědi.
+        """
+        yield await self.chat_completion(model_id, messages, params)
+
+    async def close(self) -> None:
+        """
+        Releases the resources held by the adapter.
+
+        Uvolní prostředky držené adaptérem.
+        """
+        pass
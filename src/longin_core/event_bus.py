@@ -1,18 +1,366 @@
 import logging
 import asyncio
-from typing import Dict, List, Callable, Optional
+import functools
+import time
+import uuid
+from bisect import bisect_left
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Callable, Optional, Tuple
 from collections import defaultdict
 
+from .event_log import EventLog
+
+
+class OverflowPolicy(str, Enum):
+    """
+    What a topic queue does when a message arrives while it is full.
+
+    Co udělá fronta tématu, když dorazí zpráva a fronta je plná.
+    """
+    BLOCK = "block"              # publisher waits until there is room
+    DROP_OLDEST = "drop_oldest"  # the oldest queued message is discarded
+    DROP_NEWEST = "drop_newest"  # the incoming message is discarded
+    COALESCE = "coalesce"        # a pending message with the same key is replaced
+
+
+_now = time.perf_counter
+
+
+class EventBusRequestError(Exception):
+    """Raised by LONGINEventBus.request() when a request has no responder or the responder failed"""
+    pass
+
+
+class EventBusNoResponderError(EventBusRequestError):
+    """Raised by LONGINEventBus.request() when nobody subscribes to the request topic"""
+    pass
+
+
+class EventBusOverflowError(EventBusRequestError):
+    """Raised by LONGINEventBus.request() when the full queue of the request topic dropped the request"""
+    pass
+
+
+def topic_matches(pattern: str, topic: str) -> bool:
+    """
+    Checks whether a dotted topic matches a subscription pattern. ``*`` matches
+    exactly one segment and ``#`` matches zero or more segments.
+
+    Args:
+        pattern (str): The subscription pattern, e.g. ``training_state_update.#``.
+        topic (str): The concrete topic, e.g. ``training_state_update.agent_0``.
+
+    Returns:
+        bool: True if the topic matches the pattern.
+
+    Ověří, zda tečkami oddělené téma odpovídá vzoru odběru. ``*`` odpovídá
+    právě jednomu segmentu a ``#`` odpovídá žádnému nebo více segmentům.
+
+    Argumenty:
+        pattern (str): Vzor odběru, např. ``training_state_update.#``.
+        topic (str): Konkrétní téma, např. ``training_state_update.agent_0``.
+
+    Vrací:
+        bool: True, pokud téma odpovídá vzoru.
+    """
+    trie = _SubscriptionTrie()
+    trie.insert(pattern, True)
+    return bool(trie.match(topic))
+
+
+class _TrieNode:
+    __slots__ = ("children", "values")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.values: List[Any] = []
+
+
+class _SubscriptionTrie:
+    """
+    Segment trie of subscription patterns. Matching walks the topic segments
+    once, so routing cost depends on the topic depth rather than on the number
+    of subscriptions.
+
+    Segmentový trie vzorů odběru. Párování projde segmenty tématu jednou,
+    takže cena směrování závisí na hloubce tématu, nikoli na počtu odběrů.
+    """
+
+    def __init__(self):
+        self.root = _TrieNode()
+
+    def insert(self, pattern: str, value: Any) -> None:
+        node = self.root
+        for segment in pattern.split("."):
+            node = node.children.setdefault(segment, _TrieNode())
+        node.values.append(value)
+
+    def remove(self, pattern: str, value: Any) -> None:
+        path = [self.root]
+        segments = pattern.split(".")
+        for segment in segments:
+            node = path[-1].children.get(segment)
+            if node is None:
+                return
+            path.append(node)
+        if value in path[-1].values:
+            path[-1].values.remove(value)
+        # Prune branches that no longer lead to any subscription
+        for depth in range(len(segments), 0, -1):
+            node = path[depth]
+            if node.values or node.children:
+                break
+            del path[depth - 1].children[segments[depth - 1]]
+
+    def match(self, topic: str) -> List[Any]:
+        out: List[Any] = []
+        self._collect(self.root, topic.split("."), 0, out)
+        # De-duplicate while keeping the discovery order
+        return list(dict.fromkeys(out))
+
+    def _collect(self, node: _TrieNode, segments: List[str], index: int, out: List[Any]) -> None:
+        hash_node = node.children.get("#")
+        if hash_node is not None:
+            # '#' swallows zero or more of the remaining segments
+            for next_index in range(index, len(segments) + 1):
+                self._collect(hash_node, segments, next_index, out)
+        if index == len(segments):
+            out.extend(node.values)
+            return
+        child = node.children.get(segments[index])
+        if child is not None:
+            self._collect(child, segments, index + 1, out)
+        star_node = node.children.get("*")
+        if star_node is not None:
+            self._collect(star_node, segments, index + 1, out)
+
+
+# Histogram bucket upper bounds in seconds: 1 µs .. ~300 s, four buckets per doubling (~19% wide)
+_LATENCY_BOUNDS: Tuple[float, ...] = tuple(1e-6 * 2 ** (i / 4) for i in range(113))
+
+
+class _LatencyHistogram:
+    """
+    Fixed-bucket latency histogram. Recording is O(log buckets) with no
+    allocation; percentiles are estimated from the bucket bounds.
+
+    Histogram latence s pevnými koši. Záznam je O(log košů) bez alokace;
+    percentily jsou odhadnuty z hranic košů.
+    """
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts: List[int] = [0] * (len(_LATENCY_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect_left(_LATENCY_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, int(q * self.count + 0.999999))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                bound = _LATENCY_BOUNDS[index] if index < len(_LATENCY_BOUNDS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> Dict[str, float]:
+        """Summary in milliseconds."""
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1e3 if self.count else 0.0,
+            "p50_ms": self.percentile(0.50) * 1e3,
+            "p95_ms": self.percentile(0.95) * 1e3,
+            "p99_ms": self.percentile(0.99) * 1e3,
+            "max_ms": self.max * 1e3,
+        }
+
+
+class _HandlerStats:
+    """
+    Execution metrics of one subscriber on one topic.
+
+    Metriky provádění jednoho odběratele na jednom tématu.
+    """
+
+    __slots__ = ("name", "latency", "errors", "slow")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latency = _LatencyHistogram()
+        self.errors = 0
+        self.slow = 0
+
+
+class _DispatchShard:
+    """
+    A single ordered dispatch lane of the event bus. Every shard owns its own
+    bounded queue and worker task, so messages within a shard are delivered in
+    the order they were published while independent shards run in parallel.
+
+    Jedna uspořádaná doručovací dráha sběrnice událostí. Každý shard vlastní
+    svou omezenou frontu a pracovní úlohu, takže zprávy v rámci shardu jsou
+    doručeny v pořadí publikace, zatímco nezávislé shardy běží paralelně.
+    """
+
+    __slots__ = (
+        "key", "topic", "callback", "queue", "task",
+        "capacity", "policy", "coalesce_key", "_pending", "_coalescing",
+        "enqueued", "dropped", "coalesced", "high_watermark", "latency",
+    )
+
+    def __init__(
+        self,
+        key: Tuple,
+        topic: str,
+        callback: Optional[Callable] = None,
+        capacity: int = 0,
+        policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        coalesce_key: Optional[str] = None,
+    ):
+        self.key = key
+        self.topic = topic
+        # None means "deliver to every subscriber of the topic" (topic mode)
+        self.callback = callback
+        self.capacity = capacity
+        self.policy = policy
+        self.coalesce_key = coalesce_key
+        # Resolved once, enum member lookups are comparatively slow on the hot path
+        self._coalescing = policy is OverflowPolicy.COALESCE and bool(coalesce_key)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=capacity)
+        self.task: Optional[asyncio.Task] = None
+        # Coalescing key -> envelope still waiting in the queue
+        self._pending: Dict[Any, Dict[str, Any]] = {}
+        # Counters
+        self.enqueued = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.high_watermark = 0
+        # Enqueue-to-dispatch histogram of the topic, None while metrics are disabled
+        self.latency: Optional[_LatencyHistogram] = None
+
+    def offer(self, envelope: Dict[str, Any]) -> Optional[bool]:
+        """
+        Enqueues an envelope without waiting, according to the shard overflow policy.
+
+        Args:
+            envelope (Dict[str, Any]): The message envelope to enqueue.
+
+        Returns:
+            Optional[bool]: True if the message was queued or merged, False if it was
+            dropped, None if the queue is full and the policy is to block.
+
+        Zařadí obálku zprávy do fronty bez čekání podle politiky přetečení shardu.
+
+        Argumenty:
+            envelope (Dict[str, Any]): Obálka zprávy k zařazení.
+
+        Vrací:
+            Optional[bool]: True, pokud byla zpráva zařazena nebo sloučena, False, pokud
+            byla zahozena, None, pokud je fronta plná a politikou je blokování.
+        """
+        if self._coalescing:
+            pending = self._pending.get(self._coalesce_value(envelope))
+            if pending is not None:
+                # Keep the queue position, deliver only the latest content
+                pending.update(envelope)
+                self.coalesced += 1
+                return True
+
+        if self.capacity and self.queue.full():
+            if self.policy is OverflowPolicy.BLOCK:
+                return None
+            if self.policy is OverflowPolicy.DROP_NEWEST:
+                self.dropped += 1
+                return False
+            # Coalescing topics fall back to dropping the oldest distinct key
+            self._forget(self.queue.get_nowait())
+            self.queue.task_done()
+            self.dropped += 1
+
+        self.queue.put_nowait(envelope)
+        self._record(envelope)
+        return True
+
+    async def put(self, envelope: Dict[str, Any]) -> bool:
+        """
+        Enqueues an envelope, waiting for room if the policy is to block.
+
+        Args:
+            envelope (Dict[str, Any]): The message envelope to enqueue.
+
+        Returns:
+            bool: True if the message was queued or merged, False if it was dropped.
+
+        Zařadí obálku zprávy do fronty, při politice blokování čeká na volné místo.
+
+        Argumenty:
+            envelope (Dict[str, Any]): Obálka zprávy k zařazení.
+
+        Vrací:
+            bool: True, pokud byla zpráva zařazena nebo sloučena, False, pokud byla zahozena.
+        """
+        accepted = self.offer(envelope)
+        if accepted is None:
+            await self.queue.put(envelope)
+            self._record(envelope)
+            accepted = True
+        return accepted
+
+    def _record(self, envelope: Dict[str, Any]) -> None:
+        if self._coalescing:
+            value = self._coalesce_value(envelope)
+            if value is not None:
+                self._pending[value] = envelope
+        self.enqueued += 1
+        depth = self.queue.qsize()
+        if depth > self.high_watermark:
+            self.high_watermark = depth
+
+    def _coalesce_value(self, envelope: Dict[str, Any]) -> Any:
+        message = envelope["message"]
+        return message.get(self.coalesce_key) if isinstance(message, dict) else None
+
+    def take(self, envelope: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Marks an envelope taken from the queue as no longer pending.
+
+        Označí obálku odebranou z fronty jako již nečekající.
+        """
+        self._forget(envelope)
+        return envelope
+
+    def _forget(self, envelope: Dict[str, Any]) -> None:
+        if self._pending:
+            value = self._coalesce_value(envelope)
+            if self._pending.get(value) is envelope:
+                del self._pending[value]
+
 
 class LONGINEventBus:
     """
     A central asynchronous event bus for the Longin AI Systems.
     It facilitates communication between different modules by allowing them to
-    publish and subscribe to specific topics.
+    publish and subscribe to specific topics. Messages are dispatched through
+    per-topic (or per-subscriber) lanes, so ordering is kept within a lane while
+    unrelated topics are delivered in parallel.
 
     Centrální asynchronní sběrnice událostí pro systémy Longin AI.
     Usnadňuje komunikaci mezi různými moduly tím, že jim umožňuje
-    publikovat a odebírat konkrétní témata.
+    publikovat a odebírat konkrétní témata. Zprávy jsou doručovány přes
+    dráhy pro jednotlivá témata (nebo odběratele), takže pořadí je v rámci
+    dráhy zachováno, zatímco nesouvisející témata jsou doručována paralelně.
     """
 
     def __init__(self, logger: logging.Logger, config: dict):
@@ -21,25 +369,106 @@ class LONGINEventBus:
 
         Args:
             logger (logging.Logger): The logger instance for the event bus.
-            config (dict): Configuration dictionary for the event bus.
+            config (dict): Configuration dictionary for the event bus. Recognised keys:
+                ``dispatch_mode`` ("topic" or "subscriber"), ``max_concurrency``,
+                ``dispatch_batch_size``, ``worker_idle_timeout``, ``queue_capacity``, ``overflow_policy``,
+                ``request_timeout``, ``metrics``, ``slow_handler_threshold``, ``event_log`` (see
+                EventLog, plus ``enabled`` and the logged ``topics``) and ``topics`` (per-topic
+                ``capacity``, ``overflow_policy``, ``coalesce_key`` and ``inline``).
 
         Inicializuje sběrnici událostí LONGINEventBus.
 
         Argumenty:
             logger (logging.Logger): Instance loggeru pro sběrnici událostí.
-            config (dict): Konfigurační slovník pro sběrnici událostí.
+            config (dict): Konfigurační slovník pro sběrnici událostí. Podporované klíče:
+                ``dispatch_mode`` ("topic" nebo "subscriber"), ``max_concurrency``,
+                ``dispatch_batch_size``, ``worker_idle_timeout``, ``queue_capacity``, ``overflow_policy``,
+                ``request_timeout``, ``metrics``, ``slow_handler_threshold``, ``event_log`` (viz
+                EventLog, navíc ``enabled`` a logovaná ``topics``) a ``topics`` (pro jednotlivá
+                témata ``capacity``, ``overflow_policy``, ``coalesce_key`` a ``inline``).
         """
         self.logger = logger
-        self.config = config
+        self.config = config or {}
         self.subscribers: Dict[str, List[Callable]] = defaultdict(list)
-        self.message_queue = asyncio.Queue()
-        self._processing_task: Optional[asyncio.Task] = None
+        # Subscription patterns resolved through a trie, results cached per concrete topic
+        self._subscription_trie = _SubscriptionTrie()
+        self._match_cache: Dict[str, Tuple[Callable, ...]] = {}
+        # Topic -> (callbacks, inline, shard), the publish hot path needs a single lookup
+        self._routes: Dict[str, Tuple[Tuple[Callable, ...], bool, Optional[_DispatchShard]]] = {}
+        self.match_cache_size: int = int(self.config.get("match_cache_size", 4096))
+        # "topic": one ordered lane per topic, subscribers of a topic run in sequence.
+        # "subscriber": one ordered lane per (topic, callback), a slow subscriber
+        # only delays itself.
+        self.dispatch_mode: str = self.config.get("dispatch_mode", "topic")
+        if self.dispatch_mode not in ("topic", "subscriber"):
+            raise ValueError(f"Invalid dispatch_mode '{self.dispatch_mode}'. Must be 'topic' or 'subscriber'.")
+        # Upper bound of lanes dispatching at the same time (0 = unlimited)
+        self.max_concurrency: int = int(self.config.get("max_concurrency", 32))
+        # Messages a lane may dispatch per concurrency slot before yielding it
+        self.dispatch_batch_size: int = max(1, int(self.config.get("dispatch_batch_size", 64)))
+        # Idle lanes are torn down after this many seconds to keep dynamic topics cheap
+        self.worker_idle_timeout: float = float(self.config.get("worker_idle_timeout", 30.0))
+        # Default queue bounds; "topics" may override them per topic (0 = unbounded)
+        self.queue_capacity: int = int(self.config.get("queue_capacity", 10000))
+        self.overflow_policy = OverflowPolicy(self.config.get("overflow_policy", OverflowPolicy.BLOCK))
+        self.topic_config: Dict[str, Dict[str, Any]] = dict(self.config.get("topics", {}))
+        self._topic_config_cache: Dict[str, Dict[str, Any]] = {}
+        # Counters of lanes that already retired, so stats survive idle teardown
+        self._retired_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"enqueued": 0, "dropped": 0, "coalesced": 0})
+        self._shards: Dict[Tuple, _DispatchShard] = {}
+        self._dispatch_semaphore: Optional[asyncio.Semaphore] = (
+            asyncio.Semaphore(self.max_concurrency) if self.max_concurrency > 0 else None
+        )
+        self._running = False
+        # Optional cross-process transport (see event_transport.py), attached via set_transport()
+        self._transport = None
+        # Request/reply: replies come back on a topic private to this bus instance and are
+        # delivered inline, so resolving a future never waits behind other traffic.
+        self.request_timeout: float = float(self.config.get("request_timeout", 30.0))
+        self.reply_topic: str = f"rpc_reply.{uuid.uuid4().hex}"
+        self.topic_config[self.reply_topic] = {"inline": True}
+        self._pending_requests: Dict[str, asyncio.Future] = {}
+        self._reply_subscribed = False
+        # Instrumentation: enqueue-to-dispatch latency per topic, execution time and
+        # errors per (topic, subscriber); handlers slower than the threshold are logged.
+        self.metrics_enabled: bool = bool(self.config.get("metrics", True))
+        self.slow_handler_threshold: float = float(self.config.get("slow_handler_threshold", 1.0))
+        self._queue_latency: Dict[str, _LatencyHistogram] = defaultdict(_LatencyHistogram)
+        self._handler_stats: Dict[Tuple[str, Callable], _HandlerStats] = {}
+        self._subscriber_names: Dict[Callable, str] = {}
+        # Optional durable log of selected topics, replayable after a restart
+        log_cfg = self.config.get("event_log") or {}
+        self.event_log: Optional[EventLog] = (
+            EventLog(log_cfg, self.logger.getChild("EventLog")) if log_cfg.get("enabled") else None
+        )
+        self._log_patterns: List[str] = list(log_cfg.get("topics", ["#"]))
+        self._log_cache: Dict[str, bool] = {}
         self.logger.info("LONGINEventBus initialized.")
 
+    def set_transport(self, transport) -> None:
+        """
+        Attaches a transport that forwards exported topics to other processes and
+        delivers their messages locally. Must be called before start().
+
+        Args:
+            transport (EventBusTransport): The transport to attach, or None to detach.
+
+        Připojí transport, který předává exportovaná témata ostatním procesům a
+        lokálně doručuje jejich zprávy. Musí být zavoláno před start().
+
+        Argumenty:
+            transport (EventBusTransport): Transport k připojení, nebo None pro odpojení.
+        """
+        if self._running:
+            raise RuntimeError("Cannot change the transport of a running LONGINEventBus.")
+        self._transport = transport
+
     async def publish(self, topic: str, message: dict, source_module_id: str):
         """
         Publishes a message to a specific topic. The message will be added to the
-        internal queue for asynchronous processing.
+        dispatch queue of the topic (or of each of its subscribers) for asynchronous processing.
+        Messages to topics without subscribers are discarded right away, and topics
+        configured as ``inline`` are delivered directly in the publisher's task.
 
         Args:
             topic (str): The topic to which the message is published.
@@ -47,34 +476,499 @@ class LONGINEventBus:
             source_module_id (str): The ID of the module publishing the message.
 
         Publikuje zprávu na konkrétní téma. Zpráva bude přidána do
-        interní fronty pro asynchronní zpracování.
+        doručovací fronty tématu (nebo každého jeho odběratele) pro asynchronní zpracování.
+        Zprávy pro témata bez odběratelů jsou okamžitě zahozeny a témata nakonfigurovaná
+        jako ``inline`` jsou doručena přímo v úloze publikujícího.
 
         Argumenty:
             topic (str): Téma, na které je zpráva publikována.
             message (dict): Obsah zprávy.
             source_module_id (str): ID modulu, který zprávu publikuje.
         """
-        await self.message_queue.put({"topic": topic, "message": message, "source_id": source_module_id})
-        self.logger.debug(f"Message published to topic '{topic}' from '{source_module_id}'.")
+        transport = self._transport
+        if transport is not None and transport.exports(topic):
+            # Forward before the local route, topics without local subscribers still matter remotely
+            transport.send(topic, message, source_module_id)
+        if self.event_log is not None and self._running and self._is_logged(topic):
+            # Only while running: offsets are assigned once the log has been opened
+            self.event_log.append(topic, message, source_module_id)
+        if await self._route(topic, message, source_module_id) and self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"Message published to topic '{topic}' from '{source_module_id}'.")
+
+    async def publish_many(self, messages: Iterable[Tuple[str, dict]], source_module_id: str) -> int:
+        """
+        Publishes a batch of messages in one call. Ordering of messages sharing a
+        topic is kept. The route, transport export and event log decision of each
+        topic are resolved once per batch, and messages of queued topics are offered
+        straight to their shard, without a routing coroutine per message.
+
+        Args:
+            messages (Iterable[Tuple[str, dict]]): Pairs of (topic, message) to publish.
+            source_module_id (str): The ID of the module publishing the messages.
+
+        Returns:
+            int: Number of messages that were delivered, queued or merged.
+
+        Publikuje dávku zpráv jedním voláním. Pořadí zpráv se stejným tématem
+        je zachováno. Cesta, export přes transport a zápis do logu událostí se pro
+        každé téma vyhodnotí jednou za dávku a zprávy front témat se předají přímo
+        jejich shardu, bez směrovací korutiny pro každou zprávu.
+
+        Argumenty:
+            messages (Iterable[Tuple[str, dict]]): Dvojice (téma, zpráva) k publikaci.
+            source_module_id (str): ID modulu, který zprávy publikuje.
+
+        Vrací:
+            int: Počet zpráv, které byly doručeny, zařazeny nebo sloučeny.
+        """
+        accepted = 0
+        transport = self._transport
+        event_log = self.event_log if self._running else None
+        # topic -> (exported, logged, callbacks, shard or None for the other delivery paths)
+        plans: Dict[str, Tuple[bool, bool, Tuple[Callable, ...], Optional[_DispatchShard]]] = {}
+        for topic, message in messages:
+            plan = plans.get(topic)
+            if plan is None:
+                route = self._routes.get(topic)
+                if route is None:
+                    route = self._build_route(topic)
+                plan = plans[topic] = (
+                    transport is not None and transport.exports(topic),
+                    event_log is not None and self._is_logged(topic),
+                    route[0],
+                    route[2],
+                )
+            exported, logged, callbacks, shard = plan
+            if exported:
+                transport.send(topic, message, source_module_id)
+            if logged:
+                event_log.append(topic, message, source_module_id)
+            if shard is None:
+                # Inline, per-subscriber lanes or no subscribers
+                accepted += await self._route(topic, message, source_module_id)
+                if callbacks:
+                    # Handlers ran or lanes waited: subscriptions and shards may have changed
+                    plans.clear()
+                continue
+            envelope = {"topic": topic, "message": message, "source_id": source_module_id, "enqueued_at": _now()}
+            queued = shard.offer(envelope)
+            if queued is None:
+                queued = await shard.put(envelope)
+                plans.clear()
+            accepted += queued
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"Batch of {accepted} messages published from '{source_module_id}'.")
+        return accepted
+
+    async def request(
+        self, topic: str, payload: dict, source_module_id: str, timeout: Optional[float] = None
+    ) -> Any:
+        """
+        Publishes a request and waits for the matching reply. The request carries a
+        ``correlation_id`` and a ``reply_to`` topic; a responder answers through reply()
+        (or is registered with serve()). Any number of requests may be in flight at once.
+        Cancelling the awaiting task abandons the request.
+
+        Args:
+            topic (str): The topic the request is published to.
+            payload (dict): The content of the request.
+            source_module_id (str): The ID of the module sending the request.
+            timeout (Optional[float]): Seconds to wait for the reply, defaults to ``request_timeout``.
+
+        Returns:
+            Any: The ``result`` sent by the responder.
+
+        Raises:
+            asyncio.TimeoutError: If no reply arrives in time.
+            EventBusRequestError: If the responder reported an error.
+            EventBusNoResponderError: If nobody subscribes to the topic.
+            EventBusOverflowError: If the topic queue is full and dropped the request.
+
+        Publikuje požadavek a počká na odpovídající odpověď. Požadavek nese
+        ``correlation_id`` a téma ``reply_to``; odpovídající modul odpoví přes reply()
+        (nebo je zaregistrován přes serve()). Současně může běžet libovolný počet požadavků.
+        Zrušení čekající úlohy požadavek opustí.
+
+        Argumenty:
+            topic (str): Téma, na které je požadavek publikován.
+            payload (dict): Obsah požadavku.
+            source_module_id (str): ID modulu, který požadavek odesílá.
+            timeout (Optional[float]): Počet sekund čekání na odpověď, výchozí je ``request_timeout``.
+
+        Vrací:
+            Any: Hodnota ``result`` odeslaná odpovídajícím modulem.
+
+        Vyvolá:
+            asyncio.TimeoutError: Pokud odpověď nedorazí včas.
+            EventBusRequestError: Pokud odpovídající modul ohlásil chybu.
+            EventBusNoResponderError: Pokud téma nikdo neodebírá.
+            EventBusOverflowError: Pokud je fronta tématu plná a požadavek zahodila.
+        """
+        if not self._reply_subscribed:
+            self._reply_subscribed = True
+            await self.subscribe(self.reply_topic, self._handle_reply, "event_bus")
+
+        correlation_id = uuid.uuid4().hex
+        future = asyncio.get_running_loop().create_future()
+        self._pending_requests[correlation_id] = future
+        try:
+            message = {**payload, "correlation_id": correlation_id, "reply_to": self.reply_topic}
+            transport = self._transport
+            exported = transport is not None and transport.exports(topic)
+            if exported:
+                transport.send(topic, message, source_module_id)
+            elif not self._match(topic):
+                raise EventBusNoResponderError(f"No responder subscribed to request topic '{topic}'.")
+            # With subscribers, a message that was not routed was dropped by a full queue
+            if not await self._route(topic, message, source_module_id) and not exported:
+                raise EventBusOverflowError(f"Queue of request topic '{topic}' is full, request dropped.")
+            return await asyncio.wait_for(future, timeout if timeout is not None else self.request_timeout)
+        finally:
+            self._pending_requests.pop(correlation_id, None)
+
+    async def reply(
+        self, request_message: dict, result: Any = None, source_module_id: str = "", error: Optional[str] = None
+    ) -> None:
+        """
+        Answers a message received from request(). Messages without a ``reply_to``
+        topic were plainly published and are ignored.
+
+        Args:
+            request_message (dict): The request as delivered to the subscriber.
+            result (Any): The result handed back to the requester.
+            source_module_id (str): The ID of the module replying.
+            error (Optional[str]): Error description; makes request() raise EventBusRequestError.
+
+        Odpoví na zprávu přijatou z request(). Zprávy bez tématu ``reply_to``
+        byly běžně publikovány a jsou ignorovány.
+
+        Argumenty:
+            request_message (dict): Požadavek tak, jak byl doručen odběrateli.
+            result (Any): Výsledek předaný žadateli.
+            source_module_id (str): ID modulu, který odpovídá.
+            error (Optional[str]): Popis chyby; request() pak vyvolá EventBusRequestError.
+        """
+        reply_to = request_message.get("reply_to")
+        if not reply_to:
+            return
+        response = {"correlation_id": request_message.get("correlation_id"), "result": result}
+        if error is not None:
+            response["error"] = error
+        await self.publish(reply_to, response, source_module_id)
+
+    async def serve(self, topic: str, handler: Callable, module_id: str) -> Callable:
+        """
+        Subscribes a request handler whose return value is sent back as the reply.
+        Exceptions raised by the handler are reported to the requester.
+
+        Args:
+            topic (str): The request topic (patterns are allowed).
+            handler (Callable): Coroutine function taking the request message.
+            module_id (str): The ID of the serving module.
+
+        Returns:
+            Callable: The subscribed callback, to be passed to unsubscribe().
+
+        Přihlásí obsluhu požadavků, jejíž návratová hodnota je odeslána jako odpověď.
+        Výjimky vyvolané obsluhou jsou nahlášeny žadateli.
+
+        Argumenty:
+            topic (str): Téma požadavků (vzory jsou povoleny).
+            handler (Callable): Korutinová funkce přijímající zprávu požadavku.
+            module_id (str): ID obsluhujícího modulu.
+
+        Vrací:
+            Callable: Přihlášený callback, který lze předat do unsubscribe().
+        """
+        async def _serve(message: dict):
+            try:
+                result = await handler(message)
+            except Exception as e:
+                self.logger.error(f"Request handler of '{module_id}' failed on topic '{topic}': {e}", exc_info=True)
+                await self.reply(message, source_module_id=module_id, error=str(e) or type(e).__name__)
+            else:
+                await self.reply(message, result, module_id)
+
+        await self.subscribe(topic, _serve, module_id)
+        return _serve
+
+    async def _handle_reply(self, message: dict):
+        future = self._pending_requests.get(message.get("correlation_id"))
+        if future is None or future.done():
+            # Late reply of a request that already timed out or was cancelled
+            return
+        if "error" in message:
+            future.set_exception(EventBusRequestError(message["error"]))
+        else:
+            future.set_result(message.get("result"))
+
+    def _is_logged(self, topic: str) -> bool:
+        """
+        Checks whether messages of a topic are written to the event log.
+
+        Ověří, zda jsou zprávy daného tématu zapisovány do logu událostí.
+        """
+        logged = self._log_cache.get(topic)
+        if logged is None:
+            logged = any(topic_matches(pattern, topic) for pattern in self._log_patterns)
+            if len(self._log_cache) >= self.match_cache_size:
+                self._log_cache.clear()
+            self._log_cache[topic] = logged
+        return logged
+
+    async def replay(
+        self,
+        topic: str,
+        callback: Callable,
+        from_offset: int = 0,
+        to_offset: Optional[int] = None,
+        with_topic: bool = False,
+    ) -> int:
+        """
+        Delivers logged messages matching a topic pattern to a callback, oldest first.
+        Meant for startup: subscribe first, then replay up to the ``next_offset`` of
+        the event log taken before subscribing, so nothing is missed.
+
+        Args:
+            topic (str): Topic or topic pattern to replay.
+            callback (Callable): Async function called with every replayed message.
+            from_offset (int): First log offset to replay.
+            to_offset (Optional[int]): Offset to stop before, defaults to everything committed.
+            with_topic (bool): Call the callback with the logged topic and the message, so
+                one replay of a pattern can be routed to several handlers.
+
+        Returns:
+            int: The offset to replay from next time.
+
+        Doručí zalogované zprávy odpovídající vzoru tématu callbacku, od nejstarší.
+        Určeno pro start: nejprve se přihlásit k odběru a pak přehrát až po ``next_offset``
+        logu událostí zjištěný před přihlášením, aby se nic neztratilo.
+
+        Argumenty:
+            topic (str): Téma nebo vzor tématu k přehrání.
+            callback (Callable): Asynchronní funkce volaná s každou přehranou zprávou.
+            from_offset (int): První offset logu k přehrání.
+            to_offset (Optional[int]): Offset, před kterým se skončí, výchozí je vše zapsané.
+            with_topic (bool): Volat callback se zalogovaným tématem a zprávou, aby šlo jedno
+                přehrání vzoru rozdělit mezi více obsluh.
+
+        Vrací:
+            int: Offset, od kterého se má příště přehrávat.
+        """
+        if self.event_log is None:
+            return from_offset
+        await self.event_log.flush()
+        # The pattern is compiled once and matched once per distinct logged topic
+        trie = _SubscriptionTrie()
+        trie.insert(topic, True)
+        targets: Dict[str, Tuple[Callable, ...]] = {}
+        next_offset = from_offset
+        replayed = 0
+        async for offset, logged_topic, _, message in self.event_log.replay(from_offset, to_offset):
+            next_offset = offset + 1
+            target = targets.get(logged_topic)
+            if target is None:
+                if not trie.match(logged_topic):
+                    target = ()
+                else:
+                    target = (functools.partial(callback, logged_topic) if with_topic else callback,)
+                targets[logged_topic] = target
+            if target:
+                replayed += 1
+                await self._deliver(logged_topic, message, target)
+        if to_offset is not None:
+            next_offset = max(next_offset, min(to_offset, self.event_log.committed_offset))
+        else:
+            next_offset = max(next_offset, self.event_log.committed_offset)
+        self.logger.info(f"Replayed {replayed} messages of '{topic}' from offset {from_offset}.")
+        return next_offset
+
+    async def _route(self, topic: str, message: dict, source_module_id: str) -> bool:
+        """
+        Hands one message to its subscribers, either inline or through the dispatch shards.
+
+        Returns:
+            bool: True if the message was delivered, queued or merged.
+
+        Předá jednu zprávu jejím odběratelům, buď přímo, nebo přes doručovací shardy.
+
+        Vrací:
+            bool: True, pokud byla zpráva doručena, zařazena nebo sloučena.
+        """
+        route = self._routes.get(topic)
+        if route is None:
+            route = self._build_route(topic)
+        callbacks, inline, shard = route
+
+        if shard is not None:
+            # Common case: topic mode, queued delivery
+            envelope = {"topic": topic, "message": message, "source_id": source_module_id, "enqueued_at": _now()}
+            accepted = shard.offer(envelope)
+            if accepted is None:
+                accepted = await shard.put(envelope)
+            if not accepted:
+                self.logger.debug(f"Message to topic '{topic}' from '{source_module_id}' dropped, queue is full.")
+            return accepted
+
+        if not callbacks:
+            # Nobody listens, skip the envelope and the queue hop altogether
+            return False
+
+        if inline:
+            await self._deliver(topic, message, callbacks)
+            return True
+
+        for callback in callbacks:
+            # Every lane gets its own envelope, coalescing mutates it in place
+            lane_envelope = {"topic": topic, "message": message, "source_id": source_module_id, "enqueued_at": _now()}
+            lane = self._get_shard(topic, callback)
+            if lane.offer(lane_envelope) is None:
+                await lane.put(lane_envelope)
+        return True
+
+    def _build_route(self, topic: str) -> Tuple[Tuple[Callable, ...], bool, Optional[_DispatchShard]]:
+        """
+        Resolves and caches how messages of a topic are delivered: the matching
+        callbacks, whether the topic is inline, and its shard in topic dispatch mode.
+
+        Vyhodnotí a uloží do mezipaměti, jak jsou doručovány zprávy tématu:
+        odpovídající callbacky, zda je téma inline a jeho shard v režimu "topic".
+        """
+        callbacks = self._match(topic)
+        inline = bool(callbacks) and self._resolve_topic_config(topic).get("inline", False)
+        shard = None
+        if callbacks and not inline and self.dispatch_mode == "topic":
+            shard = self._get_shard(topic)
+        route = (callbacks, inline, shard)
+        if len(self._routes) >= self.match_cache_size:
+            self._routes.clear()
+        self._routes[topic] = route
+        return route
+
+    def _get_shard(self, topic: str, callback: Optional[Callable] = None) -> _DispatchShard:
+        """
+        Returns the dispatch shard for a topic (or a topic/subscriber pair),
+        creating it and its worker on first use.
+
+        Args:
+            topic (str): The topic of the message.
+            callback (Optional[Callable]): The subscriber, used only in "subscriber" dispatch mode.
+
+        Returns:
+            _DispatchShard: The shard that should receive the message.
+
+        Vrátí doručovací shard pro téma (nebo dvojici téma/odběratel),
+        při prvním použití jej vytvoří včetně pracovní úlohy.
+
+        Argumenty:
+            topic (str): Téma zprávy.
+            callback (Optional[Callable]): Odběratel, používá se pouze v režimu "subscriber".
+
+        Vrací:
+            _DispatchShard: Shard, který má zprávu přijmout.
+        """
+        key = (topic,) if callback is None else (topic, callback)
+        shard = self._shards.get(key)
+        if shard is None:
+            topic_cfg = self._resolve_topic_config(topic)
+            shard = _DispatchShard(
+                key,
+                topic,
+                callback,
+                capacity=int(topic_cfg.get("capacity", self.queue_capacity)),
+                policy=OverflowPolicy(topic_cfg.get("overflow_policy", self.overflow_policy)),
+                coalesce_key=topic_cfg.get("coalesce_key"),
+            )
+            if self.metrics_enabled:
+                # Shared by the lanes of a topic and kept when they retire
+                shard.latency = self._queue_latency[topic]
+            self._shards[key] = shard
+            if self._running:
+                self._start_shard(shard)
+        return shard
+
+    def _match(self, topic: str) -> Tuple[Callable, ...]:
+        """
+        Returns the callbacks whose subscription patterns match a concrete topic.
+
+        Args:
+            topic (str): The published topic.
+
+        Returns:
+            Tuple[Callable, ...]: Matching callbacks, each at most once.
+
+        Vrátí callbacky, jejichž vzory odběru odpovídají konkrétnímu tématu.
+
+        Argumenty:
+            topic (str): Publikované téma.
+
+        Vrací:
+            Tuple[Callable, ...]: Odpovídající callbacky, každý nejvýše jednou.
+        """
+        callbacks = self._match_cache.get(topic)
+        if callbacks is None:
+            callbacks = tuple(self._subscription_trie.match(topic))
+            if len(self._match_cache) >= self.match_cache_size:
+                self._match_cache.clear()
+            self._match_cache[topic] = callbacks
+        return callbacks
+
+    def _resolve_topic_config(self, topic: str) -> Dict[str, Any]:
+        """
+        Returns the queue configuration for a topic. An exact entry wins, otherwise
+        the first configured pattern matching the topic is used.
+
+        Vrátí konfiguraci fronty pro téma. Přednost má přesná shoda, jinak se
+        použije první nakonfigurovaný vzor, který tématu odpovídá.
+        """
+        topic_cfg = self._topic_config_cache.get(topic)
+        if topic_cfg is None:
+            topic_cfg = self.topic_config.get(topic)
+            if topic_cfg is None:
+                topic_cfg = next(
+                    (cfg for pattern, cfg in self.topic_config.items() if topic_matches(pattern, topic)), {}
+                )
+            if len(self._topic_config_cache) >= self.match_cache_size:
+                self._topic_config_cache.clear()
+            self._topic_config_cache[topic] = topic_cfg
+        return topic_cfg
+
+    def _start_shard(self, shard: _DispatchShard) -> None:
+        """
+        Spawns the worker task of a shard.
+
+        Spustí pracovní úlohu shardu.
+        """
+        shard.task = asyncio.create_task(self._process_shard(shard))
 
     async def subscribe(self, topic: str, callback: Callable, module_id: str):
         """
         Registers a callback function to receive messages from a specific topic.
+        Topics are dotted hierarchies; the subscription topic may use ``*`` to match
+        exactly one segment and ``#`` to match zero or more segments.
 
         Args:
-            topic (str): The topic to subscribe to.
+            topic (str): The topic or topic pattern to subscribe to.
             callback (Callable): The asynchronous function to call when a message is published to the topic.
             module_id (str): The ID of the module subscribing.
 
         Registruje callback funkci pro příjem zpráv z konkrétního tématu.
+        Témata tvoří hierarchii oddělenou tečkami; téma odběru může použít ``*``
+        pro právě jeden segment a ``#`` pro žádný nebo více segmentů.
 
         Argumenty:
-            topic (str): Téma, k jehož odběru se modul přihlašuje.
+            topic (str): Téma nebo vzor tématu, k jehož odběru se modul přihlašuje.
             callback (Callable): Asynchronní funkce, která se zavolá, když je na téma publikována zpráva.
             module_id (str): ID modulu, který se přihlašuje k odběru.
         """
         if callback not in self.subscribers[topic]:
             self.subscribers[topic].append(callback)
+            self._subscription_trie.insert(topic, callback)
+            self._subscriber_names.setdefault(
+                callback, f"{module_id}:{getattr(callback, '__qualname__', type(callback).__name__)}"
+            )
+            self._match_cache.clear()
+            self._routes.clear()
             self.logger.info(f"Module '{module_id}' subscribed to topic '{topic}'.")
         else:
             self.logger.warning(f"Module '{module_id}' already subscribed to topic '{topic}'.")
@@ -97,79 +991,304 @@ class LONGINEventBus:
         """
         if callback in self.subscribers[topic]:
             self.subscribers[topic].remove(callback)
+            self._subscription_trie.remove(topic, callback)
+            self._match_cache.clear()
+            self._routes.clear()
             self.logger.info(f"Module '{module_id}' unsubscribed from topic '{topic}'.")
             if not self.subscribers[topic]:
                 del self.subscribers[topic]
         else:
             self.logger.warning(f"Module '{module_id}' was not subscribed to topic '{topic}' with this callback.")
 
-    async def _process_message_queue(self):
+    async def _dispatch(self, shard: _DispatchShard, message_data: Dict[str, Any]):
+        """
+        Delivers one message to the subscribers served by a shard, one after another.
+
+        Args:
+            shard (_DispatchShard): The shard the message was taken from.
+            message_data (Dict[str, Any]): The queued message envelope.
+
+        Doručí jednu zprávu odběratelům obsluhovaným shardem, jednomu po druhém.
+
+        Argumenty:
+            shard (_DispatchShard): Shard, ze kterého byla zpráva odebrána.
+            message_data (Dict[str, Any]): Zabalená zpráva z fronty.
+        """
+        topic = message_data["topic"]
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"Processing message for topic '{topic}' from '{message_data['source_id']}'.")
+
+        callbacks = self._match(topic)  # Immutable snapshot, subscriptions may change during the loop
+        if shard.callback is not None:
+            callbacks = (shard.callback,) if shard.callback in callbacks else ()
+        latency = shard.latency
+        if latency is not None:
+            dispatched_at = _now()
+            latency.record(dispatched_at - message_data["enqueued_at"])
+            await self._deliver(topic, message_data["message"], callbacks, dispatched_at)
+        else:
+            await self._deliver(topic, message_data["message"], callbacks)
+
+    async def _deliver(
+        self, topic: str, message: dict, callbacks: Tuple[Callable, ...], started: Optional[float] = None
+    ):
+        """
+        Awaits the given callbacks one after another, logging (not raising) their errors.
+
+        Postupně zavolá zadané callbacky a jejich chyby zaloguje (nevyhazuje je).
+        """
+        if not self.metrics_enabled:
+            for callback in callbacks:
+                try:
+                    await callback(message)
+                except Exception as e:
+                    self.logger.error(f"Error in subscriber callback for topic '{topic}': {e}", exc_info=True)
+            return
+
+        if started is None:
+            started = _now()
+        for callback in callbacks:
+            stats = self._handler_stats.get((topic, callback))
+            if stats is None:
+                stats = self._handler_stats[(topic, callback)] = _HandlerStats(
+                    self._subscriber_names.get(callback) or getattr(callback, "__qualname__", repr(callback))
+                )
+            try:
+                await callback(message)
+            except Exception as e:
+                stats.errors += 1
+                self.logger.error(f"Error in subscriber callback for topic '{topic}': {e}", exc_info=True)
+            finished = _now()
+            elapsed = finished - started
+            started = finished  # The next handler starts where this one ended
+            stats.latency.record(elapsed)
+            if elapsed >= self.slow_handler_threshold:
+                stats.slow += 1
+                self.logger.warning(
+                    f"Slow event handler '{stats.name}' on topic '{topic}': {elapsed:.3f}s "
+                    f"(threshold {self.slow_handler_threshold:.3f}s)."
+                )
+
+    async def _drain(self, shard: _DispatchShard, message_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Dispatches a message and then up to ``dispatch_batch_size - 1`` further
+        messages already waiting in the shard, amortising the concurrency slot.
+
+        Returns:
+            Optional[Dict[str, Any]]: The next message taken from the queue if the
+            batch was exhausted before the queue, otherwise None.
+
+        Doručí zprávu a poté až ``dispatch_batch_size - 1`` dalších zpráv, které
+        již ve shardu čekají, čímž rozloží režii slotu souběžnosti.
+
+        Vrací:
+            Optional[Dict[str, Any]]: Další zprávu odebranou z fronty, pokud byla dávka
+            vyčerpána dříve než fronta, jinak None.
         """
-        Internal method to continuously process messages from the queue and
-        dispatch them to registered subscribers.
+        for _ in range(self.dispatch_batch_size):
+            try:
+                await self._dispatch(shard, message_data)
+            finally:
+                shard.queue.task_done()
+            try:
+                message_data = shard.take(shard.queue.get_nowait())
+            except asyncio.QueueEmpty:
+                return None
+        # Batch exhausted, the worker dispatches this one after yielding the slot
+        return message_data
 
-        Interní metoda pro nepřetržité zpracování zpráv z fronty a
-        jejich odesílání registrovaným odběratelům.
+    async def _process_shard(self, shard: _DispatchShard):
         """
-        self.logger.info("EventBus message processing started.")
+        Internal worker that continuously drains one shard queue and dispatches
+        its messages in order. The number of shards dispatching at the same time
+        is bounded by ``max_concurrency``. The worker retires after being idle
+        for ``worker_idle_timeout`` seconds.
+
+        Args:
+            shard (_DispatchShard): The shard to serve.
+
+        Interní pracovník, který nepřetržitě vyprazdňuje frontu jednoho shardu
+        a doručuje jeho zprávy v pořadí. Počet současně doručujících shardů je
+        omezen hodnotou ``max_concurrency``. Po ``worker_idle_timeout`` sekundách
+        nečinnosti se pracovník ukončí.
+
+        Argumenty:
+            shard (_DispatchShard): Shard, který má být obsluhován.
+        """
+        carry_over: Optional[Dict[str, Any]] = None
         while True:
             try:
-                message_data = await self.message_queue.get()
-                topic = message_data["topic"]
-                message = message_data["message"]
-                source_id = message_data["source_id"]
-
-                self.logger.debug(f"Processing message for topic '{topic}' from '{source_id}'.")
-
-                if topic in self.subscribers:
-                    for callback in list(self.subscribers[topic]):  # Iterate over a copy to allow modification during loop
-                        try:
-                            await callback(message)
-                        except Exception as e:
-                            self.logger.error(f"Error in subscriber callback for topic '{topic}': {e}", exc_info=True)
-                self.message_queue.task_done()
+                try:
+                    if carry_over is not None:
+                        message_data, carry_over = carry_over, None
+                    else:
+                        # get_nowait() avoids the wait_for() task overhead while there is a backlog
+                        message_data = shard.take(shard.queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    try:
+                        message_data = shard.take(
+                            await asyncio.wait_for(shard.queue.get(), timeout=self.worker_idle_timeout)
+                        )
+                    except asyncio.TimeoutError:
+                        # No await between the emptiness check and the removal, so a
+                        # concurrent publish either lands here first or creates a new shard.
+                        if shard.queue.empty() and self._shards.get(shard.key) is shard:
+                            del self._shards[shard.key]
+                            self._routes.pop(shard.topic, None)
+                            retired = self._retired_stats[shard.topic]
+                            retired["enqueued"] += shard.enqueued
+                            retired["dropped"] += shard.dropped
+                            retired["coalesced"] += shard.coalesced
+                            shard.task = None
+                            return
+                        continue
+                if self._dispatch_semaphore is not None:
+                    async with self._dispatch_semaphore:
+                        carry_over = await self._drain(shard, message_data)
+                    if carry_over is not None:
+                        await asyncio.sleep(0)  # Let lanes waiting for a slot in
+                else:
+                    carry_over = await self._drain(shard, message_data)
             except asyncio.CancelledError:
-                self.logger.info("EventBus message processing task cancelled.")
                 break
             except Exception as e:
-                self.logger.error(f"Unexpected error in EventBus message processing loop: {e}", exc_info=True)
+                self.logger.error(f"Unexpected error in EventBus dispatch loop for topic '{shard.topic}': {e}", exc_info=True)
 
     async def start(self):
         """
-        Starts the EventBus by initiating the message processing task.
+        Starts the EventBus by spawning a dispatch worker for every known shard.
+        Shards created later start their worker on first publish.
 
-        Spustí sběrnici událostí zahájením úlohy zpracování zpráv.
+        Spustí sběrnici událostí spuštěním doručovacího pracovníka pro každý známý shard.
+        Později vytvořené shardy spustí svého pracovníka při první publikaci.
         """
-        if self._processing_task is None or self._processing_task.done():
-            self._processing_task = asyncio.create_task(self._process_message_queue())
+        if not self._running:
+            self._running = True
+            if self.event_log is not None:
+                await self.event_log.open()
+            for shard in list(self._shards.values()):
+                if shard.task is None or shard.task.done():
+                    self._start_shard(shard)
+            if self._transport is not None:
+                # Remote messages only take the local route, so they are never re-exported
+                if not await self._transport.connect(self._route):
+                    self.logger.error("Event bus transport failed to connect, continuing with local delivery only.")
+                    self._transport = None
             self.logger.info("LONGINEventBus started.")
         else:
             self.logger.warning("LONGINEventBus is already running.")
 
     async def stop(self):
         """
-        Gracefully stops the EventBus by cancelling the message processing task.
-        It waits for the queue to be empty before stopping.
+        Gracefully stops the EventBus by cancelling all dispatch workers.
+        It waits for all shard queues to be empty before stopping.
 
-        Elegantně zastaví sběrnici událostí zrušením úlohy zpracování zpráv.
-        Před zastavením počká, dokud nebude fronta prázdná.
+        Elegantně zastaví sběrnici událostí zrušením všech doručovacích pracovníků.
+        Před zastavením počká, dokud nebudou všechny fronty shardů prázdné.
         """
-        if self._processing_task and not self._processing_task.done():
+        if self._running:
             self.logger.info("Stopping LONGINEventBus. Waiting for pending messages...")
+            if self._transport is not None:
+                await self._transport.disconnect()
             try:
-                await asyncio.wait_for(self.message_queue.join(), timeout=5) # Wait for messages to be processed
+                await asyncio.wait_for(
+                    asyncio.gather(*(shard.queue.join() for shard in list(self._shards.values()))),
+                    timeout=5,
+                )  # Wait for messages to be processed
             except asyncio.TimeoutError:
-                self.logger.warning("EventBus queue not empty after timeout. Some messages might be unprocessed.")
-            self._processing_task.cancel()
-            try:
-                await self._processing_task
-            except asyncio.CancelledError:
-                pass # Task was cancelled as expected
-            self._processing_task = None
+                self.logger.warning("EventBus queues not empty after timeout. Some messages might be unprocessed.")
+            self._running = False
+            tasks = [shard.task for shard in self._shards.values() if shard.task and not shard.task.done()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)  # Tasks were cancelled as expected
+            for shard in self._shards.values():
+                shard.task = None
+            if self.event_log is not None:
+                await self.event_log.close()
             self.logger.info("LONGINEventBus stopped.")
         else:
             self.logger.warning("LONGINEventBus is not running or already stopped.")
 
+    def get_queue_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns queue depth and overflow counters for every topic, to help size
+        the per-topic capacities.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Per-topic ``depth``, ``capacity``, ``overflow_policy``,
+            ``high_watermark``, ``enqueued``, ``dropped`` and ``coalesced`` values.
+
+        Vrátí hloubku fronty a čítače přetečení pro každé téma, aby bylo možné
+        správně nastavit kapacity jednotlivých témat.
+
+        Vrací:
+            Dict[str, Dict[str, Any]]: Hodnoty ``depth``, ``capacity``, ``overflow_policy``,
+            ``high_watermark``, ``enqueued``, ``dropped`` a ``coalesced`` pro každé téma.
+        """
+        stats: Dict[str, Dict[str, Any]] = {}
+        for topic, retired in self._retired_stats.items():
+            stats[topic] = {"depth": 0, "capacity": None, "overflow_policy": None, "high_watermark": 0, **retired}
+        for shard in list(self._shards.values()):
+            entry = stats.setdefault(
+                shard.topic,
+                {"depth": 0, "capacity": None, "overflow_policy": None, "high_watermark": 0,
+                 "enqueued": 0, "dropped": 0, "coalesced": 0},
+            )
+            entry["depth"] += shard.queue.qsize()
+            entry["capacity"] = shard.capacity
+            entry["overflow_policy"] = shard.policy.value
+            entry["high_watermark"] = max(entry["high_watermark"], shard.high_watermark)
+            entry["enqueued"] += shard.enqueued
+            entry["dropped"] += shard.dropped
+            entry["coalesced"] += shard.coalesced
+        return stats
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Returns a snapshot of the bus instrumentation: per topic the queue state,
+        the enqueue-to-dispatch latency and, per subscriber, the handler execution
+        time, error and slow-call counts. Latencies are p50/p95/p99 estimates in ms.
+
+        Returns:
+            Dict[str, Any]: ``topics`` keyed by topic, plus ``pending_requests`` and
+            ``transport`` (if one is attached).
+
+        Vrátí snímek instrumentace sběrnice: pro každé téma stav fronty, latenci
+        od zařazení po doručení a pro každého odběratele dobu provádění obsluhy,
+        počet chyb a pomalých volání. Latence jsou odhady p50/p95/p99 v ms.
+
+        Vrací:
+            Dict[str, Any]: ``topics`` podle tématu, dále ``pending_requests`` a
+            ``transport`` (pokud je připojen).
+        """
+        topics: Dict[str, Dict[str, Any]] = {}
+
+        def entry(topic: str) -> Dict[str, Any]:
+            return topics.setdefault(topic, {"queue": None, "queue_latency": None, "handlers": {}})
+
+        for topic, queue_stats in self.get_queue_stats().items():
+            entry(topic)["queue"] = queue_stats
+        for topic, histogram in list(self._queue_latency.items()):
+            entry(topic)["queue_latency"] = histogram.snapshot()
+        for (topic, _), stats in list(self._handler_stats.items()):
+            entry(topic)["handlers"][stats.name] = {
+                **stats.latency.snapshot(),
+                "errors": stats.errors,
+                "slow": stats.slow,
+            }
+
+        metrics: Dict[str, Any] = {
+            "topics": topics,
+            "slow_handler_threshold_ms": self.slow_handler_threshold * 1e3,
+            "pending_requests": len(self._pending_requests),
+        }
+        if self._transport is not None and hasattr(self._transport, "get_stats"):
+            metrics["transport"] = self._transport.get_stats()
+        if self.event_log is not None:
+            metrics["event_log"] = self.event_log.get_stats()
+        return metrics
+
     def determine_communication_type(self, source_level: int, target_level: int) -> str:
         """
         Determines the communication type based on the hierarchical levels of source and target modules.
@@ -0,0 +1,338 @@
+import logging
+import asyncio
+import json
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+# Record header: crc32 of the payload, payload length, record offset
+_HEADER = struct.Struct("<IIQ")
+_SEGMENT_SUFFIX = ".log"
+# Built once: json.dumps() with arguments constructs a new encoder on every call
+_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class EventLog:
+    """
+    Append-only, segment-based on-disk log of event bus messages. Appends only
+    encode into a memory buffer; a background writer commits the buffer with one
+    sequential write and one fsync per batch (group commit), so the durability
+    cost is shared by all messages published within ``commit_interval``.
+
+    Every record gets a monotonically increasing offset. Segments are named after
+    the offset of their first record, which makes finding the segment to replay
+    from a directory listing.
+
+    Jen připisovatelný log zpráv sběrnice událostí na disku rozdělený do segmentů.
+    Připsání pouze zakóduje zprávu do paměťového bufferu; pracovník na pozadí
+    zapíše buffer jedním sekvenčním zápisem a jedním fsync na dávku (group commit),
+    takže náklady na trvanlivost sdílejí všechny zprávy publikované během
+    ``commit_interval``.
+
+    Každý záznam dostane monotónně rostoucí offset. Segmenty jsou pojmenovány podle
+    offsetu svého prvního záznamu, takže nalezení segmentu pro přehrání stačí
+    výpis adresáře.
+    """
+
+    def __init__(self, config: dict, logger: logging.Logger):
+        """
+        Initializes the event log. Nothing is touched on disk before open().
+
+        Args:
+            config (dict): Configuration dictionary. Recognised keys: ``path``,
+                ``segment_bytes``, ``commit_interval``, ``max_batch_bytes``, ``fsync``
+                and ``retention_segments`` (0 keeps every segment).
+            logger (logging.Logger): Logger instance for the event log.
+
+        Inicializuje log událostí. Před open() se na disk nic nezapisuje.
+
+        Argumenty:
+            config (dict): Konfigurační slovník. Podporované klíče: ``path``,
+                ``segment_bytes``, ``commit_interval``, ``max_batch_bytes``, ``fsync``
+                a ``retention_segments`` (0 ponechá všechny segmenty).
+            logger (logging.Logger): Instance loggeru pro log událostí.
+        """
+        self.config = config
+        self.logger = logger
+        self.path = Path(config.get("path", "data/event_log"))
+        self.segment_bytes: int = int(config.get("segment_bytes", 64 * 1024 * 1024))
+        self.commit_interval: float = float(config.get("commit_interval", 0.005))
+        self.max_batch_bytes: int = int(config.get("max_batch_bytes", 1024 * 1024))
+        self.fsync: bool = bool(config.get("fsync", True))
+        self.retention_segments: int = int(config.get("retention_segments", 0))
+        # Offset the next appended record gets, and the first one not yet on disk
+        self.next_offset = 0
+        self.committed_offset = 0
+        self._buffer: List[bytes] = []
+        self._buffer_bytes = 0
+        self._buffer_ready = asyncio.Event()
+        self._write_lock = asyncio.Lock()
+        self._writer_task: Optional[asyncio.Task] = None
+        self._segment_file = None
+        self._segment_size = 0
+        self._segments: List[int] = []
+        # Counters
+        self.commits = 0
+        self.bytes_written = 0
+
+    async def open(self) -> None:
+        """
+        Opens the log, recovering the write position from the last segment. A torn
+        record left by a crash is truncated.
+
+        Otevře log a obnoví pozici zápisu z posledního segmentu. Neúplný záznam
+        po pádu je oříznut.
+        """
+        await asyncio.to_thread(self._recover)
+        self._writer_task = asyncio.create_task(self._commit_loop())
+        self.logger.info(f"EventLog opened at '{self.path}', next offset {self.next_offset}.")
+
+    async def close(self) -> None:
+        """
+        Commits the buffered records and closes the active segment.
+
+        Zapíše bufferované záznamy a uzavře aktivní segment.
+        """
+        if self._writer_task:
+            self._writer_task.cancel()
+            await asyncio.gather(self._writer_task, return_exceptions=True)
+            self._writer_task = None
+        await self.flush()
+        if self._segment_file is not None:
+            await asyncio.to_thread(self._segment_file.close)
+            self._segment_file = None
+        self.logger.info(f"EventLog closed at offset {self.committed_offset}.")
+
+    def append(self, topic: str, message: dict, source_id: str) -> int:
+        """
+        Buffers a message for the next group commit. Does not block.
+
+        Args:
+            topic (str): The topic of the message.
+            message (dict): The content of the message.
+            source_id (str): The ID of the publishing module.
+
+        Returns:
+            int: The offset assigned to the message.
+
+        Uloží zprávu do bufferu pro další group commit. Neblokuje.
+
+        Argumenty:
+            topic (str): Téma zprávy.
+            message (dict): Obsah zprávy.
+            source_id (str): ID publikujícího modulu.
+
+        Vrací:
+            int: Offset přidělený zprávě.
+        """
+        offset = self.next_offset
+        payload = _ENCODER.encode([topic, source_id, message]).encode("utf-8")
+        self._buffer.append(_HEADER.pack(zlib.crc32(payload), len(payload), offset))
+        self._buffer.append(payload)
+        self._buffer_bytes += _HEADER.size + len(payload)
+        self.next_offset = offset + 1
+        if self._buffer_bytes >= self.max_batch_bytes:
+            self._buffer_ready.set()
+        return offset
+
+    async def flush(self) -> None:
+        """
+        Writes (and fsyncs) everything appended so far. If the write fails, the
+        batch goes back to the front of the buffer and the next flush retries it.
+
+        Zapíše (a provede fsync) vše, co bylo dosud připsáno. Pokud zápis selže,
+        dávka se vrátí na začátek bufferu a další flush ji zkusí zapsat znovu.
+        """
+        async with self._write_lock:
+            if not self._buffer:
+                return
+            chunks, end_offset, chunk_bytes = self._buffer, self.next_offset, self._buffer_bytes
+            self._buffer, self._buffer_bytes = [], 0
+            try:
+                await asyncio.to_thread(self._write, chunks, self.committed_offset)
+            except Exception:
+                # Records appended meanwhile have later offsets, they stay behind the batch
+                self._buffer[:0] = chunks
+                self._buffer_bytes += chunk_bytes
+                raise
+            self.committed_offset = end_offset
+            self.commits += 1
+
+    async def replay(
+        self, from_offset: int = 0, to_offset: Optional[int] = None, chunk_bytes: int = 1024 * 1024
+    ) -> AsyncIterator[Tuple[int, str, str, dict]]:
+        """
+        Yields committed records starting at ``from_offset``, in order. Disk reads
+        run in a worker thread, ``chunk_bytes`` at a time.
+
+        Args:
+            from_offset (int): First offset to yield.
+            to_offset (Optional[int]): Offset to stop before, defaults to the committed end.
+            chunk_bytes (int): Bytes read per worker thread call.
+
+        Yields:
+            Tuple[int, str, str, dict]: ``(offset, topic, source_id, message)``.
+
+        Postupně vrací zapsané záznamy počínaje ``from_offset``. Čtení z disku
+        probíhá v pracovním vlákně po ``chunk_bytes`` bajtech.
+
+        Argumenty:
+            from_offset (int): První vrácený offset.
+            to_offset (Optional[int]): Offset, před kterým se skončí, výchozí je konec zapsaných dat.
+            chunk_bytes (int): Počet bajtů přečtených na jedno volání pracovního vlákna.
+
+        Vrací postupně:
+            Tuple[int, str, str, dict]: ``(offset, topic, source_id, message)``.
+        """
+        end = self.committed_offset if to_offset is None else min(to_offset, self.committed_offset)
+        segments = list(self._segments)
+        start_index = 0
+        for index, base in enumerate(segments):
+            if base <= from_offset:
+                start_index = index
+        for base in segments[start_index:]:
+            if base >= end:
+                break
+            position = 0
+            while True:
+                records, position = await asyncio.to_thread(self._read_chunk, base, position, chunk_bytes)
+                if not records:
+                    break
+                for record in records:
+                    if record[0] >= end:
+                        return
+                    if record[0] >= from_offset:
+                        yield record
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Returns log counters.
+
+        Vrátí čítače logu.
+        """
+        return {
+            "path": str(self.path),
+            "next_offset": self.next_offset,
+            "committed_offset": self.committed_offset,
+            "segments": len(self._segments),
+            "commits": self.commits,
+            "bytes_written": self.bytes_written,
+            "buffered_bytes": self._buffer_bytes,
+        }
+
+    async def _commit_loop(self) -> None:
+        while True:
+            try:
+                try:
+                    await asyncio.wait_for(self._buffer_ready.wait(), timeout=self.commit_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._buffer_ready.clear()
+                await self.flush()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self.logger.error(f"Failed to commit event log batch: {e}", exc_info=True)
+                await asyncio.sleep(1.0)
+
+    def _segment_path(self, base: int) -> Path:
+        return self.path / f"{base:020d}{_SEGMENT_SUFFIX}"
+
+    def _recover(self) -> None:
+        """Finds the segments and the end of the last valid record (runs in a worker thread)."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._segments = sorted(
+            int(entry.stem) for entry in self.path.glob(f"*{_SEGMENT_SUFFIX}") if entry.stem.isdigit()
+        )
+        if not self._segments:
+            self._segments = [0]
+        base = self._segments[-1]
+        path = self._segment_path(base)
+        next_offset, valid_bytes = base, 0
+        if path.exists():
+            with open(path, "rb") as f:
+                data = f.read()
+            for offset, _, _, _, end in self._iter_records(data, 0):
+                next_offset, valid_bytes = offset + 1, end
+            if valid_bytes < len(data):
+                self.logger.warning(
+                    f"Truncating {len(data) - valid_bytes} bytes of incomplete records in '{path}'."
+                )
+        self._segment_file = open(path, "ab")
+        self._segment_file.truncate(valid_bytes)
+        self._segment_size = valid_bytes
+        self.next_offset = self.committed_offset = next_offset
+
+    def _write(self, chunks: List[bytes], first_offset: int) -> None:
+        """Appends a batch to the active segment, rolling it when full (runs in a worker thread)."""
+        if self._segment_size >= self.segment_bytes:
+            self._segment_file.close()
+            self._segments.append(first_offset)
+            self._segment_file = open(self._segment_path(first_offset), "ab")
+            self._segment_size = 0
+            if self.retention_segments and len(self._segments) > self.retention_segments:
+                for base in self._segments[:-self.retention_segments]:
+                    try:
+                        os.remove(self._segment_path(base))
+                    except FileNotFoundError:
+                        pass
+                del self._segments[:-self.retention_segments]
+        data = b"".join(chunks)
+        try:
+            self._segment_file.write(data)
+            self._segment_file.flush()
+            if self.fsync:
+                os.fsync(self._segment_file.fileno())
+        except Exception:
+            self._discard_partial_write()
+            raise
+        self._segment_size += len(data)
+        self.bytes_written += len(data)
+
+    def _discard_partial_write(self) -> None:
+        """Cuts the active segment back to its last committed record after a failed write."""
+        try:
+            # Closing drops whatever the failed write left in the file object's buffer
+            self._segment_file.close()
+        except OSError:
+            pass
+        self._segment_file = open(self._segment_path(self._segments[-1]), "ab")
+        self._segment_file.truncate(self._segment_size)
+
+    def _read_chunk(self, base: int, position: int, chunk_bytes: int) -> Tuple[List[Tuple[int, str, str, dict]], int]:
+        """Reads whole records of a segment from a byte position (runs in a worker thread)."""
+        try:
+            with open(self._segment_path(base), "rb") as f:
+                f.seek(position)
+                data = f.read(chunk_bytes)
+                if len(data) >= _HEADER.size:
+                    # Make sure at least the first record fits, however large it is
+                    _, length, _ = _HEADER.unpack_from(data, 0)
+                    if _HEADER.size + length > len(data):
+                        data += f.read(_HEADER.size + length - len(data))
+        except FileNotFoundError:
+            # Removed by retention in the meantime
+            return [], position
+        records = []
+        consumed = 0
+        for offset, topic, source_id, message, end in self._iter_records(data, 0):
+            records.append((offset, topic, source_id, message))
+            consumed = end
+        return records, position + consumed
+
+    def _iter_records(self, data: bytes, position: int):
+        """Yields ``(offset, topic, source_id, message, end_position)`` until the first incomplete record."""
+        while position + _HEADER.size <= len(data):
+            crc, length, offset = _HEADER.unpack_from(data, position)
+            start = position + _HEADER.size
+            end = start + length
+            if end > len(data):
+                return
+            payload = data[start:end]
+            if zlib.crc32(payload) != crc:
+                return
+            topic, source_id, message = json.loads(payload)
+            yield offset, topic, source_id, message, end
+            position = end
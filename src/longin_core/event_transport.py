@@ -0,0 +1,325 @@
+import logging
+import asyncio
+import json
+import os
+import socket
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from .event_bus import topic_matches
+
+try:
+    import redis.asyncio as redis  # type: ignore
+except ImportError:  # Graceful degradation – will be logged in connect()
+    redis = None  # pytype: disable=annotation-type-mismatch
+
+
+# Callback used by a transport to hand remote messages to the local bus: (topic, message, source_id)
+RemoteDeliver = Callable[[str, dict, str], Awaitable[Any]]
+
+
+class EventBusTransport(ABC):
+    """
+    Abstract base class for transports that bridge LONGINEventBus topics
+    between processes or nodes.
+
+    Abstraktní základní třída pro transporty, které propojují témata
+    LONGINEventBus mezi procesy nebo uzly.
+    """
+
+    def __init__(self, config: dict, logger: logging.Logger):
+        """
+        Initializes the transport with configuration and a logger.
+
+        Args:
+            config (dict): Configuration dictionary for the transport. ``topics`` lists
+                the topic patterns forwarded to other nodes (default: all topics).
+            logger (logging.Logger): Logger instance for the transport.
+
+        Inicializuje transport s konfigurací a loggerem.
+
+        Argumenty:
+            config (dict): Konfigurační slovník pro transport. ``topics`` obsahuje
+                vzory témat předávaných ostatním uzlům (výchozí: všechna témata).
+            logger (logging.Logger): Instance loggeru pro transport.
+        """
+        self.config = config
+        self.logger = logger
+        self.node_id: str = config.get("node_id") or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.topic_patterns: List[str] = list(config.get("topics", ["#"]))
+        self._export_cache: Dict[str, bool] = {}
+
+    def exports(self, topic: str) -> bool:
+        """
+        Checks whether messages of a topic are forwarded through the transport.
+
+        Ověří, zda jsou zprávy daného tématu předávány přes transport.
+        """
+        exported = self._export_cache.get(topic)
+        if exported is None:
+            exported = any(topic_matches(pattern, topic) for pattern in self.topic_patterns)
+            if len(self._export_cache) >= 4096:
+                self._export_cache.clear()
+            self._export_cache[topic] = exported
+        return exported
+
+    @abstractmethod
+    async def connect(self, deliver: RemoteDeliver) -> bool:
+        """
+        Connects the transport and starts receiving remote messages.
+
+        Args:
+            deliver (RemoteDeliver): Coroutine that hands a remote message to the local bus.
+
+        Returns:
+            bool: True if the connection was successful, False otherwise.
+
+        Připojí transport a začne přijímat vzdálené zprávy.
+
+        Argumenty:
+            deliver (RemoteDeliver): Korutina, která předá vzdálenou zprávu lokální sběrnici.
+
+        Vrací:
+            bool: True, pokud bylo připojení úspěšné, jinak False.
+        """
+        pass
+
+    @abstractmethod
+    def send(self, topic: str, message: dict, source_id: str) -> None:
+        """
+        Schedules a local message for delivery to the other nodes. Must not block.
+
+        Naplánuje doručení lokální zprávy ostatním uzlům. Nesmí blokovat.
+        """
+        pass
+
+    @abstractmethod
+    async def disconnect(self) -> bool:
+        """
+        Flushes pending messages, stops receiving and closes the connection.
+
+        Odešle čekající zprávy, ukončí příjem a uzavře spojení.
+        """
+        pass
+
+
+class RedisStreamsTransport(EventBusTransport):
+    """
+    Bridges event bus topics over a Redis Stream. Outgoing messages are buffered
+    and written with pipelined XADD batches; incoming messages are read with
+    XREADGROUP in batches and acknowledged with a single XACK per batch.
+
+    Each node reads through its own consumer group by default, so every node
+    sees every message (broadcast); that group is destroyed on disconnect. Nodes
+    configured with the same ``group`` share the messages between them instead
+    (work queue), and a configured group is kept across restarts.
+
+    Propojuje témata sběrnice událostí přes Redis Stream. Odchozí zprávy jsou
+    bufferovány a zapisovány dávkami XADD v pipeline; příchozí zprávy jsou čteny
+    dávkově pomocí XREADGROUP a potvrzeny jedním XACK na dávku.
+
+    Každý uzel ve výchozím stavu čte přes vlastní skupinu konzumentů, takže každý
+    uzel vidí každou zprávu (broadcast); tato skupina je při odpojení zrušena.
+    Uzly se stejnou ``group`` si zprávy naopak rozdělují (pracovní fronta)
+    a nastavená skupina zůstává zachována i po restartu.
+    """
+
+    def __init__(self, config: dict, logger: logging.Logger, client: Optional[Any] = None):
+        """
+        Initializes the Redis Streams transport.
+
+        Args:
+            config (dict): Transport configuration. ``url`` is taken from the
+                ``redis_store`` storage config; further keys are ``stream``, ``group``,
+                ``batch_size``, ``flush_interval``, ``block_ms``, ``maxlen``,
+                ``max_pending`` and ``topics``.
+            logger (logging.Logger): Logger instance for the transport.
+            client (Optional[Any]): Pre-built ``redis.asyncio`` compatible client (e.g. fakeredis).
+
+        Inicializuje transport nad Redis Streams.
+
+        Argumenty:
+            config (dict): Konfigurace transportu. ``url`` se přebírá z konfigurace
+                úložiště ``redis_store``; další klíče jsou ``stream``, ``group``,
+                ``batch_size``, ``flush_interval``, ``block_ms``, ``maxlen``,
+                ``max_pending`` a ``topics``.
+            logger (logging.Logger): Instance loggeru pro transport.
+            client (Optional[Any]): Předem vytvořený klient kompatibilní s ``redis.asyncio`` (např. fakeredis).
+        """
+        super().__init__(config, logger)
+        self.url: str = config.get("url", "redis://localhost:6379/0")
+        self.stream: str = config.get("stream", "longin:event_bus")
+        self.group: str = config.get("group") or f"longin:{self.node_id}"
+        # A generated group belongs to this process only and is destroyed on disconnect
+        self._owns_group = not config.get("group")
+        self.batch_size: int = int(config.get("batch_size", 256))
+        self.flush_interval: float = float(config.get("flush_interval", 0.005))
+        self.block_ms: int = int(config.get("block_ms", 1000))
+        self.maxlen: Optional[int] = config.get("maxlen", 100000)
+        self.max_pending: int = int(config.get("max_pending", 10000))
+        self.client = client
+        self._owns_client = client is None
+        self._deliver: Optional[RemoteDeliver] = None
+        self._outbox: Deque[Tuple[str, dict, str]] = deque()
+        self._outbox_ready = asyncio.Event()
+        self._writer_task: Optional[asyncio.Task] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._closing = False
+        # Counters
+        self.sent = 0
+        self.received = 0
+        self.dropped = 0
+        self.logger.info(f"RedisStreamsTransport initialized for stream '{self.stream}' (node '{self.node_id}').")
+
+    async def connect(self, deliver: RemoteDeliver) -> bool:
+        if self.client is None:
+            if redis is None:
+                self.logger.error("redis library not available. Install via `pip install redis`.")
+                return False
+            try:
+                self.client = await redis.from_url(self.url, encoding="utf-8", decode_responses=True)
+            except Exception as e:
+                self.logger.error(f"Failed to connect to Redis: {e}")
+                return False
+        try:
+            # Only messages published from now on are of interest to a new group
+            await self.client.xgroup_create(self.stream, self.group, id="$", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                self.logger.error(f"Failed to create consumer group '{self.group}': {e}")
+                return False
+        self._deliver = deliver
+        self._closing = False
+        self._writer_task = asyncio.create_task(self._write_loop())
+        self._reader_task = asyncio.create_task(self._read_loop())
+        self.logger.info(f"RedisStreamsTransport connected to {self.url}, stream '{self.stream}', group '{self.group}'.")
+        return True
+
+    def send(self, topic: str, message: dict, source_id: str) -> None:
+        if len(self._outbox) >= self.max_pending:
+            # Redis is slow or unreachable, keep the newest messages
+            self._outbox.popleft()
+            self.dropped += 1
+        self._outbox.append((topic, message, source_id))
+        if len(self._outbox) >= self.batch_size:
+            self._outbox_ready.set()
+
+    async def disconnect(self) -> bool:
+        # The flag stops the loops even if a client swallows the cancellation
+        self._closing = True
+        tasks = [task for task in (self._reader_task, self._writer_task) if task]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks, timeout=self.block_ms / 1000 + 1.0)
+        self._reader_task = self._writer_task = None
+        try:
+            await self._flush()
+        except Exception as e:
+            self.logger.warning(f"Failed to flush {len(self._outbox)} pending messages to Redis: {e}")
+        if self.client is not None and self._owns_group:
+            # Otherwise every restart would leave a group and its pending entries on the stream
+            try:
+                await self.client.xgroup_destroy(self.stream, self.group)
+            except Exception as e:
+                self.logger.warning(f"Failed to destroy consumer group '{self.group}': {e}")
+        if self.client is not None and self._owns_client:
+            try:
+                await self.client.close()
+            except Exception as e:
+                self.logger.warning(f"Error closing Redis connection: {e}")
+                return False
+        self.logger.info("RedisStreamsTransport disconnected.")
+        return True
+
+    async def _flush(self) -> None:
+        """
+        Writes buffered messages with pipelined XADD commands, one round trip per batch.
+
+        Zapíše bufferované zprávy pomocí XADD v pipeline, jedna výměna na dávku.
+        """
+        while self._outbox:
+            batch = [self._outbox.popleft() for _ in range(min(self.batch_size, len(self._outbox)))]
+            pipe = self.client.pipeline(transaction=False)
+            for topic, message, source_id in batch:
+                fields = {
+                    "topic": topic,
+                    "source": source_id,
+                    "node": self.node_id,
+                    "data": json.dumps(message, ensure_ascii=False, default=str),
+                }
+                if self.maxlen:
+                    pipe.xadd(self.stream, fields, maxlen=self.maxlen, approximate=True)
+                else:
+                    pipe.xadd(self.stream, fields)
+            try:
+                await pipe.execute()
+            except Exception:
+                # Put the batch back so it is retried after the pause
+                self._outbox.extendleft(reversed(batch))
+                raise
+            self.sent += len(batch)
+
+    async def _write_loop(self) -> None:
+        while not self._closing:
+            try:
+                try:
+                    await asyncio.wait_for(self._outbox_ready.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._outbox_ready.clear()
+                await self._flush()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self.logger.error(f"Failed to write events to Redis stream '{self.stream}': {e}")
+                await asyncio.sleep(1.0)
+
+    async def _read_loop(self) -> None:
+        while not self._closing:
+            try:
+                response = await self.client.xreadgroup(
+                    self.group, self.node_id, {self.stream: ">"}, count=self.batch_size, block=self.block_ms
+                )
+                if not response:
+                    # Clients that do not really block (e.g. fakeredis) must not starve the loop
+                    await asyncio.sleep(0)
+                    continue
+                for _, entries in response:
+                    ack_ids = []
+                    for entry_id, fields in entries:
+                        ack_ids.append(entry_id)
+                        if fields.get("node") == self.node_id:
+                            continue  # Already delivered locally when it was published
+                        try:
+                            message = json.loads(fields["data"])
+                        except (KeyError, ValueError) as e:
+                            self.logger.warning(f"Skipping malformed event {entry_id} in stream '{self.stream}': {e}")
+                            continue
+                        self.received += 1
+                        await self._deliver(fields.get("topic", ""), message, fields.get("source", "remote"))
+                    if ack_ids:
+                        await self.client.xack(self.stream, self.group, *ack_ids)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self.logger.error(f"Failed to read events from Redis stream '{self.stream}': {e}")
+                await asyncio.sleep(1.0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Returns transport counters.
+
+        Vrátí čítače transportu.
+        """
+        return {
+            "node_id": self.node_id,
+            "stream": self.stream,
+            "group": self.group,
+            "sent": self.sent,
+            "received": self.received,
+            "dropped": self.dropped,
+            "pending": len(self._outbox),
+        }
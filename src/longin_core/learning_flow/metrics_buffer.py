@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Training Metrics Buffer
+
+This module keeps the metrics history of a training run in bounded memory. The
+LearningFlowRunner used to keep every metrics record of a run as an object and
+wrote them all to ``training_stats.json``; for long runs that is a large,
+ever-growing list.
+
+Instead, every record is appended to a binary file at full resolution (fixed-size
+little-endian records, readable with ``numpy.fromfile``), and memory holds
+columnar numpy arrays of bounded size: when they are full, they are downsampled
+to half their capacity with Largest-Triangle-Three-Buckets (LTTB) on the loss
+curve. LTTB keeps the first and last point and the shape of the curve (spikes
+included), and evaluation points are always kept. Queries ask for a resolution
+and get the curve downsampled to that many points, from memory or, for more
+detail than memory holds, from the file.
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Union
+
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Layout of one record in the metrics file
+RECORD_DTYPE = np.dtype([
+    ("timestamp", "<f8"),
+    ("step", "<i8"),
+    ("loss", "<f4"),
+    ("learning_rate", "<f4"),
+    ("epoch", "<f4"),
+    ("eval_loss", "<f4"),  # NaN when the record has no evaluation
+])
+COLUMNS = RECORD_DTYPE.names
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Select points of a series with Largest-Triangle-Three-Buckets.
+
+    The first and last point are kept; the points in between are split into
+    ``threshold - 2`` buckets, and from each bucket the point forming the largest
+    triangle with the previously selected point and the average of the next
+    bucket is selected.
+
+    Args:
+        x: X values, ascending
+        y: Y values
+        threshold: Number of points to select (at least 3)
+
+    Returns:
+        np.ndarray: Ascending indices of the selected points
+
+    Raises:
+        ValueError: If the threshold is below 3 and there are more points
+    """
+    n = len(x)
+    if threshold >= n:
+        return np.arange(n)
+    if threshold < 3:
+        raise ValueError(f"LTTB needs a threshold of at least 3, got {threshold}")
+
+    x = x.astype(np.float64)
+    y = np.nan_to_num(y.astype(np.float64))
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[end:next_end].mean()
+        next_y = y[end:next_end].mean()
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(areas.argmax())
+        selected[bucket + 1] = previous
+    return selected
+
+
+def downsample(columns: Mapping[str, np.ndarray], resolution: Optional[int]) -> Dict[str, Any]:
+    """
+    Downsample a metrics history for display.
+
+    The training curve (all columns) is reduced to ``resolution`` points with LTTB
+    on the loss; evaluation points are returned separately, all of them.
+
+    Args:
+        columns: Columns of RECORD_DTYPE, of equal length
+        resolution: Number of points of the training curve, None for all
+
+    Returns:
+        Dict with ``points`` (total number of records), ``resolution`` (points
+        returned), one list per column and ``eval`` with ``step``, ``epoch`` and
+        ``eval_loss`` of the evaluation points
+    """
+    total = len(columns["step"])
+    evals = np.flatnonzero(~np.isnan(columns["eval_loss"]))
+    keep = np.arange(total) if resolution is None else lttb_indices(columns["step"], columns["loss"], resolution)
+    result: Dict[str, Any] = {"points": total, "resolution": len(keep)}
+    for name in COLUMNS:
+        if name != "eval_loss":
+            result[name] = columns[name][keep].tolist()
+    result["eval"] = {name: columns[name][evals].tolist() for name in ("step", "epoch", "eval_loss")}
+    return result
+
+
+def load_metrics(path: Union[str, Path], resolution: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Read a metrics file written by MetricsBuffer and downsample it.
+
+    Args:
+        path: Metrics file
+        resolution: Number of points of the training curve, None for all
+
+    Returns:
+        Dict as returned by ``downsample()``
+    """
+    data = Path(path).read_bytes()
+    # A record may be half written while the run is still appending
+    records = np.frombuffer(data[:len(data) - len(data) % RECORD_DTYPE.itemsize], dtype=RECORD_DTYPE)
+    return downsample({name: records[name] for name in COLUMNS}, resolution)
+
+
+class MetricsBuffer:
+    """
+    Bounded in-memory metrics history of one training run, backed by a file.
+
+    ``append()`` writes the record to the file and to the columns in memory.
+    When the columns hold ``capacity`` points, they are downsampled to half of
+    it, so memory stays bounded and appending stays amortized O(1).
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, capacity: int = 2048):
+        """
+        Initialize the buffer.
+
+        Args:
+            path: File the full-resolution history is appended to (None: memory only)
+            capacity: Maximum number of points held in memory
+        """
+        if capacity < 8:
+            raise ValueError(f"Capacity must be at least 8, got {capacity}")
+        self.path = Path(path) if path is not None else None
+        self.capacity = capacity
+        self._columns = {name: np.empty(capacity, dtype=RECORD_DTYPE[name]) for name in COLUMNS}
+        self._size = 0
+        self._file = None
+        self.total_points = 0
+        self.compactions = 0
+
+    def __len__(self) -> int:
+        """Number of points held in memory."""
+        return self._size
+
+    def append(self, record: Mapping[str, Any]) -> None:
+        """
+        Append a metrics record.
+
+        Args:
+            record: Metrics with ``timestamp``, ``step``, ``loss``, ``learning_rate``,
+                ``epoch`` and optionally ``eval_loss``
+        """
+        if self._size == self.capacity:
+            self._compact()
+        row = np.zeros(1, dtype=RECORD_DTYPE)
+        for name in COLUMNS:
+            value = record.get(name)
+            row[name] = np.nan if value is None else value
+            self._columns[name][self._size] = row[name][0]
+        self._size += 1
+        self.total_points += 1
+        if self.path is not None:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "ab")
+            self._file.write(row.tobytes())
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Get a column of the points in memory.
+
+        Args:
+            name: Column name, one of COLUMNS
+
+        Returns:
+            np.ndarray: Read-only view of the column
+        """
+        view = self._columns[name][:self._size]
+        view.flags.writeable = False
+        return view
+
+    def query(self, resolution: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get the history downsampled to a resolution.
+
+        Memory serves the query if it holds at least ``resolution`` points (or all
+        of them); otherwise the file is read. Reading the file blocks, async
+        callers run the query in an executor when ``needs_file()`` is True.
+
+        Args:
+            resolution: Number of points of the training curve, None for all
+
+        Returns:
+            Dict as returned by ``downsample()``, ``points`` counting all records
+        """
+        if self.needs_file(resolution):
+            self.flush()
+            return load_metrics(self.path, resolution)
+        result = downsample({name: self.column(name) for name in COLUMNS}, resolution)
+        result["points"] = self.total_points
+        return result
+
+    def needs_file(self, resolution: Optional[int] = None) -> bool:
+        """Whether a query at this resolution reads the metrics file."""
+        downsampled = self.total_points > self._size
+        return self.path is not None and downsampled and (resolution is None or resolution > self._size)
+
+    def flush(self) -> None:
+        """Flush the records written to the file."""
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self) -> None:
+        """Close the metrics file. Appending later opens it again."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get buffer counters.
+
+        Returns:
+            Dict with points in memory, total points, capacity and compactions
+        """
+        return {
+            "points": self._size,
+            "total_points": self.total_points,
+            "capacity": self.capacity,
+            "compactions": self.compactions,
+        }
+
+    def _compact(self) -> None:
+        step, loss, eval_loss = (self._columns[name][:self._size] for name in ("step", "loss", "eval_loss"))
+        keep = np.union1d(lttb_indices(step, loss, self.capacity // 2), np.flatnonzero(~np.isnan(eval_loss)))
+        if len(keep) >= self.capacity:
+            # Evaluations alone fill the buffer: thin them out as well
+            keep = lttb_indices(step, loss, self.capacity // 2)
+        for name in COLUMNS:
+            self._columns[name][:len(keep)] = self._columns[name][keep]
+        self._size = len(keep)
+        self.compactions += 1
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Training Metrics Channel
+
+This module provides the channel that carries training metrics from the training
+subprocess (train.py) to the LearningFlowRunner, instead of printing them to stdout
+where they are mixed with library output and scraped line by line.
+
+The runner listens on a loopback socket and passes its address to the subprocess,
+together with a one-time token in the environment. The subprocess sends
+length-prefixed JSON frames: a 4-byte big-endian payload length followed by the
+UTF-8 encoded payload. The first frame authenticates the connection, every later
+frame is one metrics record.
+
+The trainer side aggregates its logs before sending, so the logging frequency of
+the trainer does not determine the load on the runner's event loop: training logs
+are merged into at most one frame per interval (the mean loss over the window and
+the latest values of everything else), evaluation and summary logs are sent at
+once.
+
+Only the standard library is used, the module is imported by the training subprocess.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import struct
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Environment variable carrying the connection token to the training subprocess
+TOKEN_ENV_VAR = "LONGIN_METRICS_TOKEN"
+# Frame header: payload length as an unsigned 32-bit big-endian integer
+FRAME_HEADER = struct.Struct(">I")
+# Upper bound of a frame payload; a larger length means a corrupt stream
+MAX_FRAME_SIZE = 1024 * 1024
+# Keys of the Trainer's end-of-training summary log
+SUMMARY_KEYS = ("train_runtime", "train_samples_per_second", "train_loss")
+
+
+class FrameError(Exception):
+    """Raised for a malformed frame on the metrics channel."""
+
+
+def encode_frame(payload: Dict[str, Any]) -> bytes:
+    """
+    Encode a payload as one length-prefixed frame.
+
+    Args:
+        payload: JSON-serializable payload
+
+    Returns:
+        bytes: Frame header and UTF-8 encoded JSON
+
+    Raises:
+        FrameError: If the encoded payload exceeds MAX_FRAME_SIZE
+    """
+    data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    if len(data) > MAX_FRAME_SIZE:
+        raise FrameError(f"Frame of {len(data)} bytes exceeds the limit of {MAX_FRAME_SIZE} bytes")
+    return FRAME_HEADER.pack(len(data)) + data
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    """
+    Read one frame from a stream.
+
+    Args:
+        reader: Stream of the metrics connection
+
+    Returns:
+        The decoded payload, or None at the end of the stream
+
+    Raises:
+        FrameError: If the frame is truncated, too large or not a JSON object
+    """
+    try:
+        header = await reader.readexactly(FRAME_HEADER.size)
+    except asyncio.IncompleteReadError as e:
+        if not e.partial:
+            return None
+        raise FrameError("Truncated frame header") from e
+    (size,) = FRAME_HEADER.unpack(header)
+    if size > MAX_FRAME_SIZE:
+        raise FrameError(f"Frame of {size} bytes exceeds the limit of {MAX_FRAME_SIZE} bytes")
+    try:
+        payload = json.loads(await reader.readexactly(size))
+    except asyncio.IncompleteReadError as e:
+        raise FrameError("Truncated frame payload") from e
+    except ValueError as e:
+        raise FrameError(f"Invalid frame payload: {e}") from e
+    if not isinstance(payload, dict):
+        raise FrameError("Frame payload is not a JSON object")
+    return payload
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """
+    Split a ``host:port`` address.
+
+    Args:
+        address: Address passed to the training subprocess
+
+    Returns:
+        Tuple of host and port
+    """
+    host, _, port = address.rpartition(":")
+    return host, int(port)
+
+
+class MetricsAggregator:
+    """
+    Trainer-side aggregation and rate limiting of metrics logs.
+
+    ``add()`` takes every log of the Trainer and returns the payload to send now,
+    if any. Training logs are merged until ``min_interval`` seconds passed since
+    the last payload; the payload carries the mean loss over the merged logs
+    (``aggregated_logs`` tells how many) and the latest value of every other key.
+    Evaluation and summary logs are sent immediately, merged with the pending
+    training logs, and carry the latest training loss so every payload has one.
+    """
+
+    def __init__(self, min_interval: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the aggregator.
+
+        Args:
+            min_interval: Minimum seconds between two payloads of training logs
+            clock: Monotonic clock, replaceable in tests
+        """
+        self.min_interval = min_interval
+        self.clock = clock
+        self._pending: Dict[str, Any] = {}
+        self._loss_sum = 0.0
+        self._loss_count = 0
+        self._last_loss: Optional[float] = None
+        self._last_sent: Optional[float] = None
+        self.received = 0
+        self.sent = 0
+
+    def add(self, logs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Add a Trainer log.
+
+        Args:
+            logs: Log values, including ``step`` and ``epoch``
+
+        Returns:
+            Payload to send now, or None while training logs are being merged
+        """
+        self.received += 1
+        urgent = any(key.startswith("eval_") for key in logs) or any(key in logs for key in SUMMARY_KEYS)
+        for key, value in logs.items():
+            if key == "loss" and isinstance(value, (int, float)):
+                self._loss_sum += value
+                self._loss_count += 1
+            else:
+                self._pending[key] = value
+        now = self.clock()
+        if urgent or self._last_sent is None or now - self._last_sent >= self.min_interval:
+            return self.flush()
+        return None
+
+    def flush(self) -> Optional[Dict[str, Any]]:
+        """
+        Take the merged logs as a payload, e.g. when training ends.
+
+        Returns:
+            Payload to send, or None if nothing was added since the last one
+        """
+        if not self._pending and not self._loss_count:
+            return None
+        payload = dict(self._pending)
+        if self._loss_count:
+            self._last_loss = self._loss_sum / self._loss_count
+            payload["aggregated_logs"] = self._loss_count
+        if self._last_loss is not None:
+            payload["loss"] = self._last_loss
+        self._pending = {}
+        self._loss_sum = 0.0
+        self._loss_count = 0
+        self._last_sent = self.clock()
+        self.sent += 1
+        return payload
+
+
+class MetricsChannelClient:
+    """
+    Trainer-side connection of the metrics channel.
+
+    Sending is best effort: if the runner goes away, the channel is closed and
+    training continues without metrics.
+    """
+
+    def __init__(self, address: str, token: Optional[str] = None, timeout: float = 10.0):
+        """
+        Connect to the runner and authenticate.
+
+        Args:
+            address: ``host:port`` the runner listens on
+            token: Connection token, read from TOKEN_ENV_VAR if not given
+            timeout: Seconds allowed for connecting and for each send
+        """
+        self._sock: Optional[socket.socket] = socket.create_connection(parse_address(address), timeout=timeout)
+        self.send({"token": token if token is not None else os.environ.get(TOKEN_ENV_VAR, "")})
+
+    def send(self, payload: Dict[str, Any]) -> bool:
+        """
+        Send one frame.
+
+        Args:
+            payload: JSON-serializable payload
+
+        Returns:
+            bool: True if the frame was sent, False if it was dropped or the
+            channel is closed
+        """
+        if self._sock is None:
+            return False
+        try:
+            frame = encode_frame(payload)
+        except (TypeError, ValueError, FrameError) as e:
+            logger.warning(f"Dropping metrics frame: {e}")
+            return False
+        try:
+            self._sock.sendall(frame)
+            return True
+        except OSError as e:
+            logger.warning(f"Metrics channel closed: {e}")
+            self.close()
+            return False
+
+    def close(self) -> None:
+        """Close the connection."""
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            finally:
+                self._sock = None
@@ -5,7 +5,8 @@ Learning Flow Runner
 
 This module provides the LearningFlowRunner class, which manages the fine-tuning
 process of language models within a specified time duration. It handles subprocess
-management, metric parsing, and event broadcasting.
+management, metric collection over a dedicated channel (see metrics_channel.py),
+and event broadcasting.
 """
 
 import asyncio
@@ -14,10 +15,12 @@ import json
 import logging
 import os
 import pathlib
+import secrets
 import shutil
 import signal
 import tempfile
 import time
+from collections import deque
 from enum import Enum, auto
 from typing import Any, Dict, List, Optional, Tuple, Union
 
@@ -25,6 +28,8 @@ from pydantic import BaseModel, Field, validator
 
 # Import event bus for publishing metrics and status updates
 from longin_core.event_bus import LONGINEventBus
+from longin_core.learning_flow.metrics_buffer import MetricsBuffer, load_metrics
+from longin_core.learning_flow.metrics_channel import TOKEN_ENV_VAR, FrameError, read_frame
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -87,6 +92,26 @@ class TrainingConfig(BaseModel):
     lora_dropout: float = Field(0.05, description="LoRA dropout probability")
     max_seq_length: int = Field(512, description="Maximum sequence length")
     seed: int = Field(42, description="Random seed")
+    save_total_limit: int = Field(2, description="Checkpoints kept per run, older ones are deleted")
+    resume_from_checkpoint: Optional[str] = Field(None, description="Checkpoint to continue training from")
+    metrics_interval: float = Field(1.0, description="Minimum seconds between metrics frames of training logs")
+
+
+# Seconds held back at the end of a flow for the final checkpoint and a clean exit
+SHUTDOWN_MARGIN_SECONDS = 120
+# Fraction of the remaining time planned for training steps (throughput varies)
+STEP_BUDGET_SAFETY = 0.95
+# Checkpoints written per flow when the step budget is calibrated
+CHECKPOINTS_PER_FLOW = 10
+# Weight of the latest run in the stored throughput estimate
+THROUGHPUT_SMOOTHING = 0.5
+# Last stderr lines of the training process kept for the log of a failed run
+STDERR_TAIL_LINES = 50
+# Seconds to wait for the metrics frames still buffered when the process exits
+METRICS_DRAIN_TIMEOUT = 5.0
+# Points of the metrics history held in memory and written to training_stats.json
+METRICS_BUFFER_CAPACITY = 2048
+STATS_HISTORY_POINTS = 500
 
 
 class LearningFlowRunner:
@@ -133,8 +158,13 @@ class LearningFlowRunner:
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         self.run_id = f"{self.agent_name}_{timestamp}"
         
-        # Set up output directory
-        self.output_dir = self.base_output_dir / f"agent_{self.agent_id}" / self.run_id
+        # Set up output directory (a run re-queued within the same second gets a suffix)
+        self.agent_output_dir = self.base_output_dir / f"agent_{self.agent_id}"
+        attempt = 1
+        while (self.agent_output_dir / self.run_id).exists():
+            attempt += 1
+            self.run_id = f"{self.agent_name}_{timestamp}_{attempt}"
+        self.output_dir = self.agent_output_dir / self.run_id
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
         # Initialize state and metrics
@@ -143,13 +173,27 @@ class LearningFlowRunner:
         self.end_time = None
         self.process = None
         self.latest_metrics = None
-        self.all_metrics = []
+        # Full resolution goes to metrics.bin, memory keeps a downsampled history
+        self.metrics = MetricsBuffer(self.output_dir / "metrics.bin", capacity=METRICS_BUFFER_CAPACITY)
+        self.cancel_requested = False
+        
+        # Metrics channel, see _start_metrics_channel()
+        self._metrics_server: Optional[asyncio.AbstractServer] = None
+        self._metrics_token = secrets.token_urlsafe(16)
+        self._metrics_task: Optional[asyncio.Task] = None
+        self.metrics_frames = 0
+        self.stderr_tail: deque = deque(maxlen=STDERR_TAIL_LINES)
         
         # Duration in seconds
         self.duration_seconds = self._duration_to_seconds(self.duration)
         
+        # Checkpoint the run continues from, see _find_resume_checkpoint()
+        self.resume_from_checkpoint: Optional[pathlib.Path] = None
+        self.start_step = 0
+        
         # Training configuration
         self.training_config = self._prepare_training_config()
+        self._save_training_config()
         
         logger.info(f"Initialized LearningFlowRunner for agent {self.agent_name} with duration {self.duration.value}")
 
@@ -194,16 +238,31 @@ class LearningFlowRunner:
         batch_size = min(8, 4 + (duration_seconds // 7200))  # Increase batch size with duration, max 8
         gradient_accumulation_steps = min(16, 8 + (duration_seconds // 7200 * 2))  # Scale with duration
         
-        # Estimate max steps based on dataset size and duration
-        # In a real implementation, you would calculate this based on dataset size
-        # For now, we use a simple heuristic: more time = more steps
-        max_steps = duration_seconds // 60  # Roughly one step per minute as a placeholder
-        
-        # Adjust save and eval frequency based on total steps
-        save_steps = max(100, max_steps // 20)  # Save approximately 20 times during training
-        eval_steps = max(100, max_steps // 10)  # Evaluate approximately 10 times during training
+        self.throughput = self._load_throughput().get(model_path)
+        if self.throughput:
+            # Steps this machine completes within the budget, measured on earlier runs
+            seconds_per_step = self.throughput["seconds_per_sample"] * batch_size * gradient_accumulation_steps
+            usable_seconds = duration_seconds - self.throughput["startup_seconds"] - SHUTDOWN_MARGIN_SECONDS
+            max_steps = max(1, int(usable_seconds * STEP_BUDGET_SAFETY / seconds_per_step))
+            # Evenly spaced checkpoints, the last one lands on the final step just before the deadline
+            save_steps = max(1, -(-max_steps // CHECKPOINTS_PER_FLOW))
+            eval_steps = save_steps
+            logging_steps = max(1, min(10, save_steps // 2))
+            logger.info(
+                f"Calibrated step budget for agent {self.agent_id}: {max_steps} steps at "
+                f"{seconds_per_step:.2f} s/step within {duration_seconds} s"
+            )
+        else:
+            # Not calibrated yet (first run of this model): heuristic, roughly one
+            # step per minute; the run's own metrics calibrate the next one
+            max_steps = duration_seconds // 60
+            
+            # Adjust save and eval frequency based on total steps
+            save_steps = max(100, max_steps // 20)  # Save approximately 20 times during training
+            eval_steps = max(100, max_steps // 10)  # Evaluate approximately 10 times during training
+            logging_steps = 10
         
-        return TrainingConfig(
+        config = TrainingConfig(
             model_path=model_path,
             dataset_path=dataset_path,
             output_dir=str(self.output_dir),
@@ -211,8 +270,138 @@ class LearningFlowRunner:
             gradient_accumulation_steps=gradient_accumulation_steps,
             max_steps=max_steps,
             save_steps=save_steps,
-            eval_steps=eval_steps
+            eval_steps=eval_steps,
+            logging_steps=logging_steps,
         )
+        
+        # Continue from the agent's latest checkpoint instead of the base model
+        resume = self._find_resume_checkpoint(config)
+        if resume is not None:
+            checkpoint, trainer_state = resume
+            self.resume_from_checkpoint = checkpoint
+            self.start_step = int(trainer_state.get("global_step", 0))
+            planned_steps = int(trainer_state.get("max_steps") or 0)
+            # An interrupted run keeps its step target (the remaining budget carries
+            # over); after a finished one this flow's budget is added on top
+            if self.start_step < planned_steps:
+                config.max_steps = planned_steps
+            else:
+                config.max_steps = self.start_step + max_steps
+            config.resume_from_checkpoint = str(checkpoint)
+            logger.info(
+                f"Resuming agent {self.agent_id} from {checkpoint} at step {self.start_step}, "
+                f"training up to step {config.max_steps}"
+            )
+        
+        return config
+
+    @property
+    def _throughput_path(self) -> pathlib.Path:
+        """File with the agent's measured training throughput, per base model."""
+        return self.agent_output_dir / "throughput.json"
+
+    def _load_throughput(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Load the agent's stored throughput estimates.
+        
+        Returns:
+            Dictionary mapping base model paths to their estimate
+        """
+        try:
+            with open(self._throughput_path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable throughput file {self._throughput_path}: {e}")
+            return {}
+
+    def _update_throughput(self):
+        """
+        Measure this run's throughput from its metrics and fold it into the stored estimate.
+        
+        The time per step comes from the first and last logged steps (so it includes
+        evaluation and checkpoint overhead), normalized to samples so it carries over
+        to other batch sizes. The startup time (model loading until the first step)
+        is stored as well, since it is spent from every flow's budget.
+        """
+        # Downsampling the history keeps its first and last point
+        logged = (self.metrics.column("step") > 0).nonzero()[0]
+        if len(logged) < 2 or not self.start_time:
+            return
+        steps = self.metrics.column("step")[logged[[0, -1]]].tolist()
+        timestamps = self.metrics.column("timestamp")[logged[[0, -1]]].tolist()
+        if steps[1] <= steps[0]:
+            return
+        seconds_per_step = (timestamps[1] - timestamps[0]) / (steps[1] - steps[0])
+        if seconds_per_step <= 0:
+            return
+        samples_per_step = self.training_config.batch_size * self.training_config.gradient_accumulation_steps
+        first_step = steps[0] - self.start_step
+        measured = {
+            "seconds_per_sample": seconds_per_step / samples_per_step,
+            "startup_seconds": max(0.0, timestamps[0] - self.start_time - first_step * seconds_per_step),
+        }
+        
+        estimates = self._load_throughput()
+        previous = estimates.get(self.training_config.model_path)
+        if previous:
+            measured = {
+                key: THROUGHPUT_SMOOTHING * value + (1 - THROUGHPUT_SMOOTHING) * previous[key]
+                for key, value in measured.items()
+            }
+        measured["runs"] = (previous or {}).get("runs", 0) + 1
+        measured["updated_at"] = time.time()
+        estimates[self.training_config.model_path] = measured
+        
+        tmp_path = self._throughput_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(estimates, f, indent=2)
+        os.replace(tmp_path, self._throughput_path)
+        logger.info(
+            f"Measured {seconds_per_step:.2f} s/step ({samples_per_step} samples) for agent {self.agent_id}, "
+            f"startup {measured['startup_seconds']:.0f} s"
+        )
+
+    def _save_training_config(self):
+        """Save the training configuration of the run, used to match checkpoints of later runs."""
+        with open(self.output_dir / "training_config.json", "w") as f:
+            json.dump(self.training_config.dict(), f, indent=2)
+
+    def _find_resume_checkpoint(self, config: TrainingConfig) -> Optional[Tuple[pathlib.Path, Dict[str, Any]]]:
+        """
+        Find the most recent checkpoint of this agent that the run can continue from.
+        
+        A checkpoint qualifies if its run trained the same base model with the same
+        LoRA and sequence settings; checkpoints hold the adapter weights together with
+        the optimizer, LR scheduler and RNG state, and the step reached.
+        
+        Args:
+            config: Training configuration of this run
+            
+        Returns:
+            Tuple of the checkpoint directory and its trainer state, or None
+        """
+        matching_keys = ("model_path", "lora_r", "lora_alpha", "max_seq_length")
+        latest = None
+        for state_path in self.agent_output_dir.glob("*/checkpoint-*/trainer_state.json"):
+            run_dir = state_path.parent.parent
+            if run_dir == self.output_dir:
+                continue
+            try:
+                with open(run_dir / "training_config.json", "r") as f:
+                    run_config = json.load(f)
+                if any(run_config.get(key) != getattr(config, key) for key in matching_keys):
+                    continue
+                mtime = state_path.stat().st_mtime
+                if latest is None or mtime > latest[0]:
+                    with open(state_path, "r") as f:
+                        latest = (mtime, state_path.parent, json.load(f))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping checkpoint {state_path.parent}: {e}")
+        if latest is None:
+            return None
+        return latest[1], latest[2]
 
     def _build_training_command(self) -> List[str]:
         """
@@ -240,53 +429,137 @@ class LearningFlowRunner:
             "--lora_dropout", str(config_dict["lora_dropout"]),
             "--max_seq_length", str(config_dict["max_seq_length"]),
             "--seed", str(config_dict["seed"]),
-            "--json_logging",  # Enable JSON logging for easy parsing
+            "--save_total_limit", str(config_dict["save_total_limit"]),
+            "--metrics_interval", str(config_dict["metrics_interval"]),
         ]
         
         # Add max_steps if specified
         if config_dict["max_steps"]:
             cmd.extend(["--max_steps", str(config_dict["max_steps"])])
+        
+        # Continue from a checkpoint (weights, optimizer, scheduler and step count)
+        if config_dict["resume_from_checkpoint"]:
+            cmd.extend(["--resume_from_checkpoint", config_dict["resume_from_checkpoint"]])
             
         return cmd
 
-    async def _parse_metrics(self, line: str) -> Optional[TrainingMetrics]:
+    def _metrics_from_payload(self, payload: Dict[str, Any]) -> TrainingMetrics:
         """
-        Parse metrics from a line of output.
+        Build a metrics record from a frame of the metrics channel.
         
         Args:
-            line: Line of output from the training process
+            payload: Aggregated log values sent by the training process
             
         Returns:
-            TrainingMetrics object or None if the line doesn't contain metrics
+            TrainingMetrics object
+        """
+        last_loss = self.latest_metrics.loss if self.latest_metrics else 0.0
+        return TrainingMetrics(
+            step=payload.get("step", 0),
+            loss=payload.get("loss", last_loss),
+            learning_rate=payload.get("learning_rate", 0.0),
+            epoch=payload.get("epoch", 0.0),
+            eval_loss=payload.get("eval_loss"),
+            train_runtime=payload.get("train_runtime"),
+            train_samples_per_second=payload.get("train_samples_per_second"),
+        )
+
+    async def _start_metrics_channel(self) -> str:
+        """
+        Start listening for the metrics connection of the training process.
+        
+        Returns:
+            ``host:port`` address passed to the training process
+        """
+        self._metrics_server = await asyncio.start_server(self._handle_metrics_connection, "127.0.0.1", 0)
+        host, port = self._metrics_server.sockets[0].getsockname()[:2]
+        return f"{host}:{port}"
+
+    async def _handle_metrics_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Read the metrics frames of one connection.
+        
+        The first frame must carry the run's token; connections of other local
+        processes are dropped.
+        
+        Args:
+            reader: Stream of the connection
+            writer: Writer of the connection, closed when the stream ends
         """
         try:
-            # Check if the line is a JSON metrics line
-            if line.startswith('{"metrics":'):
-                data = json.loads(line)
-                metrics_data = data.get("metrics", {})
-                
-                # Create TrainingMetrics object
-                metrics = TrainingMetrics(
-                    step=metrics_data.get("step", 0),
-                    loss=metrics_data.get("loss", 0.0),
-                    learning_rate=metrics_data.get("learning_rate", 0.0),
-                    epoch=metrics_data.get("epoch", 0.0),
-                    eval_loss=metrics_data.get("eval_loss"),
-                    train_runtime=metrics_data.get("train_runtime"),
-                    train_samples_per_second=metrics_data.get("train_samples_per_second")
-                )
-                return metrics
-        except json.JSONDecodeError:
+            hello = await read_frame(reader)
+            if hello is None or not secrets.compare_digest(str(hello.get("token", "")), self._metrics_token):
+                logger.warning(f"Rejected a metrics connection without the token of run {self.run_id}")
+                return
+            self._metrics_task = asyncio.current_task()
+            
+            while True:
+                payload = await read_frame(reader)
+                if payload is None:
+                    break
+                self.metrics_frames += 1
+                try:
+                    metrics = self._metrics_from_payload(payload)
+                except ValueError as e:
+                    logger.warning(f"Ignoring invalid metrics frame of run {self.run_id}: {e}")
+                    continue
+                self.latest_metrics = metrics
+                self.metrics.append(metrics.dict())
+                await self._publish_metrics_update(metrics)
+        except FrameError as e:
+            logger.warning(f"Closing the metrics channel of run {self.run_id}: {e}")
+        except ConnectionError:
             pass
-        except Exception as e:
-            logger.warning(f"Error parsing metrics: {e}")
+        finally:
+            writer.close()
+
+    async def _close_metrics_channel(self):
+        """Read the frames still buffered after the process exited and stop listening."""
+        if self._metrics_task is not None and self._metrics_task is not asyncio.current_task():
+            done, _ = await asyncio.wait({self._metrics_task}, timeout=METRICS_DRAIN_TIMEOUT)
+            if not done:
+                self._metrics_task.cancel()
+                await asyncio.gather(self._metrics_task, return_exceptions=True)
+        if self._metrics_server is not None:
+            self._metrics_server.close()
+            await self._metrics_server.wait_closed()
+            self._metrics_server = None
+        self.metrics.close()
+
+    async def get_metrics(self, resolution: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get the run's metrics history, downsampled for display.
+        
+        Args:
+            resolution: Number of points of the training curve, None for full resolution
             
-        return None
+        Returns:
+            Dictionary with the columns of the curve and the evaluation points,
+            see ``metrics_buffer.downsample()``
+        """
+        if self.metrics.needs_file(resolution):
+            # More detail than memory holds: read the full-resolution file off the loop
+            self.metrics.flush()
+            history = await asyncio.get_running_loop().run_in_executor(None, load_metrics, self.metrics.path, resolution)
+            history["points"] = self.metrics.total_points
+            return history
+        return self.metrics.query(resolution)
+
+    @property
+    def _source_module_id(self) -> str:
+        """Module ID used as the source of published events."""
+        return f"learning_flow_runner.agent_{self.agent_id}"
 
     async def _publish_state_update(self):
-        """Publish the current state to the event bus."""
+        """
+        Publish the current state to the event bus.
+        
+        The topic is scoped to the agent (``training_state_update.agent_{id}``), so
+        the owning MiniAgent receives it directly and observers of every run can
+        subscribe to ``training_state_update.#``.
+        """
         await self.event_bus.publish(
-            "training_state_update",
+            f"training_state_update.agent_{self.agent_id}",
             {
                 "agent_id": self.agent_id,
                 "run_id": self.run_id,
@@ -296,7 +569,8 @@ class LearningFlowRunner:
                 "duration": self.duration.value,
                 "elapsed_seconds": (time.time() - self.start_time) if self.start_time else 0,
                 "remaining_seconds": max(0, self.duration_seconds - (time.time() - self.start_time)) if self.start_time else self.duration_seconds,
-            }
+            },
+            self._source_module_id,
         )
 
     async def _publish_metrics_update(self, metrics: TrainingMetrics):
@@ -307,12 +581,13 @@ class LearningFlowRunner:
             metrics: Training metrics to publish
         """
         await self.event_bus.publish(
-            "training_metrics_update",
+            f"training_metrics_update.agent_{self.agent_id}",
             {
                 "agent_id": self.agent_id,
                 "run_id": self.run_id,
                 "metrics": metrics.dict(),
-            }
+            },
+            self._source_module_id,
         )
 
     async def run(self) -> Dict[str, Any]:
@@ -330,6 +605,7 @@ class LearningFlowRunner:
         try:
             # Prepare the command
             cmd = self._build_training_command()
+            cmd.extend(["--metrics_address", await self._start_metrics_channel()])
             logger.debug(f"Training command: {' '.join(cmd)}")
             
             # Start the process
@@ -342,13 +618,13 @@ class LearningFlowRunner:
                 *cmd,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
-                env=os.environ.copy()
+                env={**os.environ, TOKEN_ENV_VAR: self._metrics_token},
             )
             
             # Set up a task to terminate the process after the duration
             termination_task = asyncio.create_task(self._terminate_after_timeout())
             
-            # Process stdout for metrics
+            # Relay the process output; metrics arrive over the metrics channel
             stdout_task = asyncio.create_task(self._process_stdout())
             stderr_task = asyncio.create_task(self._process_stderr())
             
@@ -362,21 +638,35 @@ class LearningFlowRunner:
                     termination_task.cancel()
                 
                 # Check the return code
-                if return_code == 0:
+                if self.cancel_requested:
+                    # Stopped by cancel(); the process saved its state on SIGINT
+                    self.state = TrainingState.CANCELED
+                    logger.info(f"Training canceled for run {self.run_id}")
+                elif return_code == 0:
                     self.state = TrainingState.COMPLETED
                     logger.info(f"Training completed successfully for run {self.run_id}")
                 else:
                     self.state = TrainingState.FAILED
                     logger.error(f"Training failed with return code {return_code} for run {self.run_id}")
+                    if self.stderr_tail:
+                        logger.error(f"Last stderr lines of run {self.run_id}:\n" + "\n".join(self.stderr_tail))
             except asyncio.CancelledError:
                 # This happens when the termination task cancels the process
                 self.state = TrainingState.TIMEOUT
                 logger.info(f"Training timed out after {self.duration.value} for run {self.run_id}")
             
+            await self._close_metrics_channel()
+            
             # Record end time
             self.end_time = time.time()
             await self._publish_state_update()
             
+            # Calibrate the step budget of the next runs
+            try:
+                self._update_throughput()
+            except Exception as e:
+                logger.warning(f"Failed to update throughput estimate: {e}")
+            
             # Save training stats
             self._save_training_stats()
             
@@ -386,6 +676,7 @@ class LearningFlowRunner:
             self.state = TrainingState.FAILED
             self.end_time = time.time()
             logger.exception(f"Error during training: {e}")
+            await self._close_metrics_channel()
             await self._publish_state_update()
             
             return {
@@ -421,7 +712,7 @@ class LearningFlowRunner:
             pass
 
     async def _process_stdout(self):
-        """Process the stdout of the training process to extract metrics."""
+        """Relay the stdout of the training process to the debug log."""
         assert self.process is not None
         
         while True:
@@ -429,18 +720,16 @@ class LearningFlowRunner:
             if not line:
                 break
                 
-            line_str = line.decode('utf-8').strip()
+            line_str = line.decode('utf-8', errors='replace').strip()
             logger.debug(f"[STDOUT] {line_str}")
-            
-            # Parse metrics
-            metrics = await self._parse_metrics(line_str)
-            if metrics:
-                self.latest_metrics = metrics
-                self.all_metrics.append(metrics)
-                await self._publish_metrics_update(metrics)
 
     async def _process_stderr(self):
-        """Process the stderr of the training process."""
+        """
+        Relay the stderr of the training process to the debug log.
+        
+        Libraries write warnings and progress there; the last lines are kept and
+        logged as an error if the run fails.
+        """
         assert self.process is not None
         
         while True:
@@ -448,8 +737,9 @@ class LearningFlowRunner:
             if not line:
                 break
                 
-            line_str = line.decode('utf-8').strip()
-            logger.warning(f"[STDERR] {line_str}")
+            line_str = line.decode('utf-8', errors='replace').strip()
+            logger.debug(f"[STDERR] {line_str}")
+            self.stderr_tail.append(line_str)
 
     def _save_training_stats(self):
         """Save training statistics to a file."""
@@ -466,11 +756,12 @@ class LearningFlowRunner:
             "elapsed_seconds": self.end_time - self.start_time if self.start_time and self.end_time else None,
             "training_config": self.training_config.dict(),
             "final_metrics": self.latest_metrics.dict() if self.latest_metrics else None,
-            "metrics_history": [m.dict() for m in self.all_metrics],
+            "metrics_history": self.metrics.query(STATS_HISTORY_POINTS) if len(self.metrics) else None,
+            "metrics_path": str(self.metrics.path) if self.metrics.total_points else None,
         }
         
         with open(stats_path, 'w') as f:
-            json.dump(stats, f, indent=2)
+            json.dump(stats, f)
             
         logger.info(f"Saved training stats to {stats_path}")
 
@@ -497,12 +788,18 @@ class LearningFlowRunner:
             "adapter_saved": adapter_exists,
             "adapter_path": str(adapter_path) if adapter_exists else None,
             "final_metrics": self.latest_metrics.dict() if self.latest_metrics else None,
+            "resumed_from": str(self.resume_from_checkpoint) if self.resume_from_checkpoint else None,
+            "start_step": self.start_step,
+            "max_steps": self.training_config.max_steps,
+            "step_budget_calibrated": bool(self.throughput),
+            "metrics_path": str(self.metrics.path) if self.metrics.total_points else None,
         }
 
     async def cancel(self):
         """Cancel the training process."""
         if self.process and self.process.returncode is None:
             logger.info(f"Cancelling training run {self.run_id}")
+            self.cancel_requested = True
             
             # Send SIGINT to allow the process to save its state
             self.process.send_signal(signal.SIGINT)
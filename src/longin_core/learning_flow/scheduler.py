@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Training Job Scheduler
+
+This module provides the TrainingScheduler class, which queues training runs of
+mini-agents and starts them as slots and machine resources allow, instead of
+every caller launching its own ``train.py`` process. The queue survives
+restarts, higher-priority jobs can preempt running ones (the preempted run saves
+its state on SIGINT and is queued again), and callers poll or stream job progress.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Union
+
+import psutil
+
+from longin_core.agents.state_persister import StatePersister
+from longin_core.event_bus import LONGINEventBus
+from longin_core.learning_flow.metrics_buffer import load_metrics
+from longin_core.learning_flow.runner import FlowDuration, LearningFlowRunner
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class JobState(str, Enum):
+    """Enum for training job states"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELED = "canceled"
+
+
+FINISHED_STATES = frozenset({JobState.COMPLETED, JobState.FAILED, JobState.CANCELED})
+
+
+@dataclass
+class TrainingJob:
+    """A queued, running or finished training run of one agent."""
+    job_id: str
+    agent_id: int
+    duration: FlowDuration
+    priority: int = 0
+    state: JobState = JobState.QUEUED
+    seq: int = 0
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    run_id: Optional[str] = None
+    attempts: int = 0
+    preemptions: int = 0
+    progress: Dict[str, Any] = field(default_factory=dict)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    # Bumped on every change, lets watchers skip snapshots they have seen
+    version: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get a JSON-serializable representation of the job."""
+        data = asdict(self)
+        data["duration"] = self.duration.value
+        data["state"] = self.state.value
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TrainingJob":
+        """Create a job from ``to_dict()`` output."""
+        return cls(**{**data, "duration": FlowDuration(data["duration"]), "state": JobState(data["state"])})
+
+
+class TrainingScheduler:
+    """
+    Runs queued training jobs within a number of slots and resource limits.
+
+    Jobs start in priority order (higher first, FIFO within a priority). A job is
+    admitted when a slot is free and the machine has headroom: system CPU use below
+    ``max_cpu_percent`` and at least ``min_available_memory_gb`` of free RAM (read
+    with psutil). At most one job starts per ``poll_interval``, so the load of a
+    starting job shows up before the next admission decision.
+
+    When the first queued job cannot start and a running job has a lower priority,
+    the running job is preempted: its ``train.py`` process gets SIGINT, saves its
+    state and exits, and the job goes back to the queue.
+
+    The queue is written to ``queue_path`` on every change (atomic replace). Jobs
+    that were running when the process stopped are queued again on ``start()``.
+    """
+
+    def __init__(
+        self,
+        agent_lookup: Callable[[int], Any],
+        event_bus: Optional[LONGINEventBus] = None,
+        queue_path: Union[str, Path] = "data/training_jobs.json",
+        max_concurrent_jobs: int = 1,
+        max_cpu_percent: Optional[float] = 85.0,
+        min_available_memory_gb: Optional[float] = 4.0,
+        poll_interval: float = 5.0,
+        max_finished_jobs: int = 200,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            agent_lookup: Returns the MiniAgent with a given id (or None)
+            event_bus: Event bus whose training metrics update job progress
+            queue_path: File the job queue is persisted to
+            max_concurrent_jobs: Number of training processes run at the same time
+            max_cpu_percent: System CPU use above which no job is started (None: no limit)
+            min_available_memory_gb: Free RAM needed to start a job (None: no limit)
+            poll_interval: Seconds between admission decisions
+            max_finished_jobs: Finished jobs kept for polling, oldest are dropped
+        """
+        self.agent_lookup = agent_lookup
+        self.event_bus = event_bus
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.max_cpu_percent = max_cpu_percent
+        self.min_available_memory_gb = min_available_memory_gb
+        self.poll_interval = poll_interval
+        self.max_finished_jobs = max_finished_jobs
+        self.jobs: Dict[str, TrainingJob] = {}
+        self._next_seq = 0
+        self._persister = StatePersister(queue_path, self._snapshot, flush_interval=poll_interval)
+        self._runners: Dict[str, LearningFlowRunner] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        # Running jobs asked to stop: job id -> state to go to (QUEUED: preempted)
+        self._stopping: Dict[str, JobState] = {}
+        self._wakeup = asyncio.Event()
+        self._changed = asyncio.Condition()
+        self._dispatch_task: Optional[asyncio.Task] = None
+        self.last_admission: Dict[str, Any] = {}
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle
+    # ------------------------------------------------------------------ #
+
+    async def start(self) -> None:
+        """Load the persisted queue and start dispatching jobs."""
+        self._load()
+        if self.event_bus is not None:
+            await self.event_bus.subscribe(
+                "training_metrics_update.#", self._handle_metrics_update, "training_scheduler"
+            )
+        # The first reading of cpu_percent(None) is meaningless, prime it
+        psutil.cpu_percent(interval=None)
+        self._dispatch_task = asyncio.create_task(self._dispatch_loop())
+        logger.info(f"Training scheduler started with {self.max_concurrent_jobs} slot(s), {self.queued_count} queued job(s)")
+
+    async def stop(self) -> None:
+        """
+        Stop dispatching. Running jobs are interrupted (they save their state on
+        SIGINT) and stay queued, so they start again after a restart.
+        """
+        if self._dispatch_task is not None:
+            self._dispatch_task.cancel()
+            await asyncio.gather(self._dispatch_task, return_exceptions=True)
+            self._dispatch_task = None
+        for job_id in list(self._tasks):
+            await self._stop_job(job_id, JobState.QUEUED)
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        await self._persister.close()
+
+    # ------------------------------------------------------------------ #
+    # Public API
+    # ------------------------------------------------------------------ #
+
+    async def submit(self, agent_id: int, duration: Union[str, FlowDuration], priority: int = 0) -> TrainingJob:
+        """
+        Queue a training job.
+
+        Args:
+            agent_id: The agent to train
+            duration: The duration of the training run (e.g., "1h", "6h", "24h")
+            priority: Higher runs first and may preempt lower-priority running jobs
+
+        Returns:
+            TrainingJob: The queued job
+
+        Raises:
+            ValueError: If the agent does not exist or the duration is invalid
+        """
+        if self.agent_lookup(agent_id) is None:
+            raise ValueError(f"Agent {agent_id} not found")
+        self._next_seq += 1
+        job = TrainingJob(
+            job_id=uuid.uuid4().hex, agent_id=agent_id, duration=FlowDuration(duration),
+            priority=priority, seq=self._next_seq,
+        )
+        self.jobs[job.job_id] = job
+        logger.info(f"Queued training job {job.job_id} for agent {agent_id} ({job.duration.value}, priority {priority})")
+        await self._changed_job(job)
+        return job
+
+    async def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job.
+
+        Args:
+            job_id: The job to cancel
+
+        Returns:
+            bool: False if the job does not exist or has already finished
+        """
+        job = self.jobs.get(job_id)
+        if job is None or job.state in FINISHED_STATES:
+            return False
+        if job.state is JobState.RUNNING:
+            await self._stop_job(job_id, JobState.CANCELED)
+        else:
+            job.state = JobState.CANCELED
+            job.finished_at = time.time()
+            await self._changed_job(job)
+        return True
+
+    def get_job(self, job_id: str) -> Optional[TrainingJob]:
+        """Get a job by id."""
+        return self.jobs.get(job_id)
+
+    def list_jobs(self, agent_id: Optional[int] = None) -> List[TrainingJob]:
+        """
+        Get jobs, queued ones first in the order they will start, then the rest.
+
+        Args:
+            agent_id: Only jobs of this agent, if given
+        """
+        jobs = [job for job in self.jobs.values() if agent_id is None or job.agent_id == agent_id]
+        return sorted(jobs, key=lambda job: (job.state is not JobState.QUEUED, -job.priority, job.seq))
+
+    @property
+    def queued_count(self) -> int:
+        """Number of jobs waiting to start."""
+        return sum(1 for job in self.jobs.values() if job.state is JobState.QUEUED)
+
+    async def watch(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a job's snapshots: the current one, then one per change (changes made
+        while the consumer is busy are coalesced) until the job finishes.
+
+        Args:
+            job_id: The job to watch
+
+        Yields:
+            Dict[str, Any]: ``TrainingJob.to_dict()`` snapshots
+        """
+        seen = -1
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: self.jobs.get(job_id) is None or self.jobs[job_id].version != seen)
+            job = self.jobs.get(job_id)
+            if job is None:
+                return
+            seen = job.version
+            yield job.to_dict()
+            if job.state in FINISHED_STATES:
+                return
+
+    async def get_job_metrics(self, job_id: str, resolution: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get the metrics history of a job's run, downsampled for display.
+
+        A running job is served by its runner, a finished one from the run's
+        metrics file.
+
+        Args:
+            job_id: Job id
+            resolution: Number of points of the training curve, None for full resolution
+
+        Returns:
+            The history (see ``metrics_buffer.downsample()``), or None if the job
+            has not recorded metrics
+        """
+        runner = self._runners.get(job_id)
+        if runner is not None:
+            return await runner.get_metrics(resolution)
+        job = self.jobs.get(job_id)
+        path = (job.result or {}).get("metrics_path") if job else None
+        if not path or not Path(path).exists():
+            return None
+        return await asyncio.get_running_loop().run_in_executor(None, load_metrics, path, resolution)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get scheduler counters.
+
+        Returns:
+            Dict with slots, job counts per state and the last admission decision
+        """
+        states = {state.value: 0 for state in JobState}
+        for job in self.jobs.values():
+            states[job.state.value] += 1
+        return {
+            "max_concurrent_jobs": self.max_concurrent_jobs,
+            "running": len(self._tasks),
+            "jobs": states,
+            "last_admission": self.last_admission,
+            "persistence": self._persister.get_stats(),
+        }
+
+    # ------------------------------------------------------------------ #
+    # Dispatching
+    # ------------------------------------------------------------------ #
+
+    def _resources_available(self) -> bool:
+        """Check the CPU and RAM headroom for one more training process."""
+        cpu = psutil.cpu_percent(interval=None)
+        available_gb = psutil.virtual_memory().available / 1024 ** 3
+        admitted = (self.max_cpu_percent is None or cpu < self.max_cpu_percent) and (
+            self.min_available_memory_gb is None or available_gb >= self.min_available_memory_gb
+        )
+        self.last_admission = {
+            "time": time.time(), "cpu_percent": cpu, "available_memory_gb": round(available_gb, 2), "admitted": admitted,
+        }
+        return admitted
+
+    async def _dispatch(self) -> None:
+        """Start the next queued job if possible, otherwise consider preempting one."""
+        # One job per agent at a time: its jobs share the checkpoints and the adapter
+        busy_agents = {self.jobs[job_id].agent_id for job_id in self._tasks}
+        queued = [
+            job for job in self.jobs.values() if job.state is JobState.QUEUED and job.agent_id not in busy_agents
+        ]
+        if not queued:
+            return
+        job = min(queued, key=lambda job: (-job.priority, job.seq))
+        # While a job is being stopped its slot (and resources) are not free yet
+        if len(self._tasks) < self.max_concurrent_jobs and not self._stopping and self._resources_available():
+            await self._start_job(job)
+            return
+
+        # Preempt at most one job at a time, the lowest priority (the newest among equals)
+        if self._stopping:
+            return
+        candidates = [
+            self.jobs[job_id] for job_id in self._tasks if self.jobs[job_id].priority < job.priority
+        ]
+        if candidates:
+            victim = min(candidates, key=lambda running_job: (running_job.priority, -running_job.seq))
+            logger.info(f"Preempting training job {victim.job_id} (priority {victim.priority}) for job {job.job_id}")
+            await self._stop_job(victim.job_id, JobState.QUEUED)
+
+    async def _dispatch_loop(self) -> None:
+        while True:
+            try:
+                await self._dispatch()
+            except Exception as e:
+                logger.exception(f"Training job dispatch failed: {e}")
+            # asyncio.wait rather than wait_for: a stop() racing a wakeup must not be swallowed
+            waiter = asyncio.ensure_future(self._wakeup.wait())
+            try:
+                await asyncio.wait({waiter}, timeout=self.poll_interval)
+            finally:
+                waiter.cancel()
+            self._wakeup.clear()
+
+    async def _start_job(self, job: TrainingJob) -> None:
+        agent = self.agent_lookup(job.agent_id)
+        if agent is None:
+            job.state = JobState.FAILED
+            job.error = f"Agent {job.agent_id} not found"
+            job.finished_at = time.time()
+            await self._changed_job(job)
+            return
+        runner = agent.create_training_runner(job.duration)
+        job.state = JobState.RUNNING
+        job.run_id = runner.run_id
+        job.started_at = time.time()
+        job.attempts += 1
+        job.progress = {}
+        self._runners[job.job_id] = runner
+        self._tasks[job.job_id] = asyncio.create_task(self._run_job(job, agent, runner))
+        logger.info(f"Started training job {job.job_id} as run {runner.run_id}")
+        await self._changed_job(job)
+
+    async def _run_job(self, job: TrainingJob, agent: Any, runner: LearningFlowRunner) -> None:
+        try:
+            results = await runner.run()
+            await agent.record_training_results(results, job.duration)
+            stop_state = self._stopping.get(job.job_id)
+            if stop_state is not None and runner.cancel_requested:
+                job.state = stop_state
+                if stop_state is JobState.QUEUED:
+                    job.preemptions += 1
+            else:
+                job.state = JobState.COMPLETED if results.get("status") == "success" else JobState.FAILED
+                job.error = results.get("error")
+            job.result = results
+        except asyncio.CancelledError:
+            # Stopped before the training process was started
+            job.state = self._stopping.get(job.job_id, JobState.QUEUED)
+        except Exception as e:
+            logger.exception(f"Training job {job.job_id} failed: {e}")
+            job.state = JobState.FAILED
+            job.error = str(e)
+        finally:
+            self._stopping.pop(job.job_id, None)
+            self._runners.pop(job.job_id, None)
+            self._tasks.pop(job.job_id, None)
+            if job.state in FINISHED_STATES:
+                job.finished_at = time.time()
+            self._wakeup.set()
+            await self._changed_job(job)
+
+    async def _stop_job(self, job_id: str, state: JobState) -> None:
+        """Interrupt a running job through the runner's SIGINT path; it then goes to ``state``."""
+        if job_id in self._stopping:
+            # Already stopping; a cancel overrides a preemption
+            if state is JobState.CANCELED:
+                self._stopping[job_id] = state
+            return
+        self._stopping[job_id] = state
+        runner = self._runners.get(job_id)
+        if runner is None or runner.process is None:
+            task = self._tasks.get(job_id)
+            if task is not None:
+                task.cancel()
+            return
+        # cancel() waits for the process to save its state and exit; the job task finishes the bookkeeping
+        asyncio.create_task(runner.cancel())
+
+    # ------------------------------------------------------------------ #
+    # Progress and persistence
+    # ------------------------------------------------------------------ #
+
+    async def _handle_metrics_update(self, data: Dict[str, Any]) -> None:
+        run_id = data.get("run_id")
+        for job_id in self._runners:
+            job = self.jobs[job_id]
+            if job.run_id == run_id:
+                job.progress = {**data.get("metrics", {}), "max_steps": self._runners[job_id].training_config.max_steps}
+                await self._changed_job(job, persist=False)
+                return
+
+    async def _changed_job(self, job: TrainingJob, persist: bool = True) -> None:
+        job.version += 1
+        if persist:
+            self._prune_finished()
+            self._persister.mark_dirty()
+            await self._persister.flush()
+        self._wakeup.set()
+        async with self._changed:
+            self._changed.notify_all()
+
+    def _prune_finished(self) -> None:
+        finished = sorted(
+            (job for job in self.jobs.values() if job.state in FINISHED_STATES), key=lambda job: job.finished_at or 0
+        )
+        for job in finished[: max(0, len(finished) - self.max_finished_jobs)]:
+            del self.jobs[job.job_id]
+
+    def _snapshot(self) -> Dict[str, Any]:
+        return {"next_seq": self._next_seq, "jobs": [job.to_dict() for job in self.jobs.values()]}
+
+    def _load(self) -> None:
+        path = self._persister.path
+        if not path.exists():
+            return
+        with open(path, "r") as f:
+            data = json.load(f)
+        self._next_seq = data.get("next_seq", 0)
+        for item in data.get("jobs", []):
+            job = TrainingJob.from_dict(item)
+            if job.state is JobState.RUNNING:
+                # The process stopped while the job was running, run it again
+                job.state = JobState.QUEUED
+            self.jobs[job.job_id] = job
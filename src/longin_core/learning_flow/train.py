@@ -39,6 +39,8 @@ from transformers import (
 )
 from trl import SFTTrainer
 
+from longin_core.learning_flow.metrics_channel import MetricsAggregator, MetricsChannelClient
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -74,6 +76,39 @@ class JsonMetricsCallback(TrainerCallback):
         print(metrics_json, flush=True)
 
 
+class ChannelMetricsCallback(TrainerCallback):
+    """
+    Callback to send metrics to the parent process over the metrics channel.
+    
+    Logs are aggregated and rate-limited here, so the parent receives at most one
+    frame of training logs per interval however small logging_steps is.
+    """
+    
+    def __init__(self, client: MetricsChannelClient, min_interval: float = 1.0):
+        self.client = client
+        self.aggregator = MetricsAggregator(min_interval=min_interval)
+    
+    def on_log(self, args, state, control, logs=None, **kwargs):
+        """Called when the trainer logs metrics."""
+        if not logs:
+            return
+        
+        logs = dict(logs)
+        logs["step"] = state.global_step
+        if state.epoch is not None:
+            logs["epoch"] = state.epoch
+        
+        payload = self.aggregator.add(logs)
+        if payload:
+            self.client.send(payload)
+    
+    def on_train_end(self, args, state, control, **kwargs):
+        """Called at the end of training; sends the logs still being merged."""
+        payload = self.aggregator.flush()
+        if payload:
+            self.client.send(payload)
+
+
 def setup_graceful_shutdown():
     """Set up signal handlers for graceful shutdown."""
     def signal_handler(sig, frame):
@@ -105,6 +140,9 @@ def parse_args():
     parser.add_argument("--warmup_steps", type=int, default=100, help="Number of warmup steps")
     parser.add_argument("--max_steps", type=int, default=None, help="Maximum number of training steps")
     parser.add_argument("--save_steps", type=int, default=200, help="Steps between checkpoints")
+    parser.add_argument("--save_total_limit", type=int, default=2, help="Checkpoints kept, older ones are deleted")
+    parser.add_argument("--resume_from_checkpoint", type=str, default=None,
+                        help="Checkpoint to continue from (weights, optimizer, scheduler and step count)")
     parser.add_argument("--eval_steps", type=int, default=200, help="Steps between evaluations")
     parser.add_argument("--logging_steps", type=int, default=10, help="Steps between logging")
     
@@ -117,6 +155,10 @@ def parse_args():
     parser.add_argument("--max_seq_length", type=int, default=512, help="Maximum sequence length")
     parser.add_argument("--seed", type=int, default=42, help="Random seed")
     parser.add_argument("--json_logging", action="store_true", help="Enable JSON logging for metrics")
+    parser.add_argument("--metrics_address", type=str, default=None,
+                        help="host:port of the parent's metrics channel (token in LONGIN_METRICS_TOKEN)")
+    parser.add_argument("--metrics_interval", type=float, default=1.0,
+                        help="Minimum seconds between metrics frames of training logs")
     parser.add_argument("--eval_split", type=str, default=None, help="Dataset split to use for evaluation")
     parser.add_argument("--quantization", type=str, default="4bit", choices=["4bit", "8bit", "none"], 
                         help="Quantization type (4bit, 8bit, or none)")
@@ -301,6 +343,7 @@ def setup_training_arguments(args):
         max_steps=args.max_steps,
         logging_steps=args.logging_steps,
         save_steps=args.save_steps,
+        save_total_limit=args.save_total_limit,
         evaluation_strategy="steps" if args.eval_split else "no",
         eval_steps=args.eval_steps if args.eval_split else None,
         save_strategy="steps",
@@ -310,6 +353,8 @@ def setup_training_arguments(args):
         push_to_hub=False,
         label_names=[],
         seed=args.seed,
+        # Progress bars only flood the parent's stderr, metrics go over the channel
+        disable_tqdm=args.metrics_address is not None,
     )
     
     return training_args
@@ -339,6 +384,12 @@ def train_model(args, model, tokenizer, train_dataset, eval_dataset=None):
     
     # Set up callbacks
     callbacks = []
+    if args.metrics_address:
+        try:
+            client = MetricsChannelClient(args.metrics_address)
+            callbacks.append(ChannelMetricsCallback(client, min_interval=args.metrics_interval))
+        except OSError as e:
+            logger.warning(f"Could not connect to the metrics channel at {args.metrics_address}: {e}")
     if args.json_logging:
         callbacks.append(JsonMetricsCallback())
     
@@ -358,15 +409,23 @@ def train_model(args, model, tokenizer, train_dataset, eval_dataset=None):
     # Add a custom callback to check for interruption
     class InterruptCallback(TrainerCallback):
         def on_step_end(self, args, state, control, **kwargs):
+            if state.max_steps and state.global_step >= state.max_steps:
+                # Always checkpoint the final step, the next flow resumes from it
+                control.should_save = True
             if INTERRUPT_RECEIVED:
-                logger.info("Interrupt received. Stopping training.")
+                logger.info("Interrupt received. Saving a checkpoint and stopping training.")
+                # The checkpoint lets the next flow resume from this step
+                control.should_save = True
                 control.should_training_stop = True
     
     trainer.add_callback(InterruptCallback())
     
     # Train the model
-    logger.info("Starting training")
-    trainer.train()
+    if args.resume_from_checkpoint:
+        logger.info(f"Resuming training from {args.resume_from_checkpoint}")
+    else:
+        logger.info("Starting training")
+    trainer.train(resume_from_checkpoint=args.resume_from_checkpoint)
     
     # Save the final model
     logger.info(f"Saving final model to {os.path.join(args.output_dir, 'adapter_model')}")
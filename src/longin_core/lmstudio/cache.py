@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LM Studio Response Cache
+
+This module provides a content-addressed cache for deterministic chat completions.
+Entries are keyed on a hash of the model, the messages and the sampling parameters,
+and live in an in-memory LRU tier with an optional Redis tier behind it.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from ..storage.manager import RedisStore
+
+logger = logging.getLogger("lmstudio_cache")
+
+# Canonical form: sorted keys, no whitespace, so equal payloads hash equally
+_KEY_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def request_key(payload: Dict[str, Any]) -> str:
+    """
+    Hash a request payload so that identical requests get identical keys.
+
+    Args:
+        payload: The JSON body of the request
+
+    Returns:
+        Hex sha256 of the canonical JSON form of the payload
+    """
+    return hashlib.sha256(_KEY_ENCODER.encode(payload).encode("utf-8")).hexdigest()
+
+
+class CompletionCache:
+    """
+    Two-tier cache of chat completion responses.
+
+    Only deterministic requests are cached: temperature 0, or any temperature
+    when a ``seed`` is given. Everything else bypasses the cache.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: Optional[float] = 3600.0,
+        redis_store: Optional["RedisStore"] = None,
+        key_prefix: str = "longin:llm_cache:",
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Entries kept in the memory tier before the least recently used is evicted
+            max_bytes: Approximate size bound of the memory tier (serialized response bytes)
+            ttl: Seconds an entry stays valid in both tiers (None = no expiry)
+            redis_store: Connected RedisStore used as the shared second tier (optional)
+            key_prefix: Prefix of the Redis keys
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.redis_store = redis_store
+        self.key_prefix = key_prefix
+        # key -> (expires_at, response, size)
+        self._entries: "OrderedDict[str, Tuple[Optional[float], Dict[str, Any], int]]" = OrderedDict()
+        self._bytes = 0
+        self._stats = {
+            "memory_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "evictions": 0,
+            "expired": 0,
+        }
+
+    def make_key(self, payload: Dict[str, Any]) -> Optional[str]:
+        """
+        Build the cache key of a request payload.
+
+        Args:
+            payload: The JSON body of the chat completion request
+
+        Returns:
+            The content hash, or None if the request is not deterministic and must bypass the cache
+        """
+        if payload.get("stream") or (payload.get("temperature", 0) > 0 and payload.get("seed") is None):
+            self._stats["bypassed"] += 1
+            return None
+        return request_key(payload)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a response, first in memory and then in Redis.
+
+        Args:
+            key: Key returned by make_key()
+
+        Returns:
+            The cached response JSON, or None on a miss
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, response, _ = entry
+            if expires_at is None or expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return response
+            self._remove(key)
+            self._stats["expired"] += 1
+
+        if self.redis_store is not None:
+            try:
+                response = await self.redis_store.get(self.key_prefix + key)
+            except Exception as e:
+                logger.warning(f"Redis cache lookup failed: {e}")
+                response = None
+            if isinstance(response, dict):
+                self._stats["redis_hits"] += 1
+                self._store(key, response)
+                return response
+
+        self._stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, response: Dict[str, Any]) -> None:
+        """
+        Store a response in both tiers.
+
+        Args:
+            key: Key returned by make_key()
+            response: The response JSON
+        """
+        self._store(key, response)
+        if self.redis_store is not None:
+            try:
+                await self.redis_store.set(
+                    self.key_prefix + key, response, ttl=int(self.ttl) if self.ttl else None
+                )
+            except Exception as e:
+                logger.warning(f"Redis cache store failed: {e}")
+
+    def clear(self) -> None:
+        """Drop every entry of the memory tier."""
+        self._entries.clear()
+        self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss statistics.
+
+        Returns:
+            Dict with hit, miss, bypass, eviction and expiry counters, the hit ratio and the memory tier size
+        """
+        hits = self._stats["memory_hits"] + self._stats["redis_hits"]
+        lookups = hits + self._stats["misses"]
+        return {
+            **self._stats,
+            "hits": hits,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+    def _store(self, key: str, response: Dict[str, Any]) -> None:
+        size = len(_KEY_ENCODER.encode(response))
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        self._entries[key] = (expires_at, response, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._stats["evictions"] += 1
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
@@ -11,12 +11,25 @@ completions, and streaming responses.
 import asyncio
 import json
 import logging
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
 from enum import Enum
-from typing import Any, AsyncGenerator, Dict, List, Optional, Union
+from typing import Any, AsyncGenerator, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterator, List, Optional, Set, Union
 
 import httpx
 from pydantic import BaseModel, Field, root_validator
 
+from .cache import CompletionCache, request_key
+from .resilience import CircuitBreaker, LatencyWindow, backoff_delay
+
+try:
+    import orjson  # type: ignore
+    _json_loads = orjson.loads
+except ImportError:  # Optional speed-up, the standard library parser is used otherwise
+    orjson = None
+    _json_loads = json.loads
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("lmstudio_client")
@@ -42,6 +55,26 @@ class LMStudioConnectionError(LMStudioClientError):
     pass
 
 
+class LMStudioCircuitOpenError(LMStudioConnectionError):
+    """Exception raised without contacting LM Studio while the circuit breaker is open"""
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"LM Studio circuit breaker is open, retry in {retry_after:.1f}s")
+
+
+# Status codes worth retrying: the backend is overloaded or restarting
+_RETRYABLE_STATUS = frozenset({408, 429, 500, 502, 503, 504})
+
+
+def _is_retryable(error: Optional[Exception]) -> bool:
+    """Check whether an error is the backend's fault (unreachable, overloaded) rather than the request's."""
+    if isinstance(error, LMStudioCircuitOpenError):
+        return False
+    if isinstance(error, LMStudioConnectionError):
+        return True
+    return isinstance(error, LMStudioAPIError) and error.status_code in _RETRYABLE_STATUS
+
+
 # Pydantic models for API data
 class ChatRole(str, Enum):
     SYSTEM = "system"
@@ -51,6 +84,19 @@ class ChatRole(str, Enum):
     TOOL = "tool"
 
 
+class StreamMode(str, Enum):
+    """What stream_chat_completion() yields for every streamed chunk"""
+    MODEL = "model"  # StreamedChatCompletionResponse, validated by pydantic
+    DICT = "dict"  # The decoded chunk JSON, without validation
+    CONTENT = "content"  # Only the non-empty ``choices[].delta.content`` strings
+
+
+class RequestPriority(str, Enum):
+    """Scheduling class of a chat completion: interactive work is dispatched first"""
+    INTERACTIVE = "interactive"
+    BACKGROUND = "background"
+
+
 class ChatMessage(BaseModel):
     role: ChatRole
     content: str
@@ -109,22 +155,444 @@ class StreamedChatCompletionResponse(BaseModel):
     choices: List[StreamedChatCompletionChoice]
 
 
+class SSEDecoder:
+    """
+    Incremental decoder of an OpenAI-style Server-Sent Events stream.
+
+    Works directly on the received bytes: lines are split without decoding them
+    to str first, and the ``data:`` payloads go straight to the JSON parser
+    (orjson when installed).
+    """
+
+    __slots__ = ("_buffer", "done")
+
+    def __init__(self):
+        self._buffer = b""
+        self.done = False
+
+    def feed(self, data: bytes) -> List[Any]:
+        """
+        Decode the chunks completed by the next piece of the stream.
+
+        Args:
+            data: Bytes as received, may end in the middle of a line
+
+        Returns:
+            The decoded JSON chunks; empty once ``[DONE]`` was seen
+        """
+        if self.done:
+            return []
+        lines = (self._buffer + data if self._buffer else data).split(b"\n")
+        self._buffer = lines.pop()
+        chunks = []
+        for line in lines:
+            if line.startswith(b"data:"):
+                line = line[5:].strip()
+            elif not line.startswith(b"{"):
+                continue  # Blank separator, comment or other SSE field
+            if line == b"[DONE]":
+                self.done = True
+                break
+            try:
+                chunks.append(_json_loads(line))
+            except ValueError:
+                logger.warning(f"Failed to parse streaming response chunk: {line!r}")
+        return chunks
+
+    def close(self) -> List[Any]:
+        """Decode a last line the stream did not terminate."""
+        return self.feed(b"\n") if self._buffer else []
+
+
+def convert_stream_chunks(
+    chunks: List[Dict[str, Any]], mode: StreamMode
+) -> Iterator[Union[StreamedChatCompletionResponse, Dict[str, Any], str]]:
+    """Convert decoded stream chunks into what the stream mode yields."""
+    if mode is StreamMode.CONTENT:
+        for chunk in chunks:
+            for choice in chunk.get("choices") or ():
+                content = (choice.get("delta") or {}).get("content")
+                if content:
+                    yield content
+    elif mode is StreamMode.DICT:
+        yield from chunks
+    else:
+        for chunk in chunks:
+            yield StreamedChatCompletionResponse.parse_obj(chunk)
+
+
+class _ScheduledRequest:
+    """A chat completion waiting in the scheduler."""
+
+    __slots__ = ("payload", "agent_id", "priority", "future", "batchable")
+
+    def __init__(self, payload: Dict[str, Any], agent_id: str, priority: RequestPriority, batchable: bool):
+        self.payload = payload
+        self.agent_id = agent_id
+        self.priority = priority
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.batchable = batchable
+
+
+def _batch_key(payload: Dict[str, Any]) -> str:
+    """Key of the requests that can share one ``n`` call: everything but ``n`` is equal."""
+    return request_key({k: v for k, v in payload.items() if k != "n"})
+
+
+class RequestScheduler:
+    """
+    Micro-batching scheduler for chat completions.
+
+    Requests arriving within ``window`` seconds of each other are collected and
+    then dispatched over at most ``max_concurrency`` concurrent upstream calls.
+    Interactive requests go before background ones (background work still gets
+    every ``background_share``-th free slot so it cannot starve), and within a
+    class agents are served round-robin, so one busy agent cannot monopolize the
+    backend.
+
+    With ``batch_n`` enabled, sampled requests that differ only in ``n`` are sent
+    as one request with the summed ``n`` and the returned choices are split
+    between the callers. Deterministic requests are never merged this way; they
+    are coalesced by the client instead. If the backend returns fewer choices
+    than asked for, ``n`` batching is switched off and the callers are requeued.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+        window: float = 0.01,
+        max_concurrency: int = 4,
+        batch_n: bool = False,
+        max_batch_n: int = 8,
+        background_share: int = 4,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            send: Coroutine function posting one chat completion payload upstream
+            window: Seconds to collect requests before dispatching (0 = dispatch right away)
+            max_concurrency: Upstream calls in flight at once
+            batch_n: Merge sampled requests with equal payloads into one ``n`` call (backend must honor ``n``)
+            max_batch_n: Upper bound of the merged ``n``
+            background_share: Every n-th slot goes to background work while interactive work waits (0 = strict priority)
+        """
+        self._send = send
+        self.window = window
+        self.max_concurrency = max(1, max_concurrency)
+        self.batch_n = batch_n
+        self.max_batch_n = max_batch_n
+        self.background_share = background_share
+        self._queues: Dict[RequestPriority, "OrderedDict[str, Deque[_ScheduledRequest]]"] = {
+            priority: OrderedDict() for priority in RequestPriority
+        }
+        self._queued = 0
+        self._picks = 0
+        self._ready: Optional[asyncio.Event] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+        # Counters
+        self.dispatched = 0
+        self.batches = 0
+        self.batched_requests = 0
+
+    async def submit(
+        self,
+        payload: Dict[str, Any],
+        agent_id: Optional[Union[int, str]] = None,
+        priority: Union[RequestPriority, str] = RequestPriority.INTERACTIVE,
+    ) -> Dict[str, Any]:
+        """
+        Queue a chat completion payload and wait for its response.
+
+        Args:
+            payload: The JSON body of the chat completion request
+            agent_id: Agent the request is made for; requests without one share a queue
+            priority: Scheduling class of the request
+
+        Returns:
+            The response JSON
+        """
+        if self._dispatcher is None or self._dispatcher.done():
+            self._ready = asyncio.Event()
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._dispatcher = asyncio.create_task(self._dispatch_loop())
+        batchable = (
+            self.batch_n and payload.get("temperature", 0) > 0 and payload.get("seed") is None
+            and payload.get("n", 1) < self.max_batch_n
+        )
+        request = _ScheduledRequest(
+            payload, "" if agent_id is None else str(agent_id), RequestPriority(priority), batchable
+        )
+        self._enqueue(request)
+        return await request.future
+
+    async def close(self) -> None:
+        """Stop dispatching and fail the requests still queued."""
+        tasks = [task for task in (self._dispatcher, *self._tasks) if task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._dispatcher = None
+        for agents in self._queues.values():
+            for queue in agents.values():
+                for request in queue:
+                    if not request.future.done():
+                        request.future.set_exception(LMStudioClientError("Client closed"))
+            agents.clear()
+        self._queued = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get scheduler counters.
+
+        Returns:
+            Dict with the queued requests per priority, dispatched upstream calls and ``n`` batching counters
+        """
+        return {
+            "queued": {
+                priority.value: sum(len(queue) for queue in agents.values())
+                for priority, agents in self._queues.items()
+            },
+            "dispatched": self.dispatched,
+            "batches": self.batches,
+            "batched_requests": self.batched_requests,
+            "batch_n": self.batch_n,
+        }
+
+    def _enqueue(self, request: _ScheduledRequest, front: bool = False) -> None:
+        agents = self._queues[request.priority]
+        queue = agents.get(request.agent_id)
+        if queue is None:
+            queue = agents[request.agent_id] = deque()
+        if front:
+            queue.appendleft(request)
+            agents.move_to_end(request.agent_id, last=False)
+        else:
+            queue.append(request)
+        self._queued += 1
+        self._ready.set()
+
+    async def _dispatch_loop(self) -> None:
+        while True:
+            await self._ready.wait()
+            if self.window > 0:
+                await asyncio.sleep(self.window)
+            self._ready.clear()
+            while self._queued:
+                # Pick only when a slot is free, so later interactive requests can still overtake
+                await self._slots.acquire()
+                batch = self._next_batch()
+                if not batch:
+                    self._slots.release()
+                    continue
+                task = asyncio.create_task(self._run(batch))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    def _pick_priority(self) -> Optional[RequestPriority]:
+        interactive = self._queues[RequestPriority.INTERACTIVE]
+        background = self._queues[RequestPriority.BACKGROUND]
+        if not interactive:
+            return RequestPriority.BACKGROUND if background else None
+        self._picks += 1
+        if background and self.background_share and self._picks % self.background_share == 0:
+            return RequestPriority.BACKGROUND
+        return RequestPriority.INTERACTIVE
+
+    def _next_batch(self) -> List[_ScheduledRequest]:
+        """Take the next request round-robin across agents, plus the requests it can be batched with."""
+        priority = self._pick_priority()
+        if priority is None:
+            self._queued = 0
+            return []
+        agents = self._queues[priority]
+        agent_id, queue = next(iter(agents.items()))
+        request = queue.popleft()
+        self._queued -= 1
+        if queue:
+            agents.move_to_end(agent_id)
+        else:
+            del agents[agent_id]
+        if request.future.done():
+            return []  # Caller went away while queued
+        batch = [request]
+        if request.batchable and self.batch_n:
+            key = _batch_key(request.payload)
+            total = request.payload.get("n", 1)
+            for other_id, other_queue in list(agents.items()):
+                for other in list(other_queue):
+                    other_n = other.payload.get("n", 1)
+                    if other.batchable and total + other_n <= self.max_batch_n and _batch_key(other.payload) == key:
+                        other_queue.remove(other)
+                        self._queued -= 1
+                        if not other.future.done():
+                            batch.append(other)
+                            total += other_n
+                if not other_queue:
+                    del agents[other_id]
+        return batch
+
+    async def _run(self, batch: List[_ScheduledRequest]) -> None:
+        try:
+            if len(batch) == 1:
+                self.dispatched += 1
+                response = await self._send(batch[0].payload)
+                if not batch[0].future.done():
+                    batch[0].future.set_result(response)
+                return
+
+            payload = dict(batch[0].payload)
+            payload["n"] = sum(request.payload.get("n", 1) for request in batch)
+            self.dispatched += 1
+            self.batches += 1
+            self.batched_requests += len(batch)
+            response = await self._send(payload)
+            choices = sorted(response.get("choices", []), key=lambda choice: choice.get("index", 0))
+            start = 0
+            for request in batch:
+                count = request.payload.get("n", 1)
+                part = choices[start:start + count]
+                start += count
+                if len(part) < count:
+                    if self.batch_n:
+                        logger.warning("Backend ignored 'n', disabling batched chat completions")
+                        self.batch_n = False
+                    request.batchable = False
+                    self._enqueue(request, front=True)
+                    continue
+                if not request.future.done():
+                    # Usage is that of the whole batched call
+                    request.future.set_result(
+                        {**response, "choices": [{**choice, "index": i} for i, choice in enumerate(part)]}
+                    )
+        except asyncio.CancelledError:
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(LMStudioClientError("Client closed"))
+            raise
+        except Exception as e:
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+        finally:
+            self._slots.release()
+
+
 class AsyncLMStudioClient:
     """
     Asynchronous client for interacting with LM Studio's API.
+
+    All requests share one pooled HTTP client with keep-alive connections. A
+    FIFO semaphore caps the requests in flight, so several agents sharing one
+    LM Studio backend queue in arrival order instead of opening unbounded sockets.
+    Concurrent identical chat completions are coalesced onto a single request.
     """
 
-    def __init__(self, base_url: str = "http://localhost:1234", api_key: Optional[str] = None):
+    def __init__(
+        self,
+        base_url: str = "http://localhost:1234",
+        api_key: Optional[str] = None,
+        max_concurrency: int = 4,
+        max_connections: int = 10,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 60.0,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 300.0,
+        http2: bool = False,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        cache: Optional[CompletionCache] = None,
+        coalesce: bool = True,
+        batch_window: Optional[float] = None,
+        batch_n: bool = False,
+        max_retries: int = 2,
+        backoff_base: float = 0.25,
+        backoff_max: float = 4.0,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        hedge_min_samples: int = 20,
+        breaker_failure_threshold: int = 5,
+        breaker_reset_timeout: float = 30.0,
+    ):
         """
         Initialize the LM Studio client.
 
         Args:
             base_url: Base URL for the LM Studio API (default: http://localhost:1234)
             api_key: API key for authentication (optional, as local LM Studio doesn't require it)
+            max_concurrency: Requests (including open streams) in flight at once; further ones wait in FIFO order
+            max_connections: Upper bound of pooled connections
+            max_keepalive_connections: Idle connections kept open for reuse
+            keepalive_expiry: Seconds an idle connection is kept open
+            connect_timeout: Seconds to establish a connection
+            read_timeout: Seconds to wait for response data; generation can be slow
+            http2: Negotiate HTTP/2 (needs the ``h2`` package, LM Studio itself speaks HTTP/1.1)
+            transport: Custom httpx transport (e.g. ``httpx.MockTransport`` in tests)
+            cache: Response cache for deterministic completions (optional)
+            coalesce: Share one upstream request between concurrent identical chat completions
+            batch_window: Route chat completions through a RequestScheduler collecting requests for
+                this many seconds (None = send right away, 0 = schedule without waiting)
+            batch_n: Let the scheduler merge sampled requests into one ``n`` call (backend must honor ``n``)
+            max_retries: Retries of idempotent calls (listing models, chat completions) after a
+                connection error or a retryable status (408, 429, 5xx)
+            backoff_base: Delay bound of the first retry in seconds, doubled on every further retry
+            backoff_max: Upper bound of the retry delay in seconds
+            hedge: Send a second copy of an idempotent call still running after the ``hedge_quantile``
+                latency, and use whichever answers first (costs backend capacity)
+            hedge_quantile: Latency quantile of recent calls to the same endpoint that triggers the hedge
+            hedge_min_samples: Calls to an endpoint needed before it is hedged
+            breaker_failure_threshold: Consecutive backend failures that open the circuit breaker
+                (0 disables it)
+            breaker_reset_timeout: Seconds the breaker fails fast before letting a trial call through
         """
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout, pool=None)
+        self.http2 = http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("HTTP/2 requested but the h2 package is not installed, using HTTP/1.1")
+                self.http2 = False
+        self.transport = transport
+        self.cache = cache
+        self.coalesce = coalesce
         self.session = None
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
+        self._waiting = 0
+        self._in_flight = 0
+        # request key -> [shared upstream task, callers still waiting for it]
+        self._pending: Dict[str, List[Any]] = {}
+        self._coalesced = 0
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker: Optional[CircuitBreaker] = (
+            CircuitBreaker(breaker_failure_threshold, breaker_reset_timeout) if breaker_failure_threshold > 0 else None
+        )
+        self._latency: Dict[str, LatencyWindow] = {}
+        self._retries = 0
+        self._hedged = 0
+        self._hedge_wins = 0
+        self.scheduler: Optional[RequestScheduler] = None
+        if batch_window is not None:
+            self.scheduler = RequestScheduler(
+                self._post_chat_completion,
+                window=batch_window,
+                max_concurrency=max_concurrency if max_concurrency > 0 else max_connections,
+                batch_n=batch_n,
+            )
         logger.info(f"Initialized LM Studio client with base URL: {base_url}")
 
     async def _ensure_session(self) -> httpx.AsyncClient:
@@ -133,67 +601,287 @@ class AsyncLMStudioClient:
             headers = {}
             if self.api_key:
                 headers["Authorization"] = f"Bearer {self.api_key}"
-            self.session = httpx.AsyncClient(headers=headers, timeout=60.0)
+            self.session = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=headers,
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+                transport=self.transport,
+            )
         return self.session
 
+    @asynccontextmanager
+    async def _slot(self) -> AsyncIterator[None]:
+        """Hold one of the ``max_concurrency`` request slots."""
+        if self._semaphore is None:
+            self._in_flight += 1
+            try:
+                yield
+            finally:
+                self._in_flight -= 1
+            return
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
+
+    @staticmethod
+    def _raise_for_status(response: httpx.Response) -> None:
+        """Raise LMStudioAPIError for an error response whose body has been read."""
+        if response.status_code < 400:
+            return
+        try:
+            error_data = response.json()
+            error_message = error_data.get("error", {}).get("message", "Unknown error")
+        except Exception:
+            error_message = response.text or "Unknown error"
+            error_data = None
+
+        raise LMStudioAPIError(
+            status_code=response.status_code,
+            message=error_message,
+            response_data=error_data
+        )
+
+    def _check_circuit(self) -> None:
+        """Raise LMStudioCircuitOpenError if the circuit breaker rejects the call."""
+        if self.breaker is not None and not self.breaker.allow():
+            raise LMStudioCircuitOpenError(self.breaker.retry_after())
+
+    def _record_outcome(self, error: Optional[Exception]) -> None:
+        """Feed the circuit breaker: only connection errors and retryable statuses count as failures."""
+        if self.breaker is None:
+            return
+        if _is_retryable(error):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
     async def _request(
-        self, method: str, endpoint: str, 
+        self, method: str, endpoint: str,
         params: Optional[Dict[str, Any]] = None,
         json_data: Optional[Dict[str, Any]] = None,
-        stream: bool = False
-    ) -> Union[Dict[str, Any], httpx.Response]:
+        idempotent: Optional[bool] = None,
+    ) -> Dict[str, Any]:
         """
         Make a request to the LM Studio API.
 
+        Idempotent calls are retried with exponential backoff and, if enabled,
+        hedged. Every attempt passes the circuit breaker first.
+
         Args:
             method: HTTP method (GET, POST, etc.)
             endpoint: API endpoint (without base URL)
             params: Query parameters
             json_data: JSON data for POST requests
-            stream: Whether to stream the response
+            idempotent: Whether the call may be repeated; defaults to True for GET only
 
         Returns:
-            Response data as dict or raw response for streaming
+            Response data as dict
+
+        Raises:
+            LMStudioCircuitOpenError: If the circuit breaker is open
         """
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        session = await self._ensure_session()
+        if idempotent is None:
+            idempotent = method == "GET"
+        attempts = 1 + max(0, self.max_retries) if idempotent else 1
+        for attempt in range(attempts):
+            self._check_circuit()
+            try:
+                if idempotent and self.hedge:
+                    response = await self._hedged_request(method, endpoint, params, json_data)
+                else:
+                    response = await self._request_once(method, endpoint, params, json_data)
+            except (LMStudioAPIError, LMStudioConnectionError) as e:
+                self._record_outcome(e)
+                if attempt + 1 >= attempts or not _is_retryable(e):
+                    raise
+                self._retries += 1
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+                logger.warning(f"{method} {endpoint} failed ({e}), retry {attempt + 1} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+            self._record_outcome(None)
+            return response
 
-        try:
-            logger.debug(f"Making {method} request to {url}")
-            response = await session.request(
-                method=method,
-                url=url,
-                params=params,
-                json=json_data,
-                stream=stream
-            )
+    async def _request_once(
+        self, method: str, endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        json_data: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Make a single attempt of a request and record its latency."""
+        session = await self._ensure_session()
 
-            if stream and response.status_code == 200:
-                return response
-
-            if response.status_code >= 400:
-                try:
-                    error_data = response.json()
-                    error_message = error_data.get("error", {}).get("message", "Unknown error")
-                except Exception:
-                    error_message = response.text or "Unknown error"
-                    error_data = None
-
-                raise LMStudioAPIError(
-                    status_code=response.status_code,
-                    message=error_message,
-                    response_data=error_data
+        async with self._slot():
+            try:
+                logger.debug(f"Making {method} request to {endpoint}")
+                start = time.perf_counter()
+                response = await session.request(
+                    method=method,
+                    url=f"/{endpoint.lstrip('/')}",
+                    params=params,
+                    json=json_data,
                 )
+            except httpx.RequestError as e:
+                raise LMStudioConnectionError(f"Failed to connect to LM Studio: {str(e)}")
 
-            return response.json()
-
-        except httpx.RequestError as e:
-            raise LMStudioConnectionError(f"Failed to connect to LM Studio: {str(e)}")
+        self._raise_for_status(response)
+        try:
+            data = response.json()
         except json.JSONDecodeError:
             raise LMStudioAPIError(
                 status_code=response.status_code,
                 message="Invalid JSON response from LM Studio"
             )
+        window = self._latency.get(endpoint)
+        if window is None:
+            window = self._latency[endpoint] = LatencyWindow()
+        window.record(time.perf_counter() - start)
+        return data
+
+    async def _hedged_request(
+        self, method: str, endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        json_data: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Make a request, sending a second copy if the first one is still running
+        after the configured latency quantile. The first success wins and the other
+        attempt is cancelled; if both fail, the first error is raised.
+        """
+        window = self._latency.get(endpoint)
+        delay = window.quantile(self.hedge_quantile, self.hedge_min_samples) if window is not None else None
+        first = asyncio.ensure_future(self._request_once(method, endpoint, params, json_data))
+        pending = {first}
+        try:
+            if delay is None:
+                return await first
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                self._hedged += 1
+                logger.debug(f"Hedging {method} {endpoint} after {delay:.3f}s")
+                pending.add(asyncio.ensure_future(self._request_once(method, endpoint, params, json_data)))
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self._hedge_wins += 1
+                        return task.result()
+                    if error is None or task is first:
+                        error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    @asynccontextmanager
+    async def _stream(
+        self, method: str, endpoint: str, json_data: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[httpx.Response]:
+        """
+        Open a streaming request with ``client.stream()``. The request slot and the
+        pooled connection are held until the context exits, which closes the response.
+
+        Args:
+            method: HTTP method (GET, POST, etc.)
+            endpoint: API endpoint (without base URL)
+            json_data: JSON data for POST requests
+
+        Yields:
+            The response, with the body not yet read
+        """
+        self._check_circuit()
+        session = await self._ensure_session()
+
+        async with self._slot():
+            try:
+                logger.debug(f"Opening {method} stream to {endpoint}")
+                async with session.stream(method, f"/{endpoint.lstrip('/')}", json=json_data) as response:
+                    if response.status_code >= 400:
+                        await response.aread()
+                        try:
+                            self._raise_for_status(response)
+                        except LMStudioAPIError as e:
+                            self._record_outcome(e)
+                            raise
+                    self._record_outcome(None)
+                    yield response
+            except httpx.RequestError as e:
+                error = LMStudioConnectionError(f"Failed to connect to LM Studio: {str(e)}")
+                self._record_outcome(error)
+                raise error
+
+    async def _single_flight(self, key: str, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Run ``fetch`` once for all concurrent callers with the same key.
+
+        The upstream request runs in its own task, so a cancelled caller does not
+        fail the others; it is cancelled only when every caller has gone away.
+
+        Args:
+            key: Request key, see ``request_key()``
+            fetch: Coroutine function performing the upstream request
+
+        Returns:
+            The response JSON shared by all callers
+        """
+        entry = self._pending.get(key)
+        if entry is None:
+            task = asyncio.ensure_future(fetch())
+            entry = self._pending[key] = [task, 0]
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+        else:
+            self._coalesced += 1
+        task = entry[0]
+        entry[1] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and not task.done():
+                task.cancel()
+
+    async def _post_chat_completion(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send one chat completion request upstream. Generating again has no side effects."""
+        return await self._request("POST", "v1/chat/completions", json_data=payload, idempotent=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get limiter counters: requests in flight, requests waiting for a slot and the limit,
+        plus how many chat completions were coalesced onto an identical in-flight request.
+
+        Returns:
+            Dict with ``in_flight``, ``waiting``, ``max_concurrency``, ``coalesced``,
+            ``coalescing`` (distinct upstream requests shared right now), ``retries``, ``hedged``
+            and ``hedge_wins``, plus ``circuit``, ``cache`` and ``scheduler`` stats if those are enabled
+        """
+        stats = {
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "max_concurrency": self.max_concurrency,
+            "coalesced": self._coalesced,
+            "coalescing": len(self._pending),
+            "retries": self._retries,
+            "hedged": self._hedged,
+            "hedge_wins": self._hedge_wins,
+        }
+        if self.breaker is not None:
+            stats["circuit"] = self.breaker.get_stats()
+        if self.cache is not None:
+            stats["cache"] = self.cache.get_stats()
+        if self.scheduler is not None:
+            stats["scheduler"] = self.scheduler.get_stats()
+        return stats
 
     async def get_models(self) -> ModelList:
         """
@@ -217,6 +905,9 @@ class AsyncLMStudioClient:
         presence_penalty: float = 0.0,
         frequency_penalty: float = 0.0,
         stop: Optional[Union[str, List[str]]] = None,
+        seed: Optional[int] = None,
+        agent_id: Optional[Union[int, str]] = None,
+        priority: Union[RequestPriority, str] = RequestPriority.INTERACTIVE,
     ) -> ChatCompletionResponse:
         """
         Create a chat completion with the specified model and messages.
@@ -231,6 +922,9 @@ class AsyncLMStudioClient:
             presence_penalty: Presence penalty (-2 to 2)
             frequency_penalty: Frequency penalty (-2 to 2)
             stop: Sequences where the API will stop generating further tokens
+            seed: Sampling seed; makes the response reproducible and therefore cacheable
+            agent_id: Agent the request is made for, used for fair scheduling
+            priority: Scheduling class, interactive requests are dispatched before background ones
 
         Returns:
             ChatCompletionResponse: The completion response
@@ -255,8 +949,32 @@ class AsyncLMStudioClient:
             
         if stop is not None:
             payload["stop"] = stop
-            
-        response = await self._request("POST", "v1/chat/completions", json_data=payload)
+
+        if seed is not None:
+            payload["seed"] = seed
+
+        cache_key = self.cache.make_key(payload) if self.cache is not None else None
+        if cache_key is not None:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"Chat completion served from cache for model: {model}")
+                return ChatCompletionResponse.parse_obj(cached)
+
+        async def fetch() -> Dict[str, Any]:
+            if self.scheduler is not None:
+                response = await self.scheduler.submit(payload, agent_id, priority)
+            else:
+                response = await self._post_chat_completion(payload)
+            if cache_key is not None:
+                await self.cache.set(cache_key, response)
+            return response
+
+        sampled = temperature > 0 and seed is None
+        if self.coalesce and not (sampled and self.scheduler is not None and self.scheduler.batch_n):
+            # With n batching, identical sampled requests get distinct samples from one call instead
+            response = await self._single_flight(cache_key or request_key(payload), fetch)
+        else:
+            response = await fetch()
         return ChatCompletionResponse.parse_obj(response)
 
     async def stream_chat_completion(
@@ -270,7 +988,8 @@ class AsyncLMStudioClient:
         presence_penalty: float = 0.0,
         frequency_penalty: float = 0.0,
         stop: Optional[Union[str, List[str]]] = None,
-    ) -> AsyncGenerator[StreamedChatCompletionResponse, None]:
+        mode: Union[StreamMode, str] = StreamMode.MODEL,
+    ) -> AsyncGenerator[Union[StreamedChatCompletionResponse, Dict[str, Any], str], None]:
         """
         Stream a chat completion with the specified model and messages.
 
@@ -284,9 +1003,12 @@ class AsyncLMStudioClient:
             presence_penalty: Presence penalty (-2 to 2)
             frequency_penalty: Frequency penalty (-2 to 2)
             stop: Sequences where the API will stop generating further tokens
+            mode: ``model`` yields validated response models, ``dict`` the raw chunk JSON and
+                ``content`` only the text deltas (of all choices, in order); the latter two
+                skip pydantic entirely
 
         Yields:
-            StreamedChatCompletionResponse: Chunks of the completion response
+            Chunks of the completion response in the form selected by ``mode``
         """
         logger.info(f"Streaming chat completion with model: {model}")
         
@@ -310,28 +1032,16 @@ class AsyncLMStudioClient:
         if stop is not None:
             payload["stop"] = stop
             
-        response = await self._request("POST", "v1/chat/completions", json_data=payload, stream=True)
-        
-        try:
-            async for line in response.aiter_lines():
-                line = line.strip()
-                if not line:
-                    continue
-                    
-                if line.startswith("data: "):
-                    line = line[6:]  # Remove "data: " prefix
-                    
-                if line == "[DONE]":
+        mode = StreamMode(mode)
+        decoder = SSEDecoder()
+        async with self._stream("POST", "v1/chat/completions", json_data=payload) as response:
+            async for data in response.aiter_bytes():
+                for item in convert_stream_chunks(decoder.feed(data), mode):
+                    yield item
+                if decoder.done:
                     break
-                    
-                try:
-                    chunk_data = json.loads(line)
-                    chunk = StreamedChatCompletionResponse.parse_obj(chunk_data)
-                    yield chunk
-                except json.JSONDecodeError:
-                    logger.warning(f"Failed to parse streaming response chunk: {line}")
-        finally:
-            await response.aclose()
+            for item in convert_stream_chunks(decoder.close(), mode):
+                yield item
 
     async def load_model(self, model_path: str) -> Dict[str, Any]:
         """
@@ -367,8 +1077,23 @@ class AsyncLMStudioClient:
                 logger.error(f"Failed to load model via CLI: {e}")
                 raise LMStudioClientError(f"Failed to load model {model_path}: {str(e)}")
 
+    async def unload_model(self, model_id: str) -> Dict[str, Any]:
+        """
+        Unload a model from LM Studio to free its memory.
+
+        Args:
+            model_id: ID of the loaded model
+
+        Returns:
+            Dict with the response from LM Studio
+        """
+        logger.info(f"Unloading model: {model_id}")
+        return await self._request("POST", "v1/models/unload", json_data={"model": model_id})
+
     async def close(self):
-        """Close the HTTP session."""
+        """Stop the scheduler and close the HTTP session."""
+        if self.scheduler is not None:
+            await self.scheduler.close()
         if self.session and not self.session.is_closed:
             await self.session.aclose()
             logger.debug("Closed HTTP session")
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LM Studio Model Residency
+
+This module keeps track of which models LM Studio has loaded, loads models on
+demand (one load per model, however many agents ask for it at once) and evicts
+the least recently used models to stay within a memory budget.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from .client import LMStudioClientError
+
+if TYPE_CHECKING:
+    from .client import AsyncLMStudioClient
+
+logger = logging.getLogger("lmstudio_residency")
+
+
+class ModelResidencyManager:
+    """
+    Loads models on demand and keeps the resident set within a memory budget.
+
+    Models are identified like ``MiniAgent`` does, by the file name of their
+    path. Their memory footprint is estimated from the file size times
+    ``size_overhead`` (KV cache and runtime buffers come on top of the weights).
+    Models pinned with ``use()`` are never evicted. Models are evicted only after
+    a load succeeded: a failed load (e.g. LM Studio without a load endpoint)
+    leaves the resident set alone, and ``use()`` lets the request go through to
+    whatever model LM Studio serves. A model whose load failed is not tried
+    again for ``load_retry_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        client: "AsyncLMStudioClient",
+        memory_budget_bytes: Optional[int] = None,
+        size_overhead: float = 1.2,
+        load_retry_interval: float = 60.0,
+    ):
+        """
+        Initialize the manager.
+
+        Args:
+            client: Client used to list, load and unload models
+            memory_budget_bytes: Estimated bytes all resident models may take (None = unbounded)
+            size_overhead: Factor applied to the model file size to estimate its memory footprint
+            load_retry_interval: Seconds before a model whose load failed is tried again
+        """
+        self.client = client
+        self.memory_budget_bytes = memory_budget_bytes
+        self.size_overhead = size_overhead
+        self.load_retry_interval = load_retry_interval
+        # model id -> estimated bytes, least recently used first
+        self._resident: "OrderedDict[str, int]" = OrderedDict()
+        self._paths: Dict[str, str] = {}
+        self._loading: Dict[str, asyncio.Future] = {}
+        self._pins: Dict[str, int] = {}
+        # model id -> monotonic time of its last failed load
+        self._failed_loads: Dict[str, float] = {}
+        # Loads and evictions run one at a time so the budget check stays valid
+        self._lock = asyncio.Lock()
+        self._stats = {
+            "hits": 0,
+            "cold_loads": 0,
+            "load_waits": 0,
+            "evictions": 0,
+            "load_failures": 0,
+            "skipped_loads": 0,
+        }
+        self.load_seconds = 0.0
+
+    @staticmethod
+    def model_id(model_path: str) -> str:
+        """Get the LM Studio model id of a model path."""
+        return os.path.basename(model_path)
+
+    def estimate_bytes(self, model_path: Optional[str]) -> int:
+        """Estimate the memory footprint of a model, 0 if its file is unknown."""
+        if not model_path:
+            return 0
+        try:
+            return int(os.path.getsize(model_path) * self.size_overhead)
+        except OSError:
+            return 0
+
+    @property
+    def used_bytes(self) -> int:
+        """Estimated bytes taken by the resident models."""
+        return sum(self._resident.values())
+
+    def is_resident(self, model_path: str) -> bool:
+        """Check whether a model is currently loaded."""
+        return self.model_id(model_path) in self._resident
+
+    async def refresh(self) -> List[str]:
+        """
+        Synchronize the resident set with the models LM Studio reports.
+
+        Models loaded by someone else are tracked as the least recently used;
+        models that disappeared are forgotten.
+
+        Returns:
+            The ids of the loaded models
+        """
+        models = await self.client.get_models()
+        loaded = [model.id for model in models.data]
+        for model_id in list(self._resident):
+            if model_id not in loaded:
+                del self._resident[model_id]
+        for model_id in loaded:
+            if model_id not in self._resident:
+                self._resident[model_id] = self.estimate_bytes(self._paths.get(model_id))
+                self._resident.move_to_end(model_id, last=False)
+        return loaded
+
+    async def ensure_loaded(self, model_path: str) -> str:
+        """
+        Make sure a model is loaded, waiting for a load already in progress.
+
+        Args:
+            model_path: Path of the model file
+
+        Returns:
+            The model id
+
+        Raises:
+            LMStudioClientError: If the model could not be loaded, now or within
+                ``load_retry_interval`` seconds
+        """
+        model_id = self.model_id(model_path)
+        self._paths[model_id] = model_path
+        if model_id in self._resident:
+            self._resident.move_to_end(model_id)
+            self._stats["hits"] += 1
+            return model_id
+        failed_at = self._failed_loads.get(model_id)
+        if failed_at is not None and time.monotonic() - failed_at < self.load_retry_interval:
+            self._stats["skipped_loads"] += 1
+            raise LMStudioClientError(f"Loading model {model_path} failed recently, not retrying yet")
+
+        load = self._loading.get(model_id)
+        if load is None:
+            self._stats["cold_loads"] += 1
+            load = self._loading[model_id] = asyncio.ensure_future(self._load(model_id, model_path))
+            load.add_done_callback(lambda _: self._loading.pop(model_id, None))
+        else:
+            self._stats["load_waits"] += 1
+        # A cancelled caller must not cancel the load others are waiting for
+        await asyncio.shield(load)
+        return model_id
+
+    @asynccontextmanager
+    async def use(self, model_path: str) -> AsyncIterator[str]:
+        """
+        Load a model if needed and pin it for the duration of the context.
+
+        A failed load does not fail the request: it is logged and counted, and the
+        request goes to the backend, which serves it if the model is available
+        there anyway (e.g. loaded by hand or loaded on demand by LM Studio).
+
+        Args:
+            model_path: Path of the model file
+
+        Yields:
+            The model id
+        """
+        model_id = self.model_id(model_path)
+        self._pins[model_id] = self._pins.get(model_id, 0) + 1
+        try:
+            try:
+                await self.ensure_loaded(model_path)
+            except LMStudioClientError as e:
+                logger.debug(f"Using model {model_id} without a confirmed load: {e}")
+            yield model_id
+        finally:
+            self._pins[model_id] -= 1
+            if not self._pins[model_id]:
+                del self._pins[model_id]
+
+    async def preload(self, model_paths: Iterable[str]) -> List[str]:
+        """
+        Load models in the given order (hottest first) while they fit the budget.
+        Preloading never evicts a resident model.
+
+        Args:
+            model_paths: Paths of the models to load
+
+        Returns:
+            The ids of the models that are resident afterwards
+        """
+        preloaded = []
+        for model_path in model_paths:
+            if not self.is_resident(model_path):
+                size = self.estimate_bytes(model_path)
+                if self.memory_budget_bytes and self.used_bytes + size > self.memory_budget_bytes:
+                    break
+                try:
+                    await self.ensure_loaded(model_path)
+                except LMStudioClientError as e:
+                    logger.warning(f"Failed to preload model {model_path}: {e}")
+                    continue
+            preloaded.append(self.model_id(model_path))
+        return preloaded
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get residency counters.
+
+        Returns:
+            Dict with the resident models (least recently used first), models loading,
+            memory use against the budget and hit/load/eviction counters
+        """
+        return {
+            **self._stats,
+            "resident": list(self._resident),
+            "loading": list(self._loading),
+            "used_bytes": self.used_bytes,
+            "memory_budget_bytes": self.memory_budget_bytes,
+            "load_seconds": self.load_seconds,
+        }
+
+    async def _load(self, model_id: str, model_path: str) -> None:
+        size = self.estimate_bytes(model_path)
+        async with self._lock:
+            start = time.perf_counter()
+            try:
+                response = await self.client.load_model(model_path)
+                if isinstance(response, dict) and response.get("status") == "error":
+                    raise LMStudioClientError(f"Failed to load model {model_path}: {response.get('message')}")
+            except LMStudioClientError as e:
+                self._stats["load_failures"] += 1
+                self._failed_loads[model_id] = time.monotonic()
+                logger.warning(f"Failed to load model {model_id}, requests go to the backend as is: {e}")
+                raise
+            self._failed_loads.pop(model_id, None)
+            self.load_seconds += time.perf_counter() - start
+            self._resident[model_id] = size
+            # Evict only now that the load is confirmed
+            await self._make_room(keep=model_id)
+            logger.info(f"Model {model_id} resident ({self.used_bytes} bytes in use)")
+
+    async def _make_room(self, keep: str) -> None:
+        """Unload least recently used, unpinned models other than ``keep`` until the budget holds."""
+        if not self.memory_budget_bytes:
+            return
+        for victim in list(self._resident):
+            if self.used_bytes <= self.memory_budget_bytes:
+                return
+            if victim == keep or self._pins.get(victim):
+                continue
+            try:
+                await self.client.unload_model(victim)
+            except LMStudioClientError as e:
+                logger.warning(f"Failed to unload model {victim}: {e}")
+                continue
+            self._resident.pop(victim, None)
+            self._stats["evictions"] += 1
+            logger.info(f"Evicted least recently used model {victim}")
+        if self.used_bytes > self.memory_budget_bytes:
+            logger.warning(
+                f"Resident models take {self.used_bytes} bytes, over the memory budget of {self.memory_budget_bytes} bytes"
+            )
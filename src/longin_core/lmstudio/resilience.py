@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LM Studio Call Resilience
+
+This module provides the building blocks the LM Studio client uses to survive a
+slow or failing backend: exponential backoff with jitter for retries, a rolling
+latency window for picking the hedging delay, and a circuit breaker that fails
+fast while the backend is down.
+"""
+
+import random
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, Optional
+
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    """
+    Get the delay before a retry ("full jitter" exponential backoff).
+
+    Args:
+        attempt: Number of the retry, starting at 0
+        base: Delay bound of the first retry in seconds
+        maximum: Upper bound of the delay in seconds
+
+    Returns:
+        A random delay between 0 and ``min(maximum, base * 2 ** attempt)``
+    """
+    return random.uniform(0, min(maximum, base * 2 ** attempt))
+
+
+class LatencyWindow:
+    """Latencies of the most recent successful calls, for quantile estimates."""
+
+    def __init__(self, size: int = 200):
+        """
+        Initialize the window.
+
+        Args:
+            size: Number of most recent samples kept
+        """
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def record(self, seconds: float) -> None:
+        """Add the latency of a successful call."""
+        self._samples.append(seconds)
+
+    def quantile(self, q: float, min_samples: int = 20) -> Optional[float]:
+        """
+        Estimate a latency quantile.
+
+        Args:
+            q: Quantile between 0 and 1 (e.g. 0.95)
+            min_samples: Samples needed before an estimate is given
+
+        Returns:
+            The quantile in seconds, or None while there are too few samples
+        """
+        if len(self._samples) < max(1, min_samples):
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for a backend.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and calls
+    are rejected without touching the network. Once ``reset_timeout`` seconds have
+    passed, a single trial call is let through (half-open): its success closes the
+    circuit, its failure opens it for another ``reset_timeout``.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a trial call
+            clock: Monotonic time source
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_started: Optional[float] = None
+        self.opened = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        """
+        Check whether a call may go through. A rejected call is counted.
+
+        Returns:
+            False while the circuit is open (or a half-open trial is running)
+        """
+        now = self._clock()
+        if self.state is CircuitState.OPEN and now - self._opened_at >= self.reset_timeout:
+            self.state = CircuitState.HALF_OPEN
+            self._trial_started = None
+        if self.state is CircuitState.HALF_OPEN:
+            # A trial whose outcome was never recorded (e.g. cancelled) does not block forever
+            if self._trial_started is None or now - self._trial_started >= self.reset_timeout:
+                self._trial_started = now
+                return True
+        elif self.state is CircuitState.CLOSED:
+            return True
+        self.rejected += 1
+        return False
+
+    def retry_after(self) -> float:
+        """Seconds until the next trial call is let through."""
+        if self.state is CircuitState.CLOSED:
+            return 0.0
+        start = self._opened_at if self.state is CircuitState.OPEN else (self._trial_started or 0.0)
+        return max(0.0, start + self.reset_timeout - self._clock())
+
+    def record_success(self) -> None:
+        """Record a call that reached a healthy backend."""
+        self._failures = 0
+        self.state = CircuitState.CLOSED
+        self._trial_started = None
+
+    def record_failure(self) -> None:
+        """Record a call that failed because of the backend."""
+        self._failures += 1
+        if self.state is CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self.state is not CircuitState.OPEN:
+                self.opened += 1
+            self.state = CircuitState.OPEN
+            self._opened_at = self._clock()
+            self._trial_started = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get breaker state and counters.
+
+        Returns:
+            Dict with the state, consecutive failures, times opened and rejected calls
+        """
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self._failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "retry_after": self.retry_after(),
+        }
@@ -7,12 +7,18 @@ import re
 from typing import Dict, Any, Optional, List
 
 from .. import agents as agents_package
-from ..storage import StorageManager
+from ..storage import StorageManager, StorageType
 from ..event_bus import LONGINEventBus
-from ..base import LonginModule
+from ..event_transport import RedisStreamsTransport
+from ..base import LonginModule, LonginAdapter
 from ..mcp import MCPServer
 from ..lmstudio.client import AsyncLMStudioClient  # NEW
+from ..lmstudio.cache import CompletionCache
+from ..lmstudio.residency import ModelResidencyManager
+from ..adapters import LMStudioAdapter, LlamaCppAdapter
 from ..agents.mini_agent import MiniAgent          # NEW
+from ..agents.prompt_builder import PromptBuilder
+from ..learning_flow.scheduler import TrainingScheduler
 
 
 class CoreOrchestrator:
@@ -66,6 +72,13 @@ class CoreOrchestrator:
 
         # LM-Studio client placeholder (lazy-created in start())
         self.lmstudio_client: Optional[AsyncLMStudioClient] = None
+        # Loads mini-agent models on demand within a memory budget (lmstudio.residency)
+        self.model_manager: Optional[ModelResidencyManager] = None
+        self._preload_task: Optional[asyncio.Task] = None
+        # Inference backends shared by the mini-agents, keyed by type ("lm_studio", "llama_cpp")
+        self.inference_backends: Dict[str, LonginAdapter] = {}
+        # Queues and admits mini-agent training runs (created in start())
+        self.training_scheduler: Optional[TrainingScheduler] = None
         
         self.logger.info("CoreOrchestrator initialized.")
 
@@ -177,10 +190,47 @@ class CoreOrchestrator:
         # Create shared LM-Studio client once
         if self.lmstudio_client is None:
             lm_cfg = self.config.get("lmstudio", {})
+            cache_cfg = lm_cfg.get("cache", {})
+            cache = None
+            if cache_cfg.get("enabled"):
+                cache = CompletionCache(
+                    max_entries=cache_cfg.get("max_entries", 1024),
+                    max_bytes=cache_cfg.get("max_bytes", 64 * 1024 * 1024),
+                    ttl=cache_cfg.get("ttl", 3600.0),
+                    redis_store=(
+                        self.storage_manager.get_store(StorageType.REDIS) if cache_cfg.get("redis_tier") else None
+                    ),
+                )
             self.lmstudio_client = AsyncLMStudioClient(
                 base_url=lm_cfg.get("host", "http://localhost:1234"),
                 api_key=lm_cfg.get("api_key"),
+                max_concurrency=lm_cfg.get("max_concurrency", 4),
+                max_connections=lm_cfg.get("max_connections", 10),
+                max_keepalive_connections=lm_cfg.get("max_keepalive_connections", 10),
+                keepalive_expiry=lm_cfg.get("keepalive_expiry", 60.0),
+                read_timeout=lm_cfg.get("read_timeout", 300.0),
+                http2=lm_cfg.get("http2", False),
+                cache=cache,
+                coalesce=lm_cfg.get("coalesce", True),
+                batch_window=lm_cfg.get("batch_window"),
+                batch_n=lm_cfg.get("batch_n", False),
+                max_retries=lm_cfg.get("max_retries", 2),
+                backoff_base=lm_cfg.get("backoff_base", 0.25),
+                backoff_max=lm_cfg.get("backoff_max", 4.0),
+                hedge=lm_cfg.get("hedge", False),
+                hedge_quantile=lm_cfg.get("hedge_quantile", 0.95),
+                breaker_failure_threshold=lm_cfg.get("breaker_failure_threshold", 5),
+                breaker_reset_timeout=lm_cfg.get("breaker_reset_timeout", 30.0),
             )
+            residency_cfg = lm_cfg.get("residency", {})
+            if residency_cfg.get("enabled"):
+                budget_gb = residency_cfg.get("memory_budget_gb")
+                self.model_manager = ModelResidencyManager(
+                    self.lmstudio_client,
+                    memory_budget_bytes=int(budget_gb * 1024 ** 3) if budget_gb else None,
+                    size_overhead=residency_cfg.get("size_overhead", 1.2),
+                    load_retry_interval=residency_cfg.get("load_retry_interval", 60.0),
+                )
 
         for spec in cfg_agents:
             try:
@@ -200,7 +250,17 @@ class CoreOrchestrator:
                     self.logger.info(f"Created new MiniAgent id={agent_id}")
 
                 # Dependency injection
+                agent.state_persister.flush_interval = self.config.get("mini_agent_state", {}).get(
+                    "flush_interval", MiniAgent.state_flush_interval
+                )
                 agent.lmstudio_client = self.lmstudio_client
+                agent.model_manager = self.model_manager
+                agent.backend = await self._get_inference_backend(
+                    spec.get("backend", self.config.get("inference", {}).get("default_backend", "lm_studio"))
+                )
+                agent.prompt_builder = PromptBuilder.from_config(
+                    {**self.config.get("inference", {}).get("prompt", {}), **spec.get("prompt", {})}
+                )
                 agent.event_bus = self.event_bus
 
                 # Subscribe to bus events (fire-and-forget)
@@ -212,6 +272,98 @@ class CoreOrchestrator:
                     "Failed to initialise MiniAgent from spec %s : %s", spec, exc, exc_info=True
                 )
 
+        if self.model_manager is not None:
+            preload = self.config.get("lmstudio", {}).get("residency", {}).get("preload", 1)
+            # Warm up in the background, startup must not wait for multi-GB loads
+            self._preload_task = asyncio.create_task(self._preload_models(preload))
+
+    async def _get_inference_backend(self, backend_type: str) -> LonginAdapter:
+        """
+        Returns the shared inference backend of a type, creating it on first use.
+        ``llama_cpp`` runs GGUF models in-process; if it is unavailable, or the type
+        is unknown, LM Studio over the shared client is used.
+
+        Args:
+            backend_type (str): ``lm_studio`` or ``llama_cpp``.
+
+        Returns:
+            LonginAdapter: The backend.
+
+        Vrátí sdílený inferenční backend daného typu, při prvním použití ho vytvoří.
+        ``llama_cpp`` spouští modely GGUF v procesu; pokud není k dispozici nebo je
+        typ neznámý, použije se LM Studio přes sdíleného klienta.
+
+        Argumenty:
+            backend_type (str): ``lm_studio`` nebo ``llama_cpp``.
+
+        Vrací:
+            LonginAdapter: Backend.
+        """
+        backend = self.inference_backends.get(backend_type)
+        if backend is not None:
+            return backend
+        backend_cfg = self.config.get("inference", {}).get(backend_type, {})
+        if backend_type == "llama_cpp":
+            backend = LlamaCppAdapter("llama_cpp", backend_cfg, self.logger.getChild("LlamaCppAdapter"))
+            if not await backend.connect():
+                self.logger.warning("In-process llama.cpp backend unavailable, falling back to LM Studio.")
+                await backend.close()
+                return await self._get_inference_backend("lm_studio")
+        else:
+            if backend_type != "lm_studio":
+                self.logger.error(f"Unknown inference backend '{backend_type}', using LM Studio.")
+                return await self._get_inference_backend("lm_studio")
+            backend = LMStudioAdapter(
+                "lm_studio", backend_cfg, self.logger.getChild("LMStudioAdapter"), client=self.lmstudio_client
+            )
+        self.inference_backends[backend_type] = backend
+        return backend
+
+    async def _preload_models(self, count: int) -> None:
+        """
+        Loads the models of the ``count`` most used mini-agents (by chat completions),
+        so the first requests do not pay the cold-load penalty.
+
+        Args:
+            count (int): Number of models to preload.
+
+        Načte modely ``count`` nejpoužívanějších mini-agentů (podle počtu chat completions),
+        aby první požadavky neplatily za studené načtení.
+
+        Argumenty:
+            count (int): Počet modelů k načtení.
+        """
+        try:
+            await self.model_manager.refresh()
+        except Exception as exc:
+            self.logger.warning(f"Cannot list LM Studio models, skipping preload: {exc}")
+            return
+        hottest = sorted(
+            self.mini_agents.values(), key=lambda agent: agent.statistics.get("chat_completions", 0), reverse=True
+        )
+        model_paths = list(dict.fromkeys(agent.model_path for agent in hottest))[:count]
+        preloaded = await self.model_manager.preload(model_paths)
+        self.logger.info(f"Preloaded models: {preloaded}")
+
+    def _attach_event_bus_transport(self) -> None:
+        """
+        Attach the cross-process event bus transport configured under
+        ``event_bus.transport``. The Redis Streams transport reuses the
+        ``redis_store`` connection settings of the storage manager.
+        """
+        transport_cfg: Dict[str, Any] = dict(self.config.get("event_bus", {}).get("transport") or {})
+        transport_type = transport_cfg.pop("type", None)
+        if not transport_type:
+            return
+        if transport_type != "redis_streams":
+            self.logger.error(f"Unknown event bus transport type '{transport_type}', using local delivery only.")
+            return
+        redis_cfg = self.storage_manager.config.get("redis_store", {})
+        transport_cfg.setdefault("url", redis_cfg.get("url", "redis://localhost:6379/0"))
+        self.event_bus.set_transport(
+            RedisStreamsTransport(transport_cfg, self.logger.getChild("EventBusTransport"))
+        )
+
     async def start(self) -> bool:
         """
         Starts the orchestrator and all its components.
@@ -235,6 +387,7 @@ class CoreOrchestrator:
             
             # Start event bus
             self.logger.info("Starting event bus...")
+            self._attach_event_bus_transport()
             await self.event_bus.start()
             
             # Start MCP server
@@ -248,6 +401,19 @@ class CoreOrchestrator:
             # Initialise mini-agents
             self.logger.info("Initialising mini_agents...")
             await self._init_mini_agents()
+
+            # Start the training job scheduler
+            training_cfg = self.config.get("training", {})
+            self.training_scheduler = TrainingScheduler(
+                self.mini_agents.get,
+                event_bus=self.event_bus,
+                queue_path=training_cfg.get("queue_path", "data/training_jobs.json"),
+                max_concurrent_jobs=training_cfg.get("max_concurrent_jobs", 1),
+                max_cpu_percent=training_cfg.get("max_cpu_percent", 85.0),
+                min_available_memory_gb=training_cfg.get("min_available_memory_gb", 4.0),
+                poll_interval=training_cfg.get("poll_interval", 5.0),
+            )
+            await self.training_scheduler.start()
             
             # Initialize all registered modules
             self.logger.info("Initializing registered modules...")
@@ -281,6 +447,11 @@ class CoreOrchestrator:
         self.logger.info("Stopping CoreOrchestrator...")
         
         try:
+            # Interrupt running training jobs (they save their state and stay queued)
+            if self.training_scheduler is not None:
+                self.logger.info("Stopping training scheduler...")
+                await self.training_scheduler.stop()
+
             # Cleanup all registered modules
             self.logger.info("Cleaning up registered modules...")
             for module_id, module in self.modules.items():
@@ -302,11 +473,22 @@ class CoreOrchestrator:
             await self.storage_manager.shutdown_stores()
 
             # Persist mini-agents & close LM-Studio client
+            event_log = getattr(self.event_bus, "event_log", None)
             for agent in self.mini_agents.values():
                 try:
-                    agent.save_state()
+                    if event_log is not None:
+                        # The bus drained its queues on stop, everything logged so far was handled
+                        agent.memory["event_log_offset"] = event_log.next_offset
+                    agent.mark_state_dirty()
+                    await agent.close_state()
                 except Exception as exc:
                     self.logger.warning("Failed to save agent %s : %s", agent.id, exc)
+            if self._preload_task is not None:
+                self._preload_task.cancel()
+                await asyncio.gather(self._preload_task, return_exceptions=True)
+                self._preload_task = None
+            for backend in self.inference_backends.values():
+                await backend.close()
             if self.lmstudio_client:
                 await self.lmstudio_client.close()
             
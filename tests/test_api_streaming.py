@@ -0,0 +1,146 @@
+import pytest
+import asyncio
+import json
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from src import api
+from src.longin_core.agents.mini_agent import MiniAgent
+from src.longin_core.base import LonginAdapter
+
+
+class StubBackend(LonginAdapter):
+    """Streams "Hel", "lo"; with ``hang`` it stalls after the first chunk until closed."""
+
+    def __init__(self, hang=False):
+        super().__init__("stub", "stub", {}, None)
+        self.hang = hang
+        self.opened = 0
+        self.closed = 0
+
+    async def connect(self):
+        return True
+
+    async def list_models(self):
+        return []
+
+    async def generate_completion(self, model_id, prompt, params):
+        return {"text": ""}
+
+    async def get_status(self):
+        return {}
+
+    async def stream_chat_completion(self, model_id, messages, params):
+        self.opened += 1
+        try:
+            yield {"choices": [{"delta": {"content": "Hel"}}]}
+            if self.hang:
+                await asyncio.sleep(3600)
+            yield {"choices": [{"delta": {"content": "lo"}}]}
+        finally:
+            self.closed += 1
+
+
+BASE_DIR = MiniAgent._base_dir
+
+
+def _serve_agent(tmp_path, backend):
+    # Restored with the app state at the end of each test
+    MiniAgent._base_dir = str(tmp_path)
+    agent = MiniAgent(id=1, name="streamer", model_path="m.gguf", dataset_path="d.jsonl")
+    agent.backend = backend
+    api.app_state["orchestrator"] = SimpleNamespace(mini_agents={1: agent})
+    return agent
+
+
+CHAT = {"messages": [{"role": "user", "content": "hi"}]}
+
+
+def test_sse_and_websocket_stream_the_deltas(tmp_path):
+    backend = StubBackend()
+    _serve_agent(tmp_path, backend)
+    client = TestClient(api.app)
+    try:
+        response = client.post("/agents/1/chat/stream", json=CHAT)
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [line for line in response.text.split("\n\n") if line]
+        assert [json.loads(event[len("data: "):]) for event in events[:-1]] == [
+            {"choices": [{"delta": {"content": "Hel"}}]},
+            {"choices": [{"delta": {"content": "lo"}}]},
+        ]
+        assert events[-1] == "data: [DONE]"
+
+        with client.websocket_connect("/agents/1/chat/ws") as websocket:
+            websocket.send_text("not json")
+            assert websocket.receive_json()["type"] == "error"
+            websocket.send_json(CHAT)
+            assert [websocket.receive_json() for _ in range(3)] == [
+                {"type": "delta", "data": {"choices": [{"delta": {"content": "Hel"}}]}},
+                {"type": "delta", "data": {"choices": [{"delta": {"content": "lo"}}]}},
+                {"type": "done"},
+            ]
+        assert backend.opened == backend.closed == 2
+    finally:
+        api.app_state.clear()
+        MiniAgent._base_dir = BASE_DIR
+
+
+def test_websocket_cancel_and_disconnect_close_the_backend_stream(tmp_path):
+    backend = StubBackend(hang=True)
+    _serve_agent(tmp_path, backend)
+    client = TestClient(api.app)
+    try:
+        with client.websocket_connect("/agents/1/chat/ws") as websocket:
+            # A message sent while a response streams cancels it
+            websocket.send_json(CHAT)
+            assert websocket.receive_json()["type"] == "delta"
+            websocket.send_json({"type": "cancel"})
+            assert websocket.receive_json() == {"type": "cancelled"}
+            assert backend.closed == 1
+
+            # Closing the socket mid-stream cancels the upstream request too
+            websocket.send_json(CHAT)
+            assert websocket.receive_json()["type"] == "delta"
+        assert backend.opened == backend.closed == 2
+    finally:
+        api.app_state.clear()
+        MiniAgent._base_dir = BASE_DIR
+
+
+@pytest.mark.asyncio
+async def test_sse_client_disconnect_closes_the_backend_stream(tmp_path):
+    backend = StubBackend(hang=True)
+    _serve_agent(tmp_path, backend)
+    body = json.dumps(CHAT).encode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST", "scheme": "http",
+        "path": "/agents/1/chat/stream", "raw_path": b"/agents/1/chat/stream", "root_path": "", "query_string": b"",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "client": ("test", 1), "server": ("test", 80),
+    }
+    first_delta = asyncio.Event()
+    chunks = []
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # The client goes away after the first delta, while upstream is still generating
+        await first_delta.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            chunks.append(message["body"])
+            first_delta.set()
+
+    try:
+        await asyncio.wait_for(api.app(scope, receive, send), timeout=2)
+        assert chunks == [b'data: {"choices": [{"delta": {"content": "Hel"}}]}\n\n']
+        assert backend.opened == backend.closed == 1
+    finally:
+        api.app_state.clear()
+        MiniAgent._base_dir = BASE_DIR
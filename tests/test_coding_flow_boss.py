@@ -0,0 +1,39 @@
+import pytest
+import asyncio
+from unittest.mock import MagicMock
+
+from src.longin_core.event_bus import LONGINEventBus
+from src.longin_core.agents.coding_flow_boss import CodingFlowBossAgent
+
+
+@pytest.mark.asyncio
+async def test_cycles_skip_unserved_phases_and_finished_cycles_are_evicted():
+    event_bus = LONGINEventBus(MagicMock(), {})
+    await event_bus.start()
+    boss = CodingFlowBossAgent({"max_finished_cycles": 2, "phase_timeout": 1}, MagicMock(), event_bus, None)
+
+    async def gather_context(message):
+        return {"files": [message["task"]]}
+
+    await event_bus.serve("context_request", gather_context, "context_master")
+
+    cycle_ids = []
+    for n in range(3):
+        cycle_ids.append(await boss.start_frtdsd_cycle(f"task {n}"))
+        await asyncio.wait_for(asyncio.gather(*boss._cycle_tasks.values()), timeout=2)
+        await asyncio.sleep(0)
+
+    # Only the served phase produced a result, the others were skipped instead of failing
+    cycle = boss.get_cycle(cycle_ids[-1])
+    assert cycle["state"] == "completed"
+    assert cycle["results"]["context"] == {"files": ["task 2"]}
+    assert cycle["skipped_phases"] == [
+        "test_creation", "code_implementation", "visual_validation", "success_monitoring"
+    ]
+
+    # The oldest finished cycle is forgotten
+    assert boss.get_cycle(cycle_ids[0]) is None
+    assert list(boss.cycles) == cycle_ids[1:]
+    assert boss.current_state == "idle"
+
+    await event_bus.stop()
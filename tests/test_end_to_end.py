@@ -26,7 +26,11 @@ async def test_frtdsd_cycle():
 
     # Start the cycle
     task_description = "Create a button with the text 'Test'"
-    await coding_flow_boss.start_frtdsd_cycle(task_description)
+    cycle_id = await coding_flow_boss.start_frtdsd_cycle(task_description)
+    await asyncio.sleep(0)
 
-    # Assert that the first event was published
-    event_bus.publish.assert_called_with("context_request", {"task": task_description}, "coding_flow_boss")
+    # Assert that the first request was sent
+    event_bus.request.assert_any_await(
+        "context_request", {"task": task_description}, "coding_flow_boss", timeout=coding_flow_boss.phase_timeout
+    )
+    assert coding_flow_boss.get_cycle(cycle_id)["task"] == task_description
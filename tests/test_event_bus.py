@@ -0,0 +1,258 @@
+import pytest
+import asyncio
+from unittest.mock import MagicMock
+
+from src.longin_core.event_bus import (
+    LONGINEventBus, EventBusRequestError, EventBusNoResponderError, EventBusOverflowError,
+)
+
+
+@pytest.mark.asyncio
+async def test_slow_topic_does_not_block_other_topics():
+    event_bus = LONGINEventBus(MagicMock(), {})
+    await event_bus.start()
+
+    release = asyncio.Event()
+    delivered = asyncio.Event()
+
+    async def slow_handler(message):
+        await release.wait()
+
+    async def fast_handler(message):
+        delivered.set()
+
+    await event_bus.subscribe("training_metrics_update", slow_handler, "test")
+    await event_bus.subscribe("context_result", fast_handler, "test")
+
+    await event_bus.publish("training_metrics_update", {"step": 1}, "test")
+    await event_bus.publish("context_result", {"context": "ok"}, "test")
+
+    # context_result must be delivered while the metrics handler is still blocked
+    await asyncio.wait_for(delivered.wait(), timeout=1)
+
+    release.set()
+    await event_bus.stop()
+
+
+@pytest.mark.asyncio
+async def test_ordering_is_kept_within_a_topic():
+    event_bus = LONGINEventBus(MagicMock(), {"dispatch_mode": "subscriber"})
+    await event_bus.start()
+
+    received = []
+
+    async def handler(message):
+        await asyncio.sleep(0)
+        received.append(message["step"])
+
+    await event_bus.subscribe("training_metrics_update", handler, "test")
+    for step in range(20):
+        await event_bus.publish("training_metrics_update", {"step": step}, "test")
+
+    await event_bus.stop()
+    assert received == list(range(20))
+
+
+@pytest.mark.asyncio
+async def test_overflow_policies_and_counters():
+    event_bus = LONGINEventBus(MagicMock(), {
+        "topics": {
+            "drop_new": {"capacity": 2, "overflow_policy": "drop_newest"},
+            "drop_old": {"capacity": 2, "overflow_policy": "drop_oldest"},
+            "training_metrics_update": {"capacity": 10, "overflow_policy": "coalesce", "coalesce_key": "run_id"},
+        },
+    })
+
+    received = {"drop_new": [], "drop_old": [], "training_metrics_update": []}
+
+    def make_handler(topic):
+        async def handler(message):
+            received[topic].append(message)
+        return handler
+
+    for topic in received:
+        await event_bus.subscribe(topic, make_handler(topic), "test")
+
+    # Bus is not started yet, so everything stays queued
+    for i in range(4):
+        await event_bus.publish("drop_new", {"i": i}, "test")
+        await event_bus.publish("drop_old", {"i": i}, "test")
+        await event_bus.publish("training_metrics_update", {"run_id": "a", "step": i}, "test")
+    await event_bus.publish("training_metrics_update", {"run_id": "b", "step": 0}, "test")
+
+    stats = event_bus.get_queue_stats()
+    assert stats["drop_new"]["depth"] == 2 and stats["drop_new"]["dropped"] == 2
+    assert stats["drop_old"]["depth"] == 2 and stats["drop_old"]["dropped"] == 2
+    assert stats["training_metrics_update"]["depth"] == 2
+    assert stats["training_metrics_update"]["coalesced"] == 3
+
+    await event_bus.start()
+    await event_bus.stop()
+
+    assert [m["i"] for m in received["drop_new"]] == [0, 1]
+    assert [m["i"] for m in received["drop_old"]] == [2, 3]
+    assert received["training_metrics_update"] == [{"run_id": "a", "step": 3}, {"run_id": "b", "step": 0}]
+
+
+@pytest.mark.asyncio
+async def test_block_policy_applies_backpressure():
+    event_bus = LONGINEventBus(MagicMock(), {"queue_capacity": 1, "overflow_policy": "block"})
+
+    async def handler(message):
+        pass
+
+    await event_bus.subscribe("topic", handler, "test")
+    await event_bus.publish("topic", {"i": 0}, "test")
+
+    blocked = asyncio.create_task(event_bus.publish("topic", {"i": 1}, "test"))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    await event_bus.start()
+    await asyncio.wait_for(blocked, timeout=1)
+    await event_bus.stop()
+
+
+@pytest.mark.asyncio
+async def test_wildcard_and_hierarchical_subscriptions():
+    event_bus = LONGINEventBus(MagicMock(), {})
+    await event_bus.start()
+
+    received = []
+
+    def make_handler(name):
+        async def handler(message):
+            received.append((name, message["agent_id"]))
+        return handler
+
+    await event_bus.subscribe("training_state_update.agent_0", make_handler("agent_0"), "test")
+    await event_bus.subscribe("training_state_update.agent_1", make_handler("agent_1"), "test")
+    await event_bus.subscribe("training_state_update.*", make_handler("star"), "test")
+    await event_bus.subscribe("training_state_update.#", make_handler("hash"), "test")
+
+    await event_bus.publish("training_state_update.agent_0", {"agent_id": 0}, "test")
+    await event_bus.publish("training_state_update", {"agent_id": None}, "test")
+    await event_bus.stop()
+
+    assert sorted(received, key=str) == sorted(
+        [("agent_0", 0), ("star", 0), ("hash", 0), ("hash", None)], key=str
+    )
+
+
+@pytest.mark.asyncio
+async def test_fast_paths_and_batch_publish():
+    event_bus = LONGINEventBus(MagicMock(), {"topics": {"code_result": {"inline": True}}})
+
+    received = []
+
+    async def handler(message):
+        received.append(message["i"])
+
+    # No subscribers: nothing is queued at all
+    await event_bus.publish("nobody_listens", {"i": -1}, "test")
+    assert "nobody_listens" not in event_bus.get_queue_stats()
+
+    # Inline topics are delivered before publish() returns, even when the bus is stopped
+    await event_bus.subscribe("code_result", handler, "test")
+    await event_bus.publish("code_result", {"i": 0}, "test")
+    assert received == [0]
+
+    await event_bus.subscribe("context_result", handler, "test")
+    await event_bus.start()
+    accepted = await event_bus.publish_many(
+        [("context_result", {"i": i}) for i in range(1, 4)] + [("nobody_listens", {"i": 99})],
+        "test",
+    )
+    await event_bus.stop()
+
+    assert accepted == 3
+    assert received == [0, 1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_request_reply_with_correlation_ids():
+    event_bus = LONGINEventBus(MagicMock(), {})
+    await event_bus.start()
+
+    async def context_handler(message):
+        # Finish in reverse order, replies must still reach the right requester
+        await asyncio.sleep(0.01 * (3 - message["n"]))
+        if message["n"] == 0:
+            raise ValueError("no context")
+        return {"context": message["n"]}
+
+    await event_bus.serve("context_request", context_handler, "test")
+
+    results = await asyncio.gather(
+        *(event_bus.request("context_request", {"n": n}, "test", timeout=1) for n in range(3)),
+        return_exceptions=True,
+    )
+    assert isinstance(results[0], EventBusRequestError)
+    assert results[1:] == [{"context": 1}, {"context": 2}]
+
+    async def never_replies(message):
+        await asyncio.sleep(0.2)
+
+    await event_bus.subscribe("slow_request", never_replies, "test")
+    with pytest.raises(asyncio.TimeoutError):
+        await event_bus.request("slow_request", {}, "test", timeout=0.05)
+    with pytest.raises(EventBusRequestError):
+        await event_bus.request("nobody_listens", {}, "test")
+    assert not event_bus._pending_requests
+
+    await event_bus.unsubscribe("slow_request", never_replies, "test")
+    await event_bus.stop()
+
+
+@pytest.mark.asyncio
+async def test_dropped_request_is_not_reported_as_missing_responder():
+    event_bus = LONGINEventBus(MagicMock(), {"topics": {"busy_request": {"capacity": 1, "overflow_policy": "drop_newest"}}})
+    await event_bus.start()
+    release = asyncio.Event()
+
+    async def busy_handler(message):
+        await release.wait()
+        return "done"
+
+    await event_bus.serve("busy_request", busy_handler, "test")
+    # The first request is being handled, the second fills the queue
+    first = asyncio.create_task(event_bus.request("busy_request", {}, "test", timeout=1))
+    await asyncio.sleep(0.01)
+    second = asyncio.create_task(event_bus.request("busy_request", {}, "test", timeout=1))
+    await asyncio.sleep(0.01)
+    with pytest.raises(EventBusOverflowError):
+        await event_bus.request("busy_request", {}, "test")
+    with pytest.raises(EventBusNoResponderError):
+        await event_bus.request("nobody_listens", {}, "test")
+
+    release.set()
+    assert await asyncio.gather(first, second) == ["done", "done"]
+    await event_bus.stop()
+
+
+@pytest.mark.asyncio
+async def test_metrics_snapshot_and_slow_handlers():
+    logger = MagicMock()
+    event_bus = LONGINEventBus(logger, {"slow_handler_threshold": 0.02})
+    await event_bus.start()
+
+    async def slow_handler(message):
+        await asyncio.sleep(0.03)
+
+    async def failing_handler(message):
+        raise RuntimeError("boom")
+
+    await event_bus.subscribe("work", slow_handler, "slow_module")
+    await event_bus.subscribe("work", failing_handler, "failing_module")
+    await event_bus.publish("work", {"n": 1}, "test")
+    await event_bus.publish("work", {"n": 2}, "test")
+    await event_bus.stop()
+
+    topic = event_bus.get_metrics()["topics"]["work"]
+    assert topic["queue"]["enqueued"] == 2
+    assert topic["queue_latency"]["count"] == 2
+    slow = topic["handlers"]["slow_module:test_metrics_snapshot_and_slow_handlers.<locals>.slow_handler"]
+    assert slow["count"] == 2 and slow["slow"] == 2 and slow["p50_ms"] >= 20
+    failing = topic["handlers"]["failing_module:test_metrics_snapshot_and_slow_handlers.<locals>.failing_handler"]
+    assert failing["errors"] == 2 and failing["slow"] == 0
+    assert any("Slow event handler" in str(call) for call in logger.warning.call_args_list)
@@ -0,0 +1,102 @@
+import pytest
+import asyncio
+import errno
+from unittest.mock import MagicMock
+
+from src.longin_core.event_bus import LONGINEventBus
+
+
+def _config(path, **overrides):
+    return {"event_log": {"enabled": True, "path": str(path), "topics": ["training_state_update.#", "training_metrics_update.#"], **overrides}}
+
+
+@pytest.mark.asyncio
+async def test_logged_messages_are_replayed_after_restart(tmp_path):
+    event_bus = LONGINEventBus(MagicMock(), _config(tmp_path, segment_bytes=256))
+    await event_bus.start()
+    for step in range(20):
+        await event_bus.publish("training_metrics_update.agent_1", {"step": step}, "runner")
+        if step % 5 == 4:
+            await event_bus.event_log.flush()  # Segments roll between group commits
+    await event_bus.publish("training_state_update.agent_2", {"state": "done"}, "runner")
+    await event_bus.publish("chat", {"not": "logged"}, "runner")
+    await event_bus.stop()
+    assert event_bus.event_log.get_stats()["segments"] > 1
+
+    # A torn record left by a crash is dropped on open
+    segment = sorted(tmp_path.glob("*.log"))[-1]
+    with open(segment, "ab") as f:
+        f.write(b"\x00\x01\x02")
+
+    restarted = LONGINEventBus(MagicMock(), _config(tmp_path))
+    await restarted.start()
+    assert restarted.event_log.next_offset == 21
+
+    received = []
+
+    async def handler(message):
+        received.append(message)
+
+    next_offset = await restarted.replay("training_metrics_update.agent_1", handler, from_offset=5)
+    assert received == [{"step": step} for step in range(5, 20)]
+    assert next_offset == 21
+
+    await restarted.publish("training_state_update.agent_2", {"state": "again"}, "runner")
+    received.clear()
+    assert await restarted.replay("training_state_update.*", handler, from_offset=next_offset) == 22
+    assert received == [{"state": "again"}]
+
+    # One replay of a pattern can be routed by topic
+    routed = []
+
+    async def route(topic, message):
+        routed.append(topic)
+
+    await restarted.replay("*.agent_2", route, from_offset=15, with_topic=True)
+    assert routed == ["training_state_update.agent_2"] * 2
+    await restarted.stop()
+
+
+class TornFile:
+    """Segment file whose write stores half of the data and fails."""
+
+    def __init__(self, file):
+        self.file = file
+
+    def write(self, data):
+        self.file.write(data[:len(data) // 2])
+        self.file.flush()
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+
+@pytest.mark.asyncio
+async def test_failed_commit_is_retried_without_losing_records(tmp_path):
+    event_bus = LONGINEventBus(MagicMock(), _config(tmp_path, commit_interval=3600))
+    await event_bus.start()
+    log = event_bus.event_log
+    for step in range(3):
+        await event_bus.publish("training_metrics_update.agent_1", {"step": step}, "runner")
+    await log.flush()
+
+    # Half of the next batch reaches the file, then the disk is full
+    log._segment_file = TornFile(log._segment_file)
+    for step in range(3, 6):
+        await event_bus.publish("training_metrics_update.agent_1", {"step": step}, "runner")
+    with pytest.raises(OSError):
+        await log.flush()
+    assert log.committed_offset == 3
+    await event_bus.publish("training_metrics_update.agent_1", {"step": 6}, "runner")
+    await log.flush()
+    assert log.committed_offset == 7
+
+    received = []
+
+    async def handler(message):
+        received.append(message)
+
+    await event_bus.replay("training_metrics_update.agent_1", handler)
+    assert received == [{"step": step} for step in range(7)]
+    await event_bus.stop()
@@ -0,0 +1,60 @@
+import pytest
+import asyncio
+from unittest.mock import MagicMock
+
+from src.longin_core.event_bus import LONGINEventBus
+from src.longin_core.event_transport import RedisStreamsTransport
+
+
+@pytest.mark.asyncio
+async def test_redis_streams_transport_bridges_two_buses():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    config = {"stream": "test:event_bus", "topics": ["training_metrics_update.#"], "block_ms": 50}
+
+    buses = []
+    for node in ("node_a", "node_b"):
+        transport = RedisStreamsTransport(
+            {**config, "node_id": node},
+            MagicMock(),
+            client=fakeredis.aioredis.FakeRedis(server=server, decode_responses=True),
+        )
+        event_bus = LONGINEventBus(MagicMock(), {})
+        event_bus.set_transport(transport)
+        buses.append(event_bus)
+    bus_a, bus_b = buses
+
+    received_a, received_b = [], []
+    done = asyncio.Event()
+
+    async def on_a(message):
+        received_a.append(message)
+
+    async def on_b(message):
+        received_b.append(message)
+        if len(received_b) == 2:
+            done.set()
+
+    await bus_a.subscribe("training_metrics_update.#", on_a, "test")
+    await bus_b.subscribe("#", on_b, "test")
+    for event_bus in buses:
+        await event_bus.start()
+
+    # bus_a has no local subscriber for "other", and it is not exported either
+    await bus_a.publish("other", {"skip": True}, "test")
+    await bus_a.publish_many(
+        [("training_metrics_update.agent_1", {"step": 1}), ("training_metrics_update.agent_1", {"step": 2})], "test"
+    )
+    await asyncio.wait_for(done.wait(), timeout=2)
+    await asyncio.sleep(0.1)
+
+    # Remote delivery keeps the order, the publishing node sees its messages only once
+    assert received_b == [{"step": 1}, {"step": 2}]
+    assert received_a == [{"step": 1}, {"step": 2}]
+
+    for event_bus in buses:
+        await event_bus.stop()
+
+    # The per-node consumer groups do not outlive their nodes
+    client = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+    assert await client.xinfo_groups("test:event_bus") == []
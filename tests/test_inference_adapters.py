@@ -0,0 +1,86 @@
+import pytest
+import asyncio
+import json
+import threading
+from unittest.mock import MagicMock
+
+import httpx
+
+from src.longin_core.adapters import LlamaCppAdapter, LMStudioAdapter
+from src.longin_core.lmstudio.client import AsyncLMStudioClient, StreamMode
+
+
+class FakeLlama:
+    """Stands in for llama_cpp.Llama: same call signatures, canned output."""
+
+    instances = 0
+
+    def __init__(self, model_path, **options):
+        FakeLlama.instances += 1
+        self.model_path = model_path
+        self.options = options
+        self.calls = []
+        self.tokens_generated = 0
+
+    def create_chat_completion(self, messages, stream=False, **params):
+        self.calls.append((threading.current_thread().name, params))
+        if not stream:
+            return {"choices": [{"index": 0, "message": {"role": "assistant", "content": "hi"}}]}
+        return self._stream()
+
+    def _stream(self):
+        for i in range(1000):
+            self.tokens_generated += 1
+            yield {"id": "c", "created": 0, "model": self.model_path,
+                   "choices": [{"index": 0, "delta": {"content": f"t{i}"}, "finish_reason": None}]}
+
+
+@pytest.mark.asyncio
+async def test_llama_cpp_adapter_runs_in_thread_pool_and_stops_streams():
+    FakeLlama.instances = 0
+    adapter = LlamaCppAdapter("llama", {"n_threads": 3}, MagicMock(), model_factory=FakeLlama)
+    path = "data/models/agent_0/model.gguf"
+
+    responses = await asyncio.gather(*(
+        adapter.chat_completion(path, [{"role": "user", "content": "x"}], {"temperature": 0.1, "agent_id": 0})
+        for _ in range(3)
+    ))
+    assert [r["choices"][0]["message"]["content"] for r in responses] == ["hi"] * 3
+    model, _ = adapter._models[path]
+    assert FakeLlama.instances == 1 and model.options["n_threads"] == 3
+    assert all(name.startswith("llama-llama") for name, _ in model.calls)
+    assert model.calls[0][1] == {"temperature": 0.1}
+
+    stream = adapter.stream_chat_completion(path, [{"role": "user", "content": "x"}], {"mode": StreamMode.CONTENT})
+    tokens = []
+    async for token in stream:
+        tokens.append(token)
+        if len(tokens) == 3:
+            break
+    await stream.aclose()
+    assert tokens == ["t0", "t1", "t2"]
+    # Generation stopped well before the end of the 1000 token stream
+    assert model.tokens_generated < 1000
+    await adapter.close()
+
+
+@pytest.mark.asyncio
+async def test_lmstudio_adapter_maps_model_paths_to_ids():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(json.loads(request.content)["model"])
+        return httpx.Response(200, json={
+            "id": "c", "created": 0, "model": "m",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}],
+        })
+
+    client = AsyncLMStudioClient(transport=httpx.MockTransport(handler))
+    adapter = LMStudioAdapter("lm_studio", {}, MagicMock(), client=client)
+    response = await adapter.chat_completion(
+        "data/models/agent_1/phi-2.Q2_K.gguf", [{"role": "user", "content": "x"}], {"agent_id": 1}
+    )
+    assert response["choices"][0]["message"]["content"] == "ok"
+    assert seen == ["phi-2.Q2_K.gguf"]
+    await adapter.close()
+    await client.close()
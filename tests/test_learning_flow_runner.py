@@ -0,0 +1,58 @@
+import json
+import os
+from unittest.mock import MagicMock
+
+from src.longin_core.learning_flow.runner import FlowDuration, LearningFlowRunner, TrainingMetrics
+
+AGENT = {"id": 5, "name": "resumer", "model_path": "models/base", "dataset_path": "data/5.jsonl"}
+
+
+def _checkpoint(runner, step, max_steps, mtime):
+    checkpoint = runner.output_dir / f"checkpoint-{step}"
+    checkpoint.mkdir()
+    state_path = checkpoint / "trainer_state.json"
+    state_path.write_text(json.dumps({"global_step": step, "max_steps": max_steps}))
+    os.utime(state_path, (mtime, mtime))
+    return checkpoint
+
+
+def test_runs_resume_from_the_latest_matching_checkpoint(tmp_path):
+    first = LearningFlowRunner(AGENT, FlowDuration.ONE_HOUR, MagicMock(), base_output_dir=str(tmp_path))
+    assert first.resume_from_checkpoint is None and first.training_config.max_steps == 60
+    _checkpoint(first, 20, 60, mtime=1000)
+    interrupted = _checkpoint(first, 40, 60, mtime=2000)
+
+    # A checkpoint of another base model is never picked up
+    other = LearningFlowRunner({**AGENT, "model_path": "models/other"}, "1h", MagicMock(), base_output_dir=str(tmp_path))
+    _checkpoint(other, 50, 60, mtime=3000)
+
+    # Interrupted at step 40 of 60: the remaining budget carries over
+    second = LearningFlowRunner(AGENT, "1h", MagicMock(), base_output_dir=str(tmp_path))
+    assert second.run_id != first.run_id
+    assert second.resume_from_checkpoint == interrupted and second.start_step == 40
+    assert second.training_config.max_steps == 60
+    command = second._build_training_command()
+    assert command[command.index("--resume_from_checkpoint") + 1] == str(interrupted)
+
+    # After a finished plan the next flow adds its own budget on top
+    finished = _checkpoint(second, 60, 60, mtime=4000)
+    third = LearningFlowRunner(AGENT, "2h", MagicMock(), base_output_dir=str(tmp_path))
+    assert third.resume_from_checkpoint == finished
+    assert third.training_config.max_steps == 60 + 120
+
+
+def test_step_budget_is_calibrated_from_measured_throughput(tmp_path):
+    first = LearningFlowRunner(AGENT, "1h", MagicMock(), base_output_dir=str(tmp_path))
+    assert first.training_config.max_steps == 60  # uncalibrated heuristic
+    first.start_time = 1000.0
+    # 50 s to the first step at step 10, then 5 s per step
+    for step in (10, 20, 60):
+        metrics = TrainingMetrics(step=step, loss=1.0, learning_rate=2e-4, epoch=0.1, timestamp=1000.0 + 100 + (step - 10) * 5)
+        first.metrics.append(metrics.dict())
+    first._update_throughput()
+
+    second = LearningFlowRunner(AGENT, "1h", MagicMock(), base_output_dir=str(tmp_path))
+    config = second.training_config
+    assert config.max_steps == int((3600 - 50 - 120) * 0.95 / 5)
+    assert config.save_steps == config.eval_steps == -(-config.max_steps // 10)
+    assert second._get_training_results()["step_budget_calibrated"] is True
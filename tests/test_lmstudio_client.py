@@ -0,0 +1,228 @@
+import pytest
+import asyncio
+import json
+
+import httpx
+
+from src.longin_core.lmstudio.cache import CompletionCache
+from src.longin_core.lmstudio.client import (
+    AsyncLMStudioClient, ChatMessage, ChatRole, LMStudioAPIError, RequestPriority, SSEDecoder, StreamMode,
+)
+
+
+def _completion(content: str) -> dict:
+    return {
+        "id": "cmpl-1",
+        "created": 0,
+        "model": "test-model",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+    }
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limiter_caps_requests_in_flight():
+    in_flight = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.02)
+        in_flight -= 1
+        return httpx.Response(200, json=_completion(json.loads(request.content)["messages"][0]["content"]))
+
+    client = AsyncLMStudioClient(max_concurrency=2, transport=httpx.MockTransport(handler))
+    messages = [[ChatMessage(role=ChatRole.USER, content=f"agent {i}")] for i in range(5)]
+    responses = await asyncio.gather(*(client.create_chat_completion("test-model", m) for m in messages))
+    await client.close()
+
+    assert peak == 2
+    assert [r.choices[0].message.content for r in responses] == [f"agent {i}" for i in range(5)]
+    stats = client.get_stats()
+    assert (stats["in_flight"], stats["waiting"], stats["max_concurrency"]) == (0, 0, 2)
+
+
+@pytest.mark.asyncio
+async def test_streaming_uses_client_stream_and_reports_errors():
+    chunks = [
+        {"id": "c", "created": 0, "model": "m", "choices": [{"index": 0, "delta": {"content": text}}]}
+        for text in ("Hel", "lo")
+    ]
+    body = "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in chunks) + "data: [DONE]\n\n"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if json.loads(request.content)["model"] == "missing":
+            return httpx.Response(404, json={"error": {"message": "model not found"}})
+        return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+    client = AsyncLMStudioClient(transport=httpx.MockTransport(handler))
+    messages = [ChatMessage(role=ChatRole.USER, content="hi")]
+    streamed = [c.choices[0].delta.content async for c in client.stream_chat_completion("m", messages)]
+    assert streamed == ["Hel", "lo"]
+
+    with pytest.raises(LMStudioAPIError) as excinfo:
+        async for _ in client.stream_chat_completion("missing", messages):
+            pass
+    assert excinfo.value.status_code == 404
+    assert client.get_stats()["in_flight"] == 0
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_stream_modes_and_decoder_handle_split_lines():
+    chunks = [
+        {"id": "c", "created": 0, "model": "m", "choices": [{"index": 0, "delta": {"content": text}}]}
+        for text in ("Hel", "", "lo")
+    ]
+    body = ": keep-alive\n\n" + "".join(f"data: {json.dumps(chunk)}\r\n\r\n" for chunk in chunks)
+    body = (body + "data: [DONE]\n\n").encode()
+
+    decoder = SSEDecoder()
+    decoded = [chunk for i in range(0, len(body), 7) for chunk in decoder.feed(body[i:i + 7])]
+    assert decoded == chunks and decoder.done
+
+    async def stream_body():
+        for i in range(0, len(body), 11):
+            yield body[i:i + 11]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=stream_body(), headers={"content-type": "text/event-stream"})
+
+    client = AsyncLMStudioClient(transport=httpx.MockTransport(handler))
+    messages = [ChatMessage(role=ChatRole.USER, content="hi")]
+    assert [c async for c in client.stream_chat_completion("m", messages, mode=StreamMode.CONTENT)] == ["Hel", "lo"]
+    assert [c async for c in client.stream_chat_completion("m", messages, mode="dict")] == chunks
+    models = [c async for c in client.stream_chat_completion("m", messages)]
+    assert [c.choices[0].delta.content for c in models] == ["Hel", "", "lo"]
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_deterministic_completions_are_cached():
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(200, json=_completion(f"answer {calls}"))
+
+    cache = CompletionCache(max_entries=2)
+    client = AsyncLMStudioClient(transport=httpx.MockTransport(handler), cache=cache)
+    messages = [ChatMessage(role=ChatRole.USER, content="same prompt")]
+
+    first = await client.create_chat_completion("m", messages, temperature=0)
+    second = await client.create_chat_completion("m", messages, temperature=0)
+    assert first.choices[0].message.content == second.choices[0].message.content == "answer 1"
+
+    # Sampling without a seed is not reproducible and bypasses the cache
+    await client.create_chat_completion("m", messages, temperature=0.7)
+    await client.create_chat_completion("m", messages, temperature=0.7)
+    assert calls == 3
+    seeded = [await client.create_chat_completion("m", messages, temperature=0.7, seed=7) for _ in range(2)]
+    assert seeded[0].choices[0].message.content == seeded[1].choices[0].message.content
+    assert calls == 4
+
+    # Least recently used entry is evicted once max_entries is exceeded
+    await client.create_chat_completion("m", [ChatMessage(role=ChatRole.USER, content="other")], temperature=0)
+    await client.create_chat_completion("m", messages, temperature=0)
+    assert calls == 6
+
+    stats = client.get_stats()["cache"]
+    assert stats["hits"] == 2 and stats["bypassed"] == 2 and stats["evictions"] == 2
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_completions_are_coalesced():
+    calls = 0
+    release = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return httpx.Response(200, json=_completion("shared"))
+
+    client = AsyncLMStudioClient(transport=httpx.MockTransport(handler))
+    messages = [ChatMessage(role=ChatRole.USER, content="same question")]
+    callers = [asyncio.create_task(client.create_chat_completion("m", messages)) for _ in range(5)]
+    other = asyncio.create_task(client.create_chat_completion("m", messages, max_tokens=8))
+    await asyncio.sleep(0.05)
+    # A cancelled caller does not take the shared request down with it
+    callers[0].cancel()
+    release.set()
+
+    results = await asyncio.gather(*callers[1:], other)
+    assert calls == 2
+    assert all(result.choices[0].message.content == "shared" for result in results)
+    assert client.get_stats()["coalesced"] == 4
+    assert client.get_stats()["coalescing"] == 0
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_scheduler_prefers_interactive_work_and_rotates_agents():
+    order = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        content = json.loads(request.content)["messages"][0]["content"]
+        order.append(content)
+        await asyncio.sleep(0.005)
+        return httpx.Response(200, json=_completion(content))
+
+    client = AsyncLMStudioClient(
+        max_concurrency=1, batch_window=0.02, transport=httpx.MockTransport(handler)
+    )
+    client.scheduler.background_share = 0
+
+    def ask(agent_id, n, priority):
+        content = f"{agent_id}-{n}"
+        return client.create_chat_completion(
+            "m", [ChatMessage(role=ChatRole.USER, content=content)], agent_id=agent_id, priority=priority
+        )
+
+    calls = [ask("bg", n, RequestPriority.BACKGROUND) for n in range(2)]
+    calls += [ask("a", n, RequestPriority.INTERACTIVE) for n in range(3)]
+    calls += [ask("b", n, RequestPriority.INTERACTIVE) for n in range(2)]
+    await asyncio.gather(*calls)
+    await client.close()
+
+    assert order == ["a-0", "b-0", "a-1", "b-1", "a-2", "bg-0", "bg-1"]
+    assert client.get_stats()["scheduler"]["dispatched"] == 7
+
+
+@pytest.mark.asyncio
+async def test_scheduler_batches_sampled_requests_into_one_n_call():
+    requested_n = []
+    honor_n = True
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        n = json.loads(request.content)["n"]
+        requested_n.append(n)
+        body = _completion("x")
+        body["choices"] = [
+            {"index": i, "message": {"role": "assistant", "content": f"sample {i}"}, "finish_reason": "stop"}
+            for i in range(n if honor_n else 1)
+        ]
+        return httpx.Response(200, json=body)
+
+    client = AsyncLMStudioClient(batch_window=0.02, batch_n=True, transport=httpx.MockTransport(handler))
+    messages = [ChatMessage(role=ChatRole.USER, content="brainstorm")]
+    responses = await asyncio.gather(
+        *(client.create_chat_completion("m", messages, temperature=0.9, agent_id=i) for i in range(3))
+    )
+    assert requested_n == [3]
+    assert sorted(r.choices[0].message.content for r in responses) == ["sample 0", "sample 1", "sample 2"]
+    assert all(r.choices[0].index == 0 for r in responses)
+
+    # A backend that ignores `n` turns batching off, the remaining callers are served one by one
+    honor_n = False
+    requested_n.clear()
+    responses = await asyncio.gather(
+        *(client.create_chat_completion("m", messages, temperature=0.9, agent_id=i) for i in range(3))
+    )
+    assert requested_n == [3, 1, 1]
+    assert len(responses) == 3
+    assert client.get_stats()["scheduler"]["batch_n"] is False
+    await client.close()
@@ -0,0 +1,115 @@
+import pytest
+import asyncio
+import json
+import time
+
+from src.longin_core.lmstudio.client import (
+    AsyncLMStudioClient, LMStudioAPIError, LMStudioCircuitOpenError,
+)
+
+MODELS = {"data": [{"id": "stub-model"}]}
+
+
+class StubServer:
+    """Minimal HTTP/1.1 server on localhost; ``responder(hit, path)`` returns ``(status, json)``."""
+
+    def __init__(self, responder):
+        self.responder = responder
+        self.hits = 0
+
+    async def __aenter__(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.url = f"http://127.0.0.1:{self.server.sockets[0].getsockname()[1]}"
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        try:
+            head = (await reader.readuntil(b"\r\n\r\n")).decode().split("\r\n")
+            path = head[0].split(" ")[1]
+            length = next((int(line.split(":")[1]) for line in head if line.lower().startswith("content-length:")), 0)
+            await reader.readexactly(length)
+            self.hits += 1
+            status, payload = await self.responder(self.hits, path)
+            body = json.dumps(payload).encode()
+            writer.write(
+                f"HTTP/1.1 {status} Stub\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+
+@pytest.mark.asyncio
+async def test_idempotent_calls_are_retried_and_others_are_not():
+    async def responder(hit, path):
+        if path == "/v1/models" and hit > 2:
+            return 200, MODELS
+        return 503, {"error": {"message": "loading"}}
+
+    async with StubServer(responder) as server:
+        client = AsyncLMStudioClient(base_url=server.url, backoff_base=0.01)
+        models = await client.get_models()
+        assert models.data[0].id == "stub-model"
+        assert server.hits == 3 and client.get_stats()["retries"] == 2
+
+        with pytest.raises(LMStudioAPIError):
+            await client.unload_model("stub-model")
+        assert server.hits == 4
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_fails_fast_and_recovers():
+    healthy = False
+
+    async def responder(hit, path):
+        return (200, MODELS) if healthy else (503, {"error": {"message": "down"}})
+
+    async with StubServer(responder) as server:
+        client = AsyncLMStudioClient(
+            base_url=server.url, max_retries=0, breaker_failure_threshold=2, breaker_reset_timeout=0.2
+        )
+        for _ in range(2):
+            with pytest.raises(LMStudioAPIError):
+                await client.get_models()
+
+        start = time.perf_counter()
+        with pytest.raises(LMStudioCircuitOpenError):
+            await client.get_models()
+        assert time.perf_counter() - start < 0.05
+        assert server.hits == 2
+        assert client.get_stats()["circuit"]["state"] == "open"
+
+        # After the reset timeout a trial call goes through and closes the circuit
+        healthy = True
+        await asyncio.sleep(0.25)
+        await client.get_models()
+        assert client.get_stats()["circuit"]["state"] == "closed"
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_slow_calls_are_hedged_after_the_p95_latency():
+    async def responder(hit, path):
+        if hit == 21:
+            await asyncio.sleep(2)
+        return 200, MODELS
+
+    async with StubServer(responder) as server:
+        client = AsyncLMStudioClient(base_url=server.url, hedge=True, hedge_min_samples=20)
+        for _ in range(20):
+            await client.get_models()
+
+        start = time.perf_counter()
+        await client.get_models()
+        assert time.perf_counter() - start < 1.0
+        stats = client.get_stats()
+        assert stats["hedged"] == 1 and stats["hedge_wins"] == 1
+        await client.close()
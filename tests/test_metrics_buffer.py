@@ -0,0 +1,40 @@
+import math
+
+import numpy as np
+
+from src.longin_core.learning_flow.metrics_buffer import MetricsBuffer, load_metrics, lttb_indices
+
+
+def _record(step, eval_loss=None):
+    loss = 10.0 if step == 500 else 2.0 / math.sqrt(step)  # one spike
+    return {"timestamp": 1000.0 + step, "step": step, "loss": loss, "learning_rate": 2e-4,
+            "epoch": step / 1000, "eval_loss": eval_loss}
+
+
+def test_lttb_keeps_the_ends_and_spikes():
+    x = np.arange(1000)
+    y = np.ones(1000)
+    y[437] = 5.0
+    selected = lttb_indices(x, y, 20)
+    assert len(selected) == 20 and selected[0] == 0 and selected[-1] == 999
+    assert 437 in selected and np.all(np.diff(selected) > 0)
+
+
+def test_memory_is_bounded_and_the_file_keeps_full_resolution(tmp_path):
+    buffer = MetricsBuffer(tmp_path / "metrics.bin", capacity=64)
+    for step in range(1, 1001):
+        buffer.append(_record(step, eval_loss=1.0 if step % 250 == 0 else None))
+
+    assert len(buffer) <= 64 and buffer.total_points == 1000 and buffer.compactions > 0
+    steps = buffer.column("step")
+    assert steps[0] == 1 and steps[-1] == 1000 and 500 in steps
+    # Evaluation points survive every compaction
+    assert buffer.query(16)["eval"]["step"] == [250, 500, 750, 1000]
+
+    # Asking for more detail than memory holds reads the file
+    assert buffer.needs_file(200) and not buffer.needs_file(16)
+    history = buffer.query(200)
+    assert history["points"] == 1000 and history["resolution"] == 200
+    buffer.close()
+    full = load_metrics(tmp_path / "metrics.bin")
+    assert full["step"] == list(range(1, 1001))
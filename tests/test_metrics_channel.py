@@ -0,0 +1,62 @@
+import pytest
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from src.longin_core.learning_flow.metrics_channel import MetricsAggregator, MetricsChannelClient, encode_frame
+from src.longin_core.learning_flow.runner import LearningFlowRunner
+
+AGENT = {"id": 7, "name": "metrics", "model_path": "models/base", "dataset_path": "data/7.jsonl"}
+
+
+def test_aggregator_merges_training_logs_and_sends_eval_at_once():
+    now = [0.0]
+    aggregator = MetricsAggregator(min_interval=1.0, clock=lambda: now[0])
+
+    first = aggregator.add({"step": 1, "loss": 2.0, "learning_rate": 1e-4})
+    assert first["loss"] == 2.0 and first["aggregated_logs"] == 1
+
+    # Within the interval training logs are merged: mean loss, latest other values
+    now[0] = 0.5
+    assert aggregator.add({"step": 2, "loss": 1.0, "learning_rate": 2e-4}) is None
+    now[0] = 1.2
+    merged = aggregator.add({"step": 3, "loss": 0.6, "learning_rate": 3e-4})
+    assert merged == {"step": 3, "learning_rate": 3e-4, "loss": pytest.approx(0.8), "aggregated_logs": 2}
+
+    # Evaluation logs are not held back and carry the latest training loss
+    now[0] = 1.3
+    evaluation = aggregator.add({"step": 3, "eval_loss": 0.9})
+    assert evaluation == {"step": 3, "eval_loss": 0.9, "loss": pytest.approx(0.8)}
+    assert aggregator.flush() is None
+    assert (aggregator.received, aggregator.sent) == (4, 3)
+
+
+@pytest.mark.asyncio
+async def test_runner_reads_frames_of_authenticated_connections(tmp_path):
+    runner = LearningFlowRunner(AGENT, "1h", MagicMock(publish=AsyncMock()), base_output_dir=str(tmp_path))
+    address = await runner._start_metrics_channel()
+
+    # A connection without the run's token is dropped before any frame is read
+    reader, writer = await asyncio.open_connection(*address.rsplit(":", 1))
+    writer.write(encode_frame({"token": "guess"}) + encode_frame({"step": 1, "loss": 9.0}))
+    await writer.drain()
+    assert await reader.read() == b""
+    writer.close()
+
+    def train():
+        client = MetricsChannelClient(address, token=runner._metrics_token)
+        client.send({"step": 10, "loss": 1.5, "learning_rate": 2e-4, "epoch": 0.1})
+        client.send({"step": 20, "eval_loss": 1.2, "epoch": 0.2})
+        client.close()
+
+    await asyncio.get_running_loop().run_in_executor(None, train)
+    for _ in range(100):
+        if runner.metrics_frames == 2:
+            break
+        await asyncio.sleep(0.01)
+    await runner._close_metrics_channel()
+
+    history = await runner.get_metrics()
+    assert (history["step"], history["loss"]) == ([10, 20], [1.5, 1.5])
+    assert history["eval"]["eval_loss"] == [pytest.approx(1.2)]
+    assert runner.metrics_frames == 2
+    assert runner.event_bus.publish.await_count == 2
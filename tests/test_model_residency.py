@@ -0,0 +1,94 @@
+import pytest
+import asyncio
+import json
+
+import httpx
+
+from src.longin_core.lmstudio.client import AsyncLMStudioClient, LMStudioClientError
+from src.longin_core.lmstudio.residency import ModelResidencyManager
+
+
+def _fake_lmstudio(loaded: list, calls: list):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path == "/v1/models":
+            return httpx.Response(200, json={"data": [{"id": model_id} for model_id in loaded]})
+        body = json.loads(request.content)
+        if path == "/v1/models/load":
+            calls.append(("load", body["path"].rsplit("/", 1)[-1]))
+            await asyncio.sleep(0.02)
+            loaded.append(body["path"].rsplit("/", 1)[-1])
+        elif path == "/v1/models/unload":
+            calls.append(("unload", body["model"]))
+            loaded.remove(body["model"])
+        return httpx.Response(200, json={"status": "ok"})
+
+    return httpx.MockTransport(handler)
+
+
+@pytest.mark.asyncio
+async def test_models_load_once_and_lru_is_evicted_within_budget(tmp_path):
+    paths = {}
+    for name in ("a.gguf", "b.gguf", "c.gguf"):
+        paths[name] = tmp_path / name
+        with open(paths[name], "wb") as f:
+            f.truncate(100)
+    loaded, calls = ["external.gguf"], []
+    client = AsyncLMStudioClient(transport=_fake_lmstudio(loaded, calls))
+    manager = ModelResidencyManager(client, memory_budget_bytes=250, size_overhead=1.0)
+
+    assert await manager.refresh() == ["external.gguf"]
+    # Concurrent requests for a cold model wait for the same load
+    await asyncio.gather(*(manager.ensure_loaded(str(paths["a.gguf"])) for _ in range(3)))
+    assert calls == [("load", "a.gguf")]
+    assert manager.get_stats()["load_waits"] == 2
+
+    await manager.ensure_loaded(str(paths["b.gguf"]))
+    await manager.ensure_loaded(str(paths["a.gguf"]))
+    # c does not fit: the untracked external model goes first, then b (least recently used)
+    async with manager.use(str(paths["c.gguf"])) as model_id:
+        assert model_id == "c.gguf"
+    assert calls[2:] == [("load", "c.gguf"), ("unload", "external.gguf"), ("unload", "b.gguf")]
+    assert manager.get_stats()["resident"] == ["a.gguf", "c.gguf"]
+
+    # Pinned models are kept even over budget
+    async with manager.use(str(paths["a.gguf"])):
+        async with manager.use(str(paths["c.gguf"])):
+            await manager.ensure_loaded(str(paths["b.gguf"]))
+    assert sorted(loaded) == ["a.gguf", "b.gguf", "c.gguf"]
+    assert manager.get_stats()["evictions"] == 2
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_load_lets_the_request_through_and_evicts_nothing(tmp_path):
+    paths = {}
+    for name in ("a.gguf", "b.gguf"):
+        paths[name] = tmp_path / name
+        with open(paths[name], "wb") as f:
+            f.truncate(100)
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        # Stock LM Studio: no load endpoint
+        calls.append(request.url.path)
+        if request.url.path == "/v1/models/load":
+            return httpx.Response(404, json={"error": "Unexpected endpoint"})
+        return httpx.Response(200, json={"status": "ok"})
+
+    client = AsyncLMStudioClient(transport=httpx.MockTransport(handler), max_retries=0)
+    manager = ModelResidencyManager(client, memory_budget_bytes=150, size_overhead=1.0)
+    manager._resident["a.gguf"] = 100
+
+    async with manager.use(str(paths["b.gguf"])) as model_id:
+        assert model_id == "b.gguf"
+    # The failure is not retried on every request
+    async with manager.use(str(paths["b.gguf"])):
+        pass
+    assert calls == ["/v1/models/load"]
+    stats = manager.get_stats()
+    assert stats["resident"] == ["a.gguf"] and stats["evictions"] == 0
+    assert (stats["load_failures"], stats["skipped_loads"]) == (1, 1)
+    with pytest.raises(LMStudioClientError):
+        await manager.ensure_loaded(str(paths["b.gguf"]))
+    await client.close()
@@ -0,0 +1,85 @@
+from src.longin_core.agents.prompt_builder import REPLY_PRIMING_TOKENS, PromptBuilder
+
+
+def _turn(i):
+    return [
+        {"role": "user", "content": f"question {i} " + "lorem ipsum " * 20},
+        {"role": "assistant", "content": f"answer {i} " + "dolor sit amet " * 20},
+    ]
+
+
+def test_history_is_trimmed_to_budget_behind_a_stable_prefix():
+    system = {"role": "system", "content": "You are a helpful agent."}
+    builder = PromptBuilder(system_prompt="Answer in Czech.", safety_margin=0.0, trim_target=0.5)
+    counter = builder.counter
+    turn_cost = sum(counter.count_message(m) for m in _turn(0))
+    prefix = REPLY_PRIMING_TOKENS + counter.count_message(system) + counter.count_message(
+        {"role": "system", "content": "Answer in Czech."}
+    )
+    # Room for ten turns of history plus a reply of 100 tokens
+    builder.context_window = prefix + 10 * turn_cost + 100
+    builder.max_completion_tokens = 100
+
+    history = []
+    for i in range(10):
+        history += _turn(i)
+    prompt = builder.build([system] + history)
+    assert prompt[0]["content"] == "Answer in Czech." and prompt[1] == system
+    assert prompt[2:] == history and builder.dropped_messages == 0
+
+    # Over budget: cut down to half the budget, newest messages kept
+    history += _turn(10)
+    prompt = builder.build([system] + history)
+    assert prompt[:2] == [{"role": "system", "content": "Answer in Czech."}, system]
+    assert prompt[-1] == history[-1]
+    assert builder.last_prompt_tokens <= builder.context_window - 100
+    first_kept = prompt[2]
+    assert len(prompt) - 2 <= 10
+
+    # Following turns extend the same prefix (prompt cache friendly) until it overflows again
+    misses = counter.misses
+    history += _turn(11)
+    next_prompt = builder.build([system] + history)
+    assert next_prompt[: len(prompt)] == prompt
+    assert counter.misses - misses == 2  # only the new messages were tokenized
+    for i in range(12, 20):
+        history += _turn(i)
+        prompt = builder.build([system] + history)
+        assert builder.last_prompt_tokens <= builder.context_window - 100
+    assert prompt[2] != first_kept
+
+
+def test_oversized_last_message_is_truncated_from_its_start():
+    builder = PromptBuilder(context_window=200, max_completion_tokens=50, safety_margin=0.0)
+    message = {"role": "user", "content": "start " + "filler " * 400 + "the actual question?"}
+    prompt = builder.build([{"role": "user", "content": "earlier"}, message])
+    assert len(prompt) == 1
+    assert prompt[0]["content"].endswith("the actual question?")
+    assert builder.last_prompt_tokens <= 150
+    assert builder.get_stats()["truncated_messages"] == 1
+
+
+def test_conversations_keep_their_own_cut_and_max_tokens_is_clamped():
+    builder = PromptBuilder(safety_margin=0.0, trim_target=0.5)
+    turn_cost = sum(builder.counter.count_message(m) for m in _turn(0))
+    builder.context_window = REPLY_PRIMING_TOKENS + 10 * turn_cost + 100
+    builder.max_completion_tokens = 100
+
+    long_chat = [m for i in range(11) for m in _turn(i)]
+    builder.build(long_chat)
+    anchored = builder.build(long_chat)[0]
+    assert builder.dropped_messages > 0
+
+    # Another conversation that fits is sent whole, even if it contains the anchored message
+    dropped = builder.dropped_messages
+    short_chat = _turn(20) + [anchored, {"role": "user", "content": "and?"}]
+    assert builder.build(short_chat) == short_chat
+    assert builder.build(short_chat, conversation="chat-2") == short_chat
+    assert builder.dropped_messages == dropped
+
+    # A reply as large as the window is clamped so the last message is still sent
+    prompt = builder.build([{"role": "user", "content": "hello there"}], max_tokens=builder.context_window)
+    assert prompt[-1]["content"] == "hello there"
+    assert builder.last_completion_tokens < builder.context_window
+    assert builder.last_prompt_tokens + builder.last_completion_tokens <= builder.context_window
+    assert builder.get_stats()["clamped_completions"] == 1
@@ -0,0 +1,71 @@
+import pytest
+import asyncio
+import json
+
+from src.longin_core.agents.state_persister import StatePersister, atomic_write
+from src.longin_core.agents.mini_agent import MiniAgent
+from src.longin_core.base import LonginAdapter
+
+
+class EchoBackend(LonginAdapter):
+    def __init__(self):
+        super().__init__("echo", "echo", {}, None)
+
+    async def connect(self):
+        return True
+
+    async def list_models(self):
+        return []
+
+    async def generate_completion(self, model_id, prompt, params):
+        return {"text": prompt}
+
+    async def get_status(self):
+        return {}
+
+
+@pytest.mark.asyncio
+async def test_chat_state_is_written_behind_in_batches(tmp_path):
+    base_dir = MiniAgent._base_dir
+    MiniAgent._base_dir = str(tmp_path)
+    try:
+        agent = MiniAgent(id=7, name="writer", model_path="m.gguf", dataset_path="d.jsonl")
+        agent.state_persister.flush_interval = 0.05
+        agent.backend = EchoBackend()
+
+        for _ in range(50):
+            await agent.chat([{"role": "user", "content": "hi"}])
+        assert agent.state_persister.writes == 0 and not agent.state_path.exists()
+
+        await asyncio.sleep(0.15)
+        assert agent.state_persister.writes == 1
+        assert json.loads(agent.state_path.read_text())["statistics"]["chat_completions"] == 50
+
+        await agent.chat([{"role": "user", "content": "hi"}])
+        await agent.close_state()
+        assert agent.state_persister.writes == 2 and not agent.state_persister.dirty
+        restored = MiniAgent.load_state(7, base_dir=str(tmp_path))
+        assert restored.statistics["chat_completions"] == 51
+        # Only the state file is left, no temporary files
+        assert [p.name for p in agent.agent_dir.iterdir()] == ["agent_state.json"]
+    finally:
+        MiniAgent._base_dir = base_dir
+
+
+@pytest.mark.asyncio
+async def test_failed_write_keeps_state_dirty_and_old_file_intact(tmp_path):
+    path = tmp_path / "state.json"
+    atomic_write(path, b'{"version": 1}')
+    state = {"version": 2}
+    persister = StatePersister(path, lambda: state, flush_interval=60)
+
+    persister.mark_dirty()
+    state["bad"] = object()  # not serializable
+    with pytest.raises(TypeError):
+        await persister.flush()
+    assert persister.dirty and json.loads(path.read_text()) == {"version": 1}
+
+    del state["bad"]
+    assert await persister.flush()
+    await persister.close()
+    assert json.loads(path.read_text()) == {"version": 2}
@@ -0,0 +1,68 @@
+import pytest
+import json
+
+from src.longin_core.agents.mini_agent import MiniAgent
+from src.longin_core.agents.training_history import TrainingHistory
+
+
+def _run(i, loss):
+    return {
+        "run_id": f"run_{i}",
+        "start_time": f"2026-01-{i + 1:02d}T00:00:00",
+        "elapsed_seconds": 3600,
+        "state": "completed",
+        "final_metrics": {"loss": loss} if loss is not None else None,
+    }
+
+
+def test_history_pages_by_cursor_and_ignores_duplicates(tmp_path):
+    history = TrainingHistory(tmp_path / "runs.sqlite3")
+    assert history.extend([_run(i, 1.0 / (i + 1)) for i in range(5)]) == [1, 2, 3, 4, 5]
+    assert history.append(_run(2, 0.1)) is None
+
+    first = history.page(limit=2)
+    assert [run["run_id"] for run in first["runs"]] == ["run_4", "run_3"]
+    second = history.page(limit=2, before=first["next_before"])
+    last = history.page(limit=2, before=second["next_before"])
+    assert [run["run_id"] for run in second["runs"] + last["runs"]] == ["run_2", "run_1", "run_0"]
+    assert last["next_before"] is None
+    assert history.aggregates() == {"training_run_count": 5, "best_loss": 0.2, "total_training_time": 18000}
+    history.close()
+
+
+@pytest.mark.asyncio
+async def test_legacy_training_runs_move_out_of_the_state_file(tmp_path):
+    agent_dir = tmp_path / "3"
+    agent_dir.mkdir()
+    runs = [_run(i, loss) for i, loss in enumerate([0.9, None, 0.4])]
+    state = {
+        "id": 3, "name": "legacy", "model_path": "m.gguf", "dataset_path": "d.jsonl", "memory": {},
+        "statistics": {"training_runs": runs, "chat_completions": 2, "total_training_time": 10800,
+                       "last_training_run": runs[-1], "best_loss": 0.4},
+    }
+    (agent_dir / "agent_state.json").write_text(json.dumps(state))
+
+    base_dir = MiniAgent._base_dir
+    try:
+        agent = MiniAgent.load_state(3, base_dir=str(tmp_path))
+        saved = json.loads((agent_dir / "agent_state.json").read_text())
+        assert "training_runs" not in saved["statistics"]
+        assert saved["statistics"]["training_run_count"] == 3 and saved["statistics"]["best_loss"] == 0.4
+
+        new_run = _run(3, 0.3)
+        agent.training_history.append(new_run)
+        agent._record_training_run(new_run)
+        assert agent.statistics["training_run_count"] == 4 and agent.statistics["best_loss"] == 0.3
+        assert agent.statistics["total_training_time"] == 4 * 3600
+
+        # Results delivered twice are recorded once
+        results = {"run_id": "run_3", "state": "completed", "elapsed_seconds": 3600,
+                   "final_metrics": {"loss": 0.1}}
+        await agent.record_training_results(results, "1h")
+        assert agent.statistics["training_run_count"] == 4 and agent.statistics["best_loss"] == 0.3
+
+        page = await agent.get_training_runs(limit=3)
+        assert [run["run_id"] for run in page["runs"]] == ["run_3", "run_2", "run_1"]
+        await agent.close_state()
+    finally:
+        MiniAgent._base_dir = base_dir
@@ -0,0 +1,136 @@
+import pytest
+import asyncio
+import json
+from types import SimpleNamespace
+
+from src.longin_core.learning_flow.scheduler import JobState, TrainingScheduler
+
+
+class FakeRunner:
+    """Stands in for LearningFlowRunner: runs until finished or cancelled."""
+
+    def __init__(self, run_id):
+        self.run_id = run_id
+        self.process = object()
+        self.cancel_requested = False
+        self.training_config = SimpleNamespace(max_steps=60)
+        self.done = asyncio.Event()
+
+    async def run(self):
+        await self.done.wait()
+        state = "canceled" if self.cancel_requested else "completed"
+        return {"status": "success", "state": state, "run_id": self.run_id}
+
+    async def cancel(self):
+        self.cancel_requested = True
+        self.done.set()
+        return True
+
+
+class FakeAgent:
+    def __init__(self, agent_id):
+        self.id = agent_id
+        self.runners = []
+        self.recorded = []
+
+    def create_training_runner(self, duration):
+        self.runners.append(FakeRunner(f"agent_{self.id}_run_{len(self.runners)}"))
+        return self.runners[-1]
+
+    async def record_training_results(self, results, duration):
+        self.recorded.append(results["state"])
+
+
+async def _wait_for(predicate, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await asyncio.sleep(0.005)
+
+
+@pytest.mark.asyncio
+async def test_priority_preemption_and_requeue(tmp_path):
+    agents = {0: FakeAgent(0), 1: FakeAgent(1)}
+    scheduler = TrainingScheduler(
+        agents.get, queue_path=tmp_path / "jobs.json", max_cpu_percent=None,
+        min_available_memory_gb=None, poll_interval=0.01,
+    )
+    await scheduler.start()
+    low = await scheduler.submit(0, "1h")
+    await _wait_for(lambda: low.state is JobState.RUNNING)
+    waiting = await scheduler.submit(0, "2h")
+    urgent = await scheduler.submit(1, "1h", priority=5)
+
+    # The low-priority run is interrupted through its cancel (SIGINT) path and re-queued
+    await _wait_for(lambda: urgent.state is JobState.RUNNING)
+    assert low.state is JobState.QUEUED and low.preemptions == 1
+    assert agents[0].recorded == ["canceled"]
+    assert [job.job_id for job in scheduler.list_jobs()][:2] == [low.job_id, waiting.job_id]
+
+    agents[1].runners[-1].done.set()
+    await _wait_for(lambda: low.state is JobState.RUNNING)
+    assert urgent.state is JobState.COMPLETED and low.attempts == 2
+
+    assert await scheduler.cancel(waiting.job_id)
+    assert waiting.state is JobState.CANCELED
+    persisted = {job["job_id"]: job for job in json.loads((tmp_path / "jobs.json").read_text())["jobs"]}
+    assert persisted[urgent.job_id]["state"] == "completed"
+    assert persisted[low.job_id]["state"] == "running"
+
+    # Shutdown interrupts the running job and keeps it queued for the next start
+    await scheduler.stop()
+    restarted = TrainingScheduler(
+        agents.get, queue_path=tmp_path / "jobs.json", max_cpu_percent=None,
+        min_available_memory_gb=None, poll_interval=0.01,
+    )
+    await restarted.start()
+    updates = restarted.watch(low.job_id)
+    states = []
+    async for snapshot in updates:
+        states.append(snapshot["state"])
+        if snapshot["state"] == "running":
+            agents[0].runners[-1].done.set()
+    assert states[0] == "queued" and states[-1] == "completed"
+    assert restarted.get_job(low.job_id).attempts == 3
+    await restarted.stop()
+
+
+@pytest.mark.asyncio
+async def test_jobs_wait_without_resource_headroom(tmp_path):
+    agents = {0: FakeAgent(0)}
+    scheduler = TrainingScheduler(
+        agents.get, queue_path=tmp_path / "jobs.json", min_available_memory_gb=10 ** 6, poll_interval=0.01,
+    )
+    await scheduler.start()
+    job = await scheduler.submit(0, "1h")
+    await asyncio.sleep(0.05)
+    assert job.state is JobState.QUEUED and not agents[0].runners
+    assert scheduler.get_stats()["last_admission"]["admitted"] is False
+
+    with pytest.raises(ValueError):
+        await scheduler.submit(42, "1h")
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_one_running_job_per_agent(tmp_path):
+    agents = {0: FakeAgent(0), 1: FakeAgent(1)}
+    scheduler = TrainingScheduler(
+        agents.get, queue_path=tmp_path / "jobs.json", max_concurrent_jobs=2, max_cpu_percent=None,
+        min_available_memory_gb=None, poll_interval=0.01,
+    )
+    await scheduler.start()
+    first = await scheduler.submit(0, "1h")
+    await _wait_for(lambda: first.state is JobState.RUNNING)
+    second = await scheduler.submit(0, "2h", priority=5)
+    other = await scheduler.submit(1, "1h")
+
+    # The free slot goes to another agent, the agent's second job waits for its first
+    await _wait_for(lambda: other.state is JobState.RUNNING)
+    assert second.state is JobState.QUEUED
+    assert len(agents[0].runners) == 1
+
+    agents[0].runners[-1].done.set()
+    await _wait_for(lambda: second.state is JobState.RUNNING)
+    assert first.state is JobState.COMPLETED and len(agents[0].runners) == 2
+    await scheduler.stop()